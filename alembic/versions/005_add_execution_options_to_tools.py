@@ -0,0 +1,30 @@
+"""add_execution_options_to_tools
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-01-05 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, Sequence[str], None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tools', sa.Column('execution_options', sa.JSON(), nullable=True))
+
+    connection = op.get_bind()
+    connection.execute(sa.text("UPDATE tools SET execution_options = '{}' WHERE execution_options IS NULL"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tools', 'execution_options')
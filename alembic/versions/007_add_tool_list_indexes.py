@@ -0,0 +1,28 @@
+"""add_tool_list_indexes
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-01-07 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, Sequence[str], None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_tools_datasource_id'), 'tools', ['datasource_id'], unique=False)
+    op.create_index(op.f('ix_tools_type'), 'tools', ['type'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_tools_type'), table_name='tools')
+    op.drop_index(op.f('ix_tools_datasource_id'), table_name='tools')
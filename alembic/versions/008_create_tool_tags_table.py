@@ -0,0 +1,60 @@
+"""create_tool_tags_table
+
+Revision ID: 008
+Revises: 007
+Create Date: 2025-01-08 00:00:00.000000
+
+"""
+import json
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, Sequence[str], None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'tool_tags',
+        sa.Column('tool_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['tool_id'], ['tools.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('tool_id', 'tag_id')
+    )
+    op.create_index(op.f('ix_tool_tags_tag_id'), 'tool_tags', ['tag_id'], unique=False)
+
+    # Backfill links from the tags JSON column, creating tags that only existed on tools
+    connection = op.get_bind()
+    tag_ids = {name: tag_id for tag_id, name in connection.execute(sa.text('SELECT id, name FROM tags'))}
+    links = []
+    for tool_id, tags in connection.execute(sa.text('SELECT id, tags FROM tools')).fetchall():
+        if isinstance(tags, str):
+            tags = json.loads(tags)
+        for name in set(tags or []):
+            if name not in tag_ids:
+                now = datetime.now(timezone.utc)
+                connection.execute(
+                    sa.text('INSERT INTO tags (name, created_at, updated_at) VALUES (:name, :now, :now)'),
+                    {'name': name, 'now': now},
+                )
+                tag_ids[name] = connection.execute(
+                    sa.text('SELECT id FROM tags WHERE name = :name'), {'name': name}
+                ).scalar_one()
+            links.append({'tool_id': tool_id, 'tag_id': tag_ids[name]})
+
+    if links:
+        connection.execute(sa.text('INSERT INTO tool_tags (tool_id, tag_id) VALUES (:tool_id, :tag_id)'), links)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_tool_tags_tag_id'), table_name='tool_tags')
+    op.drop_table('tool_tags')
@@ -0,0 +1,34 @@
+"""add_template_analysis_to_tools
+
+Revision ID: 009
+Revises: 008
+Create Date: 2025-01-09 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, Sequence[str], None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Left NULL for existing tools, which are analyzed when they run until they are saved again
+    op.add_column('tools', sa.Column('is_template', sa.Boolean(), nullable=True))
+    op.add_column('tools', sa.Column('template_variables', sa.JSON(), nullable=True))
+    op.add_column('tools', sa.Column('statement_kind', sa.String(length=10), nullable=True))
+    op.add_column('tools', sa.Column('template_placeholders', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tools', 'template_placeholders')
+    op.drop_column('tools', 'statement_kind')
+    op.drop_column('tools', 'template_variables')
+    op.drop_column('tools', 'is_template')
@@ -0,0 +1,28 @@
+"""add_table_dependencies_to_tools
+
+Revision ID: 010
+Revises: 009
+Create Date: 2025-01-10 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, Sequence[str], None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Left NULL for existing tools, which are analyzed when they run until they are saved again
+    op.add_column('tools', sa.Column('table_dependencies', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tools', 'table_dependencies')
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List, Optional
 
 from pydantic import ConfigDict, field_validator
 from pydantic_settings import BaseSettings
@@ -30,6 +30,76 @@ class Settings(BaseSettings):
     db_pool_size: int = 10
     db_max_overflow: int = 20
 
+    # PostgreSQL/MySQL Datasource Pools (shared by datasources with the same connection target,
+    # overridable through the pool_size, max_overflow, pool_timeout and pool_recycle additional_params)
+    datasource_pool_min_size: int = 1
+    datasource_pool_size: int = 5
+    datasource_max_overflow: int = 5
+    datasource_pool_timeout_seconds: float = 30.0
+    datasource_pool_recycle_seconds: float = 300.0
+
+    # SQLite Tuning (metadata database and SQLite datasources, overridable through additional_params)
+    sqlite_journal_mode: str = "wal"
+    sqlite_synchronous: str = "normal"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_read_connections: int = 4
+
+    # Databricks Execution (per datasource, overridable through additional_params)
+    databricks_max_workers: int = 4
+    databricks_max_connections: int = 4
+    databricks_async_polling: bool = True
+    databricks_poll_interval_seconds: float = 0.1
+    databricks_max_poll_interval_seconds: float = 2.0
+    databricks_fetch_batch_size: int = 10000
+
+    # DuckDB Datasources (per datasource, overridable through additional_params)
+    duckdb_max_workers: int = 4
+    duckdb_threads: Optional[int] = None
+    duckdb_memory_limit: Optional[str] = None
+
+    # SQL Templates (tools can override through the bind_parameters execution option)
+    template_bind_parameters: bool = False
+    template_cache_max_entries: int = 1000
+
+    # SQL Rewrites (pagination and count queries, cached per statement)
+    sql_rewrite_cache_max_entries: int = 1000
+
+    # Result Cache (tools opt in through the cache_ttl_seconds execution option)
+    result_cache_max_entries: int = 1000
+    # Background refreshes of cached results (refresh_after_seconds and prewarm_schedule execution options)
+    result_refresh_max_concurrency: int = 2
+    result_refresh_max_pending: int = 100
+
+    # Query Plan Cache
+    plan_cache_max_entries: int = 1000
+    plan_cache_ttl_seconds: float = 300.0
+
+    # Query Profiling
+    slow_query_threshold_ms: float = 1000.0
+    slow_query_log_size: int = 200
+    latency_window_seconds: float = 300.0
+
+    # Result Size Limits (tools can set lower limits through execution_options)
+    result_max_rows: Optional[int] = 100000
+    result_max_bytes: Optional[int] = 50 * 1024 * 1024
+    result_fetch_batch_size: int = 1000
+    result_spill_directory: Optional[str] = None
+    result_spill_ttl_seconds: float = 3600.0
+    result_spill_max_bytes: int = 1024 * 1024 * 1024
+
+    # Asynchronous Tool Jobs (jobs and their results are kept by the worker that accepted them)
+    job_max_workers: int = 4
+    job_max_per_user: int = 5
+    job_ttl_seconds: float = 3600.0
+    job_spool_directory: Optional[str] = None
+    job_max_result_bytes: int = 1024 * 1024 * 1024
+
+    # Cross-worker Change Propagation
+    change_poll_interval_seconds: float = 1.0
+    change_event_retention_seconds: float = 86400.0
+
     # MCP Transport
     mcp_transport: str = "http"
 
@@ -39,6 +109,10 @@ class Settings(BaseSettings):
     mcp_path: str = "/dmcp"
     mcp_log_level: str = "debug"
 
+    # MCP Tool Access (role -> tool tags the role may use, "*" for all tools; empty allows every tool)
+    mcp_tool_access_policy: Dict[str, List[str]] = {}
+    mcp_claims_cache_ttl_seconds: float = 60.0
+
     # Default Admin Password
     default_admin_username: str = "admin"
     default_admin_password: str = "dochangethispassword"
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+from typing import Set
+
+# Range of each field: minute, hour, day of month, month, day of week (0 and 7 are Sunday)
+_FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+_FIELD_NAMES = ("minute", "hour", "day of month", "month", "day of week")
+
+# Schedules that match no time within this many days (e.g. February 30) are rejected
+_MAX_SEARCH_DAYS = 5 * 366
+
+
+class CronSchedule:
+    """
+    A five-field cron expression: minute, hour, day of month, month and day of week.
+
+    Fields accept *, numbers, ranges (1-5), steps (*/15, 0-30/10) and comma-separated lists. As in
+    cron, when both day fields are restricted a day matching either one matches.
+    """
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression must have 5 fields, got {len(parts)}: {expression!r}")
+
+        self.expression = expression
+        fields = [self._parse(part, name, *bounds) for part, name, bounds in zip(parts, _FIELD_NAMES, _FIELD_RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = fields
+        self.weekdays = {day % 7 for day in weekdays}
+        self._any_day = parts[2].startswith("*")
+        self._any_weekday = parts[4].startswith("*")
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Get the first time after moment that matches the schedule, in moment's timezone."""
+        current = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = current + timedelta(days=_MAX_SEARCH_DAYS)
+
+        while current < limit:
+            if current.month not in self.months:
+                # First day of the next month
+                current = (current.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(current):
+                current = current.replace(hour=0, minute=0) + timedelta(days=1)
+            elif current.hour not in self.hours:
+                current = current.replace(minute=0) + timedelta(hours=1)
+            elif current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+            else:
+                return current
+
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_matches = moment.day in self.days
+        weekday_matches = moment.isoweekday() % 7 in self.weekdays
+        if self._any_day and self._any_weekday:
+            return True
+        if self._any_day:
+            return weekday_matches
+        if self._any_weekday:
+            return day_matches
+        return day_matches or weekday_matches
+
+    @staticmethod
+    def _parse(field: str, name: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for item in field.split(","):
+            try:
+                base, _, step = item.partition("/")
+                step = int(step) if step else 1
+                if base == "*":
+                    start, end = low, high
+                elif "-" in base:
+                    start, end = (int(value) for value in base.split("-", 1))
+                else:
+                    start = end = int(base)
+                    if step > 1:
+                        end = high
+            except ValueError:
+                raise ValueError(f"Invalid cron {name} field: {field!r}")
+
+            if step < 1 or start < low or end > high or start > end:
+                raise ValueError(f"Invalid cron {name} field: {field!r} (allowed {low}-{high})")
+            values.update(range(start, end + 1, step))
+        return values
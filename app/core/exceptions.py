@@ -84,6 +84,39 @@ class ValidationError(DMCPError):
         )
 
 
+class ParameterValidationError(DMCPError):
+    """Raised when tool call parameters fail their definitions."""
+
+    def __init__(self, tool_id: Optional[int], error: str):
+        super().__init__(
+            message=f"Invalid parameters: {error}",
+            status_code=422,
+            details={"tool_id": tool_id, "error": error},
+        )
+
+
+class JobNotFoundError(DMCPError):
+    """Raised when a tool job is not found or has expired."""
+
+    def __init__(self, job_id: str):
+        super().__init__(
+            message=f"Job {job_id} not found",
+            status_code=404,
+            details={"job_id": job_id},
+        )
+
+
+class JobLimitError(DMCPError):
+    """Raised when a user already has the maximum number of active tool jobs."""
+
+    def __init__(self, limit: int):
+        super().__init__(
+            message=f"Too many active jobs: at most {limit} jobs can be queued or running per user",
+            status_code=429,
+            details={"limit": limit},
+        )
+
+
 class AuthenticationError(DMCPError):
     """Raised when authentication fails."""
 
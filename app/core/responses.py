@@ -1,4 +1,5 @@
 import json
+import re
 from datetime import datetime
 from typing import Any, List, Optional
 
@@ -6,6 +7,9 @@ from starlette.responses import JSONResponse
 
 from ..models.schemas import StandardAPIResponse
 
+# Entity tags of an If-None-Match header; opaque tags may contain commas, so the list is not split on them
+_ENTITY_TAG_RE = re.compile(r'\*|(?:W/)?"[^"]*"')
+
 
 def create_success_response(data: Any = None, warnings: Optional[List[dict]] = None) -> StandardAPIResponse:
     """Create a standardized success response."""
@@ -38,6 +42,15 @@ def raise_http_error(status_code: int, detail: str, errors: List[str] = None):
     raise HTTPException(status_code=status_code, detail=detail)
 
 
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Check an ETag against an If-None-Match header, using the weak comparison that header calls for."""
+    opaque_tag = etag.removeprefix("W/")
+    for tag in _ENTITY_TAG_RE.findall(if_none_match or ""):
+        if tag == "*" or tag.removeprefix("W/") == opaque_tag:
+            return True
+    return False
+
+
 def api_response(data: Any = None, success: bool = True, errors: Optional[List[str]] = None) -> JSONResponse:
     """Universal HTTP JSON response envelope with datetime serialization."""
 
@@ -0,0 +1,54 @@
+import logging
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_MODES = ("delete", "truncate", "persist", "memory", "wal", "off")
+SYNCHRONOUS_MODES = ("off", "normal", "full", "extra")
+
+# additional_params keys of SQLite datasources that override the tuning settings
+PRAGMA_PARAMS = ("journal_mode", "synchronous", "mmap_size", "cache_size_kib", "busy_timeout_ms")
+
+
+def sqlite_pragmas(overrides: Optional[Dict[str, Any]] = None, read_only: bool = False) -> List[str]:
+    """
+    Build the PRAGMA statements applied to every new SQLite connection.
+
+    WAL lets readers run alongside a writer, and the busy timeout makes a blocked writer wait for the
+    lock instead of failing with "database is locked". Values come from the sqlite_* settings, with
+    optional overrides (e.g. a datasource's additional_params). Read-only connections cannot change
+    the journal mode or sync behaviour, so they only get the timeout and memory PRAGMAs.
+    """
+    overrides = overrides or {}
+    journal_mode = str(overrides.get("journal_mode", settings.sqlite_journal_mode)).lower()
+    synchronous = str(overrides.get("synchronous", settings.sqlite_synchronous)).lower()
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"Invalid SQLite journal_mode '{journal_mode}', expected one of {JOURNAL_MODES}")
+    if synchronous not in SYNCHRONOUS_MODES:
+        raise ValueError(f"Invalid SQLite synchronous '{synchronous}', expected one of {SYNCHRONOUS_MODES}")
+
+    # busy_timeout goes first so that switching the journal mode waits for other connections
+    pragmas = [f"PRAGMA busy_timeout = {int(overrides.get('busy_timeout_ms', settings.sqlite_busy_timeout_ms))}"]
+    if not read_only:
+        pragmas += [f"PRAGMA journal_mode = {journal_mode}", f"PRAGMA synchronous = {synchronous}"]
+    return pragmas + [
+        f"PRAGMA mmap_size = {int(overrides.get('mmap_size', settings.sqlite_mmap_size))}",
+        # A negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size = {-int(overrides.get('cache_size_kib', settings.sqlite_cache_size_kib))}",
+    ]
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: List[str]) -> None:
+    """Apply PRAGMA statements to a DB-API connection, skipping ones the database rejects (e.g. read-only files)."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in pragmas:
+            try:
+                cursor.execute(pragma)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not apply '{pragma}': {e}")
+    finally:
+        cursor.close()
@@ -1,19 +1,51 @@
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 
 from .core.config import settings
+from .core.sqlite import apply_sqlite_pragmas, sqlite_pragmas
+
+
+def engine_options(database_url: str) -> Dict[str, Any]:
+    """Get the engine pool options for a database URL."""
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return {
+            "pool_pre_ping": True,
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+        }
+
+    if url.database in (None, "", ":memory:"):
+        # Every connection to an in-memory database would see a new, empty database
+        return {"poolclass": StaticPool}
+
+    # Local file connections do not go stale, so they are not pinged before use
+    return {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+    }
+
+
+def use_sqlite_profile(sync_engine: Engine) -> None:
+    """Apply the SQLite PRAGMA profile to every connection the engine opens."""
+    if sync_engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
 
 # Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=False,
-    pool_pre_ping=True,
-    pool_size=settings.db_pool_size,
-    max_overflow=settings.db_max_overflow,
-)
+engine = create_async_engine(settings.database_url, echo=False, **engine_options(settings.database_url))
+use_sqlite_profile(engine.sync_engine)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -48,5 +80,6 @@ def get_sync_db() -> Session:
         sync_url,
         echo=False,
     )
+    use_sqlite_profile(sync_engine)
     SyncSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)  # noqa: N806
     return SyncSessionLocal()
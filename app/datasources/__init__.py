@@ -1,5 +1,6 @@
-from .base import DatabaseConnection, ResultWrapper
+from .base import DatabaseConnection, QueryPlan, ResultWrapper
 from .databricks import DatabricksConnection
+from .duckdb import DuckDBConnection
 from .mysql import MySQLConnection
 from .postgresql import PostgreSQLConnection
 from .sqlite import SQLiteConnection
@@ -10,14 +11,17 @@ CONNECTION_REGISTRY = {
     "mysql": MySQLConnection,
     "sqlite": SQLiteConnection,
     "databricks": DatabricksConnection,
+    "duckdb": DuckDBConnection,
 }
 
 __all__ = [
     "DatabaseConnection",
+    "QueryPlan",
     "ResultWrapper",
     "PostgreSQLConnection",
     "MySQLConnection",
     "SQLiteConnection",
     "DatabricksConnection",
+    "DuckDBConnection",
     "CONNECTION_REGISTRY",
 ]
@@ -1,9 +1,92 @@
+import csv
+import io
 import logging
+import re
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# :name placeholders, optionally preceded by IN / NOT IN; comments, string literals and quoted identifiers
+# are matched so they can be skipped, and the lookbehind keeps PostgreSQL ::type casts and words like a:b
+# from being read as placeholders
+_NAMED_PARAMETER_RE = re.compile(
+    r"--[^\n]*|/\*.*?\*/|'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\""
+    r"|(?:\b(?P<operator>(?:NOT\s+)?IN)\s+)?(?<![:\w]):(?P<name>[A-Za-z_]\w*)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Builds the condition that replaces "IN :name" for a list value: (negated, placeholder, values) ->
+# (SQL, value to bind), or None to expand the list into one placeholder per item
+InListBinder = Callable[[bool, str, List[Any]], Optional[Tuple[str, Any]]]
+
+
+def bind_in_list_as_array(negated: bool, placeholder: str, values: List[Any]) -> Tuple[str, Any]:
+    """Compare against the whole list bound as one array value, for drivers that bind native arrays."""
+    return (f"<> ALL({placeholder})" if negated else f"= ANY({placeholder})"), values
+
+
+def bind_named_parameters(
+    sql: str,
+    parameters: Dict[str, Any],
+    placeholder: Callable[[int], str],
+    numbered: bool = False,
+    bind_in_list: Optional[InListBinder] = None,
+) -> Tuple[str, List[Any]]:
+    """
+    Replace :name placeholders with driver placeholders, collecting the values in statement order.
+
+    Args:
+        sql: SQL with :name placeholders
+        parameters: Values by name - placeholders for other names are left alone
+        placeholder: Builds the driver placeholder from the 1-based position of the value
+        numbered: Placeholders refer to values by position ($1), so a repeated name reuses its value
+        bind_in_list: Binds the list of an "IN :name" condition as a single array value
+
+    Returns:
+        Converted SQL and the values to pass to the driver
+    """
+    if not parameters:
+        return sql, []
+
+    values: List[Any] = []
+    positions: Dict[str, int] = {}
+
+    def bind(name: str, value: Any) -> str:
+        if numbered and name in positions:
+            return placeholder(positions[name])
+        values.append(value)
+        positions[name] = len(values)
+        return placeholder(len(values))
+
+    def replace(match: re.Match) -> str:
+        name, operator = match.group("name"), match.group("operator")
+        if name is None or name not in parameters:
+            return match.group(0)
+
+        value = parameters[name]
+        if operator is None or not isinstance(value, (list, tuple)):
+            prefix = match.group(0)[: match.start("name") - match.start() - 1]
+            return prefix + bind(name, value)
+
+        # A repeated name reuses its position with numbered placeholders
+        reused = numbered and name in positions
+        position = positions[name] if reused else len(values) + 1
+        negated = operator.upper() != "IN"
+        bound = bind_in_list(negated, placeholder(position), list(value)) if bind_in_list else None
+        if bound is None:
+            # One placeholder per item; an empty list gets an empty subquery, as IN () is not valid SQL
+            items = ", ".join(bind(f"{name}[{index}]", item) for index, item in enumerate(value))
+            return f"{operator} ({items or 'SELECT NULL FROM (SELECT 1) AS empty_list WHERE 1 = 0'})"
+
+        condition, array_value = bound
+        if not reused:
+            values.append(array_value)
+            positions[name] = position
+        return condition
+
+    return _NAMED_PARAMETER_RE.sub(replace, sql), values
+
 
 class ResultWrapper:
     """Common result wrapper for all database connections."""
@@ -20,9 +103,21 @@ class ResultWrapper:
         return self.data[0] if self.data else None
 
 
+class QueryPlan:
+    """Execution plan reported by the database's EXPLAIN."""
+
+    def __init__(self, plan: Any, format: str, estimated_cost: Optional[float] = None):
+        self.plan = plan
+        self.format = format
+        self.estimated_cost = estimated_cost
+
+
 class DatabaseConnection(ABC):
     """Base class for database connections."""
 
+    # Whether EXPLAIN reports a numeric cost estimate that per-tool cost limits can be checked against
+    supports_cost_estimate = False
+
     def __init__(self, connection):
         self.connection = connection
 
@@ -39,6 +134,74 @@ class DatabaseConnection(ABC):
 
         return ResultWrapper(data, columns)
 
+    async def explain(self, sql: str, parameters: Dict[str, Any] = None) -> QueryPlan:
+        """Get the database's execution plan for a SQL query without running it."""
+        converted_sql, param_values = self._convert_parameters(sql, parameters or {})
+        return await self._explain_query(converted_sql.strip().rstrip(";"), param_values)
+
+    async def _explain_query(self, sql: str, param_values: List[Any]) -> QueryPlan:
+        """Run the database-specific EXPLAIN - must be overridden for databases that support plans."""
+        raise NotImplementedError(f"Query plans are not supported by {self.__class__.__name__}")
+
+    async def stream(
+        self, sql: str, parameters: Dict[str, Any] = None, batch_size: int = 1000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Execute a SQL query and yield the results in batches of at most batch_size rows."""
+        converted_sql, param_values = self._convert_parameters(sql, parameters or {})
+
+        batches = self._stream_query(converted_sql, param_values, batch_size)
+        try:
+            async for raw_batch, columns in batches:
+                if raw_batch:
+                    yield self._process_results(raw_batch, columns)
+        finally:
+            # Release the cursor right away when the consumer stops early
+            await batches.aclose()
+
+    async def export_csv(
+        self, sql: str, parameters: Dict[str, Any] = None, delimiter: str = ",", batch_size: int = 1000
+    ) -> AsyncIterator[bytes]:
+        """
+        Execute a SQL query and yield its result as UTF-8 CSV with a header row, one chunk per batch.
+
+        Databases with a native bulk export override this; the default writes the streamed rows. The
+        header is written from the result's columns, so a result without rows still has one.
+        """
+        converted_sql, param_values = self._convert_parameters(sql, parameters or {})
+
+        batches = self._stream_query(converted_sql, param_values, batch_size)
+        header_written = False
+        try:
+            async for raw_batch, columns in batches:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer, delimiter=delimiter, lineterminator="\n")
+                if columns and not header_written:
+                    writer.writerow(columns)
+                    header_written = True
+                if raw_batch:
+                    rows = self._process_results(raw_batch, columns)
+                    writer.writerows([row.get(column) for column in columns] for row in rows)
+                if buffer.tell():
+                    yield buffer.getvalue().encode("utf-8")
+        finally:
+            await batches.aclose()
+
+    async def _stream_query(
+        self, sql: str, param_values: List[Any], batch_size: int
+    ) -> AsyncIterator[Tuple[Any, List[str]]]:
+        """
+        Yield raw result batches - buffers the whole result unless overridden by the database.
+
+        Batches may be empty; databases that know a result's columns end it with an empty batch, so a
+        result without rows still reports its columns.
+        """
+        raw_result, columns = await self._execute_query(sql, param_values)
+        raw_result = raw_result or []
+
+        for start in range(0, len(raw_result), batch_size):
+            yield raw_result[start : start + batch_size], columns
+        yield [], columns
+
     @abstractmethod
     async def _execute_query(self, sql: str, param_values: List[Any]) -> Tuple[Any, List[str]]:
         """Execute the actual query and return raw results and column names."""
@@ -73,6 +236,16 @@ class DatabaseConnection(ABC):
         """Factory method to create a connection from datasource configuration."""
         pass
 
+    @classmethod
+    async def release_datasource(cls, datasource_id: int) -> None:
+        """Drop any state shared between connections of a datasource after it was changed or deleted."""
+        pass
+
+    @classmethod
+    async def release_all(cls) -> None:
+        """Drop the state shared between connections of every datasource (on shutdown)."""
+        pass
+
     @classmethod
     def _handle_connection_error(cls, datasource, error: Exception):
         """Common error handling for connection creation."""
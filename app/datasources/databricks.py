@@ -1,16 +1,218 @@
 import asyncio
+import concurrent.futures
 import logging
-from typing import Any, Dict, List, Tuple
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
 
 from databricks.sql import connect
 
+from ..core.config import settings
 from ..models.database import Datasource
-from .base import DatabaseConnection
+from .base import DatabaseConnection, QueryPlan, bind_named_parameters
+
+try:
+    import pyarrow  # noqa: F401
+
+    ARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - pyarrow is an optional extra of databricks-sql-connector
+    ARROW_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# additional_params keys that tune the pool instead of being passed to databricks.sql.connect
+POOL_PARAMS = ("max_workers", "max_connections", "async_polling", "poll_interval", "fetch_batch_size")
+
+_TRUE_STRINGS = ("true", "1", "yes", "on")
+_FALSE_STRINGS = ("false", "0", "no", "off", "")
+
+
+def _parse_bool(name: str, value: Any) -> bool:
+    """Read a boolean additional_param, which form and JSON input often send as a string."""
+    if isinstance(value, str):
+        normalized = value.strip().lower()
+        if normalized in _TRUE_STRINGS:
+            return True
+        if normalized in _FALSE_STRINGS:
+            return False
+        raise ValueError(f"{name} must be a boolean, got {value!r}")
+    return bool(value)
+
+
+class PooledDatabricksConnection:
+    """A pooled Databricks connection that reuses one cursor across queries."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._cursor = None
+
+    def cursor(self):
+        """Return the cached cursor, creating it on first use."""
+        if self._cursor is None:
+            self._cursor = self.connection.cursor()
+        return self._cursor
+
+    def detach_cursor(self):
+        """Forget the cached cursor (e.g. after a failed or abandoned query) and return it for closing."""
+        cursor, self._cursor = self._cursor, None
+        return cursor
+
+    @property
+    def is_open(self) -> bool:
+        return getattr(self.connection, "open", True)
+
+    def close(self):
+        """Close the cursor and the underlying connection."""
+        cursor = self.detach_cursor()
+        if cursor is not None:
+            _close_quietly(cursor)
+        _close_quietly(self.connection)
+
+
+def _close_quietly(resource) -> None:
+    try:
+        resource.close()
+    except Exception as e:
+        logger.debug(f"Ignoring error while closing {type(resource).__name__}: {e}")
+
+
+class DatabricksConnectionPool:
+    """Bounded connection pool with a dedicated thread pool for a single Databricks datasource.
+
+    Blocking connector calls run on the pool's own executor so slow warehouse queries cannot starve the
+    event loop's default executor. Waiters are plain concurrent futures, which keeps the pool usable from
+    any event loop.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connection_params: Dict[str, Any],
+        max_workers: int,
+        max_connections: int,
+        async_polling: bool = True,
+        poll_interval: float = 0.1,
+        fetch_batch_size: int = 10000,
+    ):
+        self.connection_params = connection_params
+        self.max_connections = max(1, max_connections)
+        self.async_polling = async_polling
+        self.poll_interval = poll_interval
+        self.fetch_batch_size = fetch_batch_size
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix=f"databricks-{name}"
+        )
+        self._lock = threading.Lock()
+        self._idle: List[PooledDatabricksConnection] = []
+        self._waiters: Deque[concurrent.futures.Future] = deque()
+        self._size = 0
+        self._closed = False
+
+    async def run(self, func: Callable, *args) -> Any:
+        """Run a blocking connector call on this datasource's executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    def _open(self) -> PooledDatabricksConnection:
+        return PooledDatabricksConnection(connect(**self.connection_params))
+
+    async def acquire(self) -> PooledDatabricksConnection:
+        """Check out a connection, opening a new one while below max_connections."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Databricks connection pool is closed")
+            if self._idle:
+                return self._idle.pop()
+            waiter: Optional[concurrent.futures.Future] = None
+            if self._size < self.max_connections:
+                self._size += 1
+            else:
+                waiter = concurrent.futures.Future()
+                self._waiters.append(waiter)
+
+        # A waiter resolves to a released connection, or to None when a slot was freed up
+        pooled = None
+        if waiter is not None:
+            try:
+                pooled = await asyncio.wrap_future(waiter)
+            except asyncio.CancelledError:
+                # Hand back whatever was passed to us after we stopped waiting
+                if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                    self.release(waiter.result())
+                raise
+            if pooled is not None:
+                return pooled
+
+        try:
+            return await self.run(self._open)
+        except BaseException:
+            self.release(None)
+            raise
+
+    def release(self, pooled: Optional[PooledDatabricksConnection], discard: bool = False) -> None:
+        """Return a connection to the pool, or give up its slot when it is discarded."""
+        if pooled is not None and (discard or self._closed or not pooled.is_open):
+            self._close_in_background(pooled)
+            pooled = None
+
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if waiter.set_running_or_notify_cancel():
+                    waiter.set_result(pooled)
+                    return
+            if pooled is None:
+                self._size -= 1
+            else:
+                self._idle.append(pooled)
+
+    @asynccontextmanager
+    async def checkout(self) -> AsyncIterator[PooledDatabricksConnection]:
+        """Borrow a connection; its cursor is dropped if the block fails or is abandoned."""
+        pooled = await self.acquire()
+        try:
+            yield pooled
+        except BaseException:
+            cursor = pooled.detach_cursor()
+            if cursor is not None:
+                self._close_in_background(cursor)
+            self.release(pooled)
+            raise
+        self.release(pooled)
+
+    def _close_in_background(self, resource) -> None:
+        try:
+            self.executor.submit(_close_quietly, resource)
+        except RuntimeError:
+            # Executor already shut down
+            _close_quietly(resource)
+
+    async def close(self) -> None:
+        """Close idle connections and stop the executor; checked-out connections close on release."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            waiters, self._waiters = list(self._waiters), deque()
+
+        for waiter in waiters:
+            if waiter.set_running_or_notify_cancel():
+                waiter.set_exception(RuntimeError("Databricks connection pool is closed"))
+        for pooled in idle:
+            await self.run(pooled.close)
+        self.executor.shutdown(wait=False)
+
+
+# Pools are shared by every DatabricksConnection for the same datasource, keyed by datasource id
+_pools: Dict[int, Tuple[str, DatabricksConnectionPool]] = {}
+_pools_lock = threading.Lock()
+
 
 class DatabricksConnection(DatabaseConnection):
+    def __init__(self, pool: DatabricksConnectionPool, owns_pool: bool = False):
+        super().__init__(pool)
+        self.owns_pool = owns_pool
+
     def _convert_databricks_types(self, value):
         """Convert Databricks-specific types to JSON-serializable formats."""
         # Handle any Databricks-specific types that might not be JSON serializable
@@ -23,84 +225,191 @@ class DatabricksConnection(DatabaseConnection):
         return value
 
     def _convert_parameters(self, sql: str, parameters: Dict[str, Any]) -> Tuple[str, List[Any]]:
-        """Convert named parameters to Databricks positional parameters."""
-        if not parameters:
-            return sql, []
+        """Convert named parameters to Databricks positional parameters, binding IN lists as one array."""
+        return bind_named_parameters(sql, parameters, lambda position: "?", bind_in_list=self._bind_in_list)
 
-        # Replace named parameters with positional parameters
-        param_keys = list(parameters.keys())
-        for i, key in enumerate(param_keys):
-            sql = sql.replace(f":{key}", "?")
+    @staticmethod
+    def _bind_in_list(negated: bool, placeholder: str, values: List[Any]) -> Optional[Tuple[str, Any]]:
+        # The connector sends a list as a native ARRAY parameter, which explode() turns back into rows
+        if not values:
+            return None
+        operator = "NOT IN" if negated else "IN"
+        return f"{operator} (SELECT explode({placeholder}))", values
 
-        return sql, list(parameters.values())
+    async def _submit(self, pooled: PooledDatabricksConnection, sql: str, param_values: List[Any]):
+        """Run the statement, polling asynchronously instead of holding a worker thread while it runs."""
+        pool = self.connection
+        cursor = await pool.run(pooled.cursor)
+
+        if not (pool.async_polling and hasattr(cursor, "execute_async")):
+            await pool.run(cursor.execute, sql, param_values)
+            return cursor
+
+        await pool.run(cursor.execute_async, sql, param_values)
+        interval = pool.poll_interval
+        try:
+            while await pool.run(cursor.is_query_pending):
+                await asyncio.sleep(interval)
+                interval = min(interval * 2, settings.databricks_max_poll_interval_seconds)
+            await pool.run(cursor.get_async_execution_result)
+        except asyncio.CancelledError:
+            # Don't leave the warehouse running a query nobody is waiting for
+            pool.executor.submit(cursor.cancel)
+            raise
+
+        return cursor
+
+    def _fetch_batch(self, cursor, columns: List[str], size: int) -> List[Dict[str, Any]]:
+        """Fetch up to size rows as dictionaries (runs on the datasource executor)."""
+        if ARROW_AVAILABLE:
+            table = cursor.fetchmany_arrow(size)
+            return table.to_pylist() if table.num_rows else []
+
+        return [
+            {columns[i]: self._convert_databricks_types(value) for i, value in enumerate(row)}
+            for row in cursor.fetchmany(size)
+        ]
+
+    @staticmethod
+    def _get_columns(cursor) -> List[str]:
+        return [desc[0] for desc in cursor.description] if cursor.description else []
 
     async def _execute_query(self, sql: str, param_values: List[Any]) -> Tuple[List[Dict[str, Any]], List[str]]:
         """Execute Databricks query and return results with column names."""
-        # Since databricks-sql-connector is synchronous, we need to run it in a thread pool
-        loop = asyncio.get_event_loop()
-
-        def execute_sync():
-            cursor = self.connection.cursor()
-            cursor.execute(sql, param_values)
-            result = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description] if cursor.description else []
-            cursor.close()
-            return result, columns
-
-        raw_result, columns = await loop.run_in_executor(None, execute_sync)
-
-        # Convert results to list of dictionaries
-        if raw_result and columns:
-            data = []
-            for row in raw_result:
-                row_dict = {}
-                for i, value in enumerate(row):
-                    row_dict[columns[i]] = self._convert_databricks_types(value)
-                data.append(row_dict)
-        else:
-            data = []
+        pool = self.connection
+        data: List[Dict[str, Any]] = []
+
+        async with pool.checkout() as pooled:
+            cursor = await self._submit(pooled, sql, param_values)
+            columns = self._get_columns(cursor)
+            while columns:
+                batch = await pool.run(self._fetch_batch, cursor, columns, pool.fetch_batch_size)
+                if not batch:
+                    break
+                data.extend(batch)
 
         return data, columns
 
+    async def _stream_query(
+        self, sql: str, param_values: List[Any], batch_size: int
+    ) -> AsyncIterator[Tuple[List[Dict[str, Any]], List[str]]]:
+        """Stream result batches straight from the cursor (Arrow batches when pyarrow is available)."""
+        pool = self.connection
+
+        async with pool.checkout() as pooled:
+            cursor = await self._submit(pooled, sql, param_values)
+            columns = self._get_columns(cursor)
+            while columns:
+                batch = await pool.run(self._fetch_batch, cursor, columns, batch_size)
+                yield batch, columns
+                if not batch:
+                    break
+
+    async def _explain_query(self, sql: str, param_values: List[Any]) -> QueryPlan:
+        """Get the Spark physical plan text - Databricks does not report a single cost estimate."""
+        data, columns = await self._execute_query(f"EXPLAIN {sql}", param_values)
+        plan = "\n".join(str(row[columns[0]]) for row in data) if columns else ""
+
+        return QueryPlan(plan, "text")
+
     def _process_results(self, raw_result: List[Dict[str, Any]], columns: List[str]) -> List[Dict[str, Any]]:
         """Databricks results are already processed by _execute_query."""
         return raw_result
 
     async def close(self):
-        """Close the Databricks connection."""
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, self.connection.close)
+        """Close the Databricks connection (shared pools stay open for other requests)."""
+        if self.owns_pool:
+            await self.connection.close()
+
+    @classmethod
+    def _get_pool(
+        cls, datasource: Datasource, connection_params: Dict[str, Any]
+    ) -> Tuple[DatabricksConnectionPool, Optional[DatabricksConnectionPool]]:
+        """Get the shared pool for the datasource, replacing it when its configuration changed.
+
+        Returns the pool and, if one was replaced, the stale pool that should be closed.
+        """
+        additional_params = datasource.additional_params or {}
+        pool_config = {
+            "max_workers": int(additional_params.get("max_workers", settings.databricks_max_workers)),
+            "max_connections": int(additional_params.get("max_connections", settings.databricks_max_connections)),
+            "async_polling": _parse_bool(
+                "async_polling", additional_params.get("async_polling", settings.databricks_async_polling)
+            ),
+            "poll_interval": float(additional_params.get("poll_interval", settings.databricks_poll_interval_seconds)),
+            "fetch_batch_size": int(additional_params.get("fetch_batch_size", settings.databricks_fetch_batch_size)),
+        }
+
+        def new_pool() -> DatabricksConnectionPool:
+            return DatabricksConnectionPool(str(datasource.id or "adhoc"), connection_params, **pool_config)
+
+        if datasource.id is None:
+            # Unsaved datasource (connection test) - private pool, closed with the connection
+            return new_pool(), None
+
+        fingerprint = repr(sorted(connection_params.items())) + repr(sorted(pool_config.items()))
+        with _pools_lock:
+            existing = _pools.get(datasource.id)
+            if existing and existing[0] == fingerprint:
+                return existing[1], None
+            pool = new_pool()
+            _pools[datasource.id] = (fingerprint, pool)
+            return pool, existing[1] if existing else None
+
+    @classmethod
+    async def release_datasource(cls, datasource_id: int) -> None:
+        """Close the shared pool of a changed or deleted datasource; the next connection opens a new one."""
+        with _pools_lock:
+            existing = _pools.pop(datasource_id, None)
+        if existing:
+            await existing[1].close()
+
+    @classmethod
+    async def release_all(cls) -> None:
+        """Close every shared pool."""
+        with _pools_lock:
+            pools = [pool for _, pool in _pools.values()]
+            _pools.clear()
+        for pool in pools:
+            await pool.close()
 
     @classmethod
     async def create(cls, datasource: Datasource) -> "DatabricksConnection":
         """Create a new Databricks connection."""
         try:
+            additional_params = datasource.additional_params or {}
+
             # Build connection parameters
             connection_params = {
                 "server_hostname": datasource.host,
-                "http_path": datasource.additional_params.get("http_path", "/sql/1.0/warehouses/default"),
+                "http_path": additional_params.get("http_path", "/sql/1.0/warehouses/default"),
                 "access_token": datasource.decrypted_password,
             }
 
             # Add catalog and schema if specified
-            if datasource.additional_params.get("catalog"):
-                connection_params["catalog"] = datasource.additional_params["catalog"]
-            if datasource.additional_params.get("schema"):
-                connection_params["schema"] = datasource.additional_params["schema"]
+            if additional_params.get("catalog"):
+                connection_params["catalog"] = additional_params["catalog"]
+            if additional_params.get("schema"):
+                connection_params["schema"] = additional_params["schema"]
 
             # Add additional parameters
-            for key, value in datasource.additional_params.items():
-                if key not in ["http_path", "catalog", "schema"]:
+            for key, value in additional_params.items():
+                if key not in ["http_path", "catalog", "schema", *POOL_PARAMS]:
                     connection_params[key] = value
 
-            # Create connection in a thread pool since databricks-sql-connector is synchronous
-            loop = asyncio.get_event_loop()
-
-            def create_sync():
-                return connect(**connection_params)
+            pool, stale_pool = cls._get_pool(datasource, connection_params)
+            if stale_pool is not None:
+                await stale_pool.close()
 
-            connection = await loop.run_in_executor(None, create_sync)
+            # Open (or reuse) one pooled connection so configuration errors surface here
+            try:
+                async with pool.checkout():
+                    pass
+            except Exception:
+                if datasource.id is None:
+                    await pool.close()
+                raise
 
-            return cls(connection)
+            return cls(pool, owns_pool=datasource.id is None)
         except Exception as e:
             cls._handle_connection_error(datasource, e)
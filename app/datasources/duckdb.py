@@ -0,0 +1,212 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..models.database import Datasource
+from .base import DatabaseConnection, QueryPlan, bind_in_list_as_array, bind_named_parameters
+
+try:
+    import duckdb
+
+    DUCKDB_AVAILABLE = True
+except ImportError:  # pragma: no cover - duckdb is an optional extra
+    duckdb = None
+    DUCKDB_AVAILABLE = False
+
+try:
+    import pyarrow  # noqa: F401
+
+    ARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - pyarrow is optional
+    ARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class DuckDBDatabase:
+    """A read-only DuckDB file shared by every connection of a datasource.
+
+    Each query gets its own cursor (a separate DuckDB connection to the same database instance) and runs
+    on the datasource's executor, so queries run side by side while DuckDB parallelizes each scan across
+    its own threads. External file access is off unless enabled, and the configuration is locked so SQL
+    cannot change it.
+    """
+
+    def __init__(self, name: str, path: str, config: Dict[str, Any], max_workers: int):
+        self.path = path
+        self.config = {**config, "lock_configuration": True}
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix=f"duckdb-{name}"
+        )
+        self._lock = threading.Lock()
+        self._connection = None
+
+    async def run(self, func: Callable, *args) -> Any:
+        """Run a blocking DuckDB call on this datasource's executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    def cursor(self):
+        """Open a cursor, opening the database file on first use (runs on the executor)."""
+        with self._lock:
+            if self._connection is None:
+                self._connection = duckdb.connect(self.path, read_only=True, config=self.config)
+            return self._connection.cursor()
+
+    async def close(self) -> None:
+        """Close the database and stop the executor."""
+        with self._lock:
+            connection, self._connection = self._connection, None
+        if connection is not None:
+            await self.run(connection.close)
+        self.executor.shutdown(wait=False)
+
+
+# Databases are shared by every DuckDBConnection for the same datasource, keyed by datasource id
+_databases: Dict[int, Tuple[str, DuckDBDatabase]] = {}
+_databases_lock = threading.Lock()
+
+
+class DuckDBConnection(DatabaseConnection):
+    def __init__(self, database: DuckDBDatabase, owns_database: bool = False):
+        super().__init__(database)
+        self.owns_database = owns_database
+
+    def _convert_parameters(self, sql: str, parameters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """Convert named parameters to DuckDB ? placeholders, binding IN lists as one list value."""
+        return bind_named_parameters(sql, parameters, lambda position: "?", bind_in_list=bind_in_list_as_array)
+
+    @staticmethod
+    def _get_columns(cursor) -> List[str]:
+        return [desc[0] for desc in cursor.description] if cursor.description else []
+
+    @staticmethod
+    def _fetch_all(cursor) -> List[Any]:
+        """Fetch every row, as dictionaries built from Arrow columns when pyarrow is available."""
+        if ARROW_AVAILABLE:
+            return cursor.fetch_arrow_table().to_pylist()
+        return cursor.fetchall()
+
+    @staticmethod
+    def _fetch_batch(source, size: int) -> List[Any]:
+        """Fetch up to size rows from an Arrow batch reader, or from the cursor without pyarrow."""
+        if ARROW_AVAILABLE:
+            try:
+                return source.read_next_batch().to_pylist()
+            except StopIteration:
+                return []
+        return source.fetchmany(size)
+
+    async def _execute_query(self, sql: str, param_values: List[Any]) -> Tuple[List[Any], List[str]]:
+        """Execute DuckDB query and return results with column names."""
+        database = self.connection
+        cursor = await database.run(database.cursor)
+        try:
+            await database.run(cursor.execute, sql, param_values)
+            columns = self._get_columns(cursor)
+            rows = await database.run(self._fetch_all, cursor) if columns else []
+        finally:
+            await database.run(cursor.close)
+
+        return rows, columns
+
+    async def _stream_query(
+        self, sql: str, param_values: List[Any], batch_size: int
+    ) -> AsyncIterator[Tuple[List[Any], List[str]]]:
+        """Fetch DuckDB results batch by batch (Arrow record batches when pyarrow is available)."""
+        database = self.connection
+        cursor = await database.run(database.cursor)
+        try:
+            await database.run(cursor.execute, sql, param_values)
+            columns = self._get_columns(cursor)
+            source = await database.run(cursor.fetch_record_batch, batch_size) if ARROW_AVAILABLE else cursor
+            while columns:
+                rows = await database.run(self._fetch_batch, source, batch_size)
+                yield rows, columns
+                if not rows:
+                    break
+        finally:
+            await database.run(cursor.close)
+
+    async def _explain_query(self, sql: str, param_values: List[Any]) -> QueryPlan:
+        """Get the DuckDB physical plan text - DuckDB does not report a single cost estimate."""
+        rows, _ = await self._execute_query(f"EXPLAIN {sql}", param_values)
+        plan = "\n".join(str(row["explain_value"] if isinstance(row, dict) else row[1]) for row in rows)
+
+        return QueryPlan(plan, "text")
+
+    async def close(self):
+        """Close the DuckDB connection (shared databases stay open for other requests)."""
+        if self.owns_database:
+            await self.connection.close()
+
+    @classmethod
+    def _get_database(cls, datasource: Datasource) -> Tuple[DuckDBDatabase, Optional[DuckDBDatabase]]:
+        """Get the shared database for the datasource, replacing it when its configuration changed.
+
+        Returns the database and, if one was replaced, the stale database that should be closed.
+        """
+        additional_params = datasource.additional_params or {}
+        config: Dict[str, Any] = {
+            "enable_external_access": bool(additional_params.get("external_access", False)),
+        }
+        threads = additional_params.get("threads", settings.duckdb_threads)
+        if threads:
+            config["threads"] = int(threads)
+        memory_limit = additional_params.get("memory_limit", settings.duckdb_memory_limit)
+        if memory_limit:
+            config["memory_limit"] = str(memory_limit)
+        max_workers = int(additional_params.get("max_workers", settings.duckdb_max_workers))
+
+        def new_database() -> DuckDBDatabase:
+            return DuckDBDatabase(str(datasource.id or "adhoc"), datasource.database, config, max_workers)
+
+        if datasource.id is None:
+            # Unsaved datasource (connection test) - private database, closed with the connection
+            return new_database(), None
+
+        fingerprint = repr((datasource.database, sorted(config.items()), max_workers))
+        with _databases_lock:
+            existing = _databases.get(datasource.id)
+            if existing and existing[0] == fingerprint:
+                return existing[1], None
+            database = new_database()
+            _databases[datasource.id] = (fingerprint, database)
+            return database, existing[1] if existing else None
+
+    @classmethod
+    async def release_datasource(cls, datasource_id: int) -> None:
+        """Close the shared database of a changed or deleted datasource; the next connection reopens it."""
+        with _databases_lock:
+            existing = _databases.pop(datasource_id, None)
+        if existing:
+            await existing[1].close()
+
+    @classmethod
+    async def release_all(cls) -> None:
+        """Close every shared database."""
+        with _databases_lock:
+            databases = [database for _, database in _databases.values()]
+            _databases.clear()
+        for database in databases:
+            await database.close()
+
+    @classmethod
+    async def create(cls, datasource: Datasource) -> "DuckDBConnection":
+        """Create a new read-only DuckDB connection."""
+        try:
+            if not DUCKDB_AVAILABLE:
+                raise ValueError("DuckDB datasources need the duckdb package (install dmcp with the duckdb extra)")
+            if not datasource.database or datasource.database == ":memory:":
+                raise ValueError("DuckDB datasources need the path of a database file")
+
+            database, stale_database = cls._get_database(datasource)
+            if stale_database is not None:
+                await stale_database.close()
+
+            return cls(database, owns_database=datasource.id is None)
+        except Exception as e:
+            cls._handle_connection_error(datasource, e)
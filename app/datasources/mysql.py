@@ -1,31 +1,75 @@
+import asyncio
+import json
 import logging
-from typing import Any, Dict, List, Tuple
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 import aiomysql
 
 from ..models.database import Datasource
-from .base import DatabaseConnection
+from .base import DatabaseConnection, QueryPlan, bind_named_parameters
+from .shared_pools import POOL_PARAMS, SharedPoolRegistry, connection_fingerprint, pool_config
 
 logger = logging.getLogger(__name__)
 
+# Global shared pool registry, keyed by connection target
+shared_pools = SharedPoolRegistry("MySQL")
+
 
 class MySQLConnection(DatabaseConnection):
+    supports_cost_estimate = True
+
+    def __init__(self, connection, database: Optional[str] = None, acquire_timeout: Optional[float] = None):
+        super().__init__(connection)
+        self.database = database
+        self.acquire_timeout = acquire_timeout
+
+    @asynccontextmanager
+    async def _checkout(self):
+        """Check out a connection from the shared pool with this datasource's database selected."""
+        if not isinstance(self.connection, aiomysql.Pool):
+            yield self.connection
+            return
+
+        connection = await asyncio.wait_for(self.connection.acquire(), self.acquire_timeout)
+        try:
+            # Datasources sharing a server and credentials share a pool, each selecting its own database
+            if self.database:
+                await connection.select_db(self.database)
+            yield connection
+        finally:
+            # Connections released inside a transaction are closed by the pool rather than reused
+            self.connection.release(connection)
+
     def _convert_parameters(self, sql: str, parameters: Dict[str, Any]) -> Tuple[str, List[Any]]:
         """Convert named parameters to MySQL %s placeholders."""
-        if not parameters:
+        sql, values = bind_named_parameters(sql, parameters, lambda position: "\0", bind_in_list=self._bind_in_list)
+        if not values:
             return sql, []
 
-        # MySQL uses %s for parameter placeholders
-        for key in parameters.keys():
-            sql = sql.replace(f":{key}", "%s")
+        # The driver interpolates values with %-formatting, so literal percent signs are doubled
+        return sql.replace("%", "%%").replace("\0", "%s"), values
+
+    @staticmethod
+    def _bind_in_list(negated: bool, placeholder: str, values: List[Any]) -> Optional[Tuple[str, Any]]:
+        """Bind a numeric IN list as one JSON array read with JSON_TABLE."""
+        # JSON_TABLE string columns carry their own collation, which cannot be compared with every
+        # column collation, so string lists are expanded into one placeholder per item instead
+        if not values or not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+            return None
 
-        return sql, list(parameters.values())
+        column_type = "BIGINT" if all(isinstance(value, int) for value in values) else "DOUBLE"
+        operator = "NOT IN" if negated else "IN"
+        return (
+            f"{operator} (SELECT value FROM JSON_TABLE({placeholder}, '$[*]' COLUMNS (value {column_type} PATH '$'))"
+            " AS in_list)"
+        ), json.dumps(values)
 
     async def _execute_query(self, sql: str, param_values: List[Any]) -> Tuple[List[Tuple], List[str]]:
         """Execute MySQL query and return results with column names."""
-        async with self.connection.cursor() as cursor:
-            await cursor.execute(sql, param_values)
+        async with self._checkout() as connection, connection.cursor() as cursor:
+            await cursor.execute(sql, param_values or None)
             result = await cursor.fetchall()
 
             # Get column names from cursor description
@@ -33,15 +77,70 @@ class MySQLConnection(DatabaseConnection):
 
             return result, columns
 
+    async def _stream_query(
+        self, sql: str, param_values: List[Any], batch_size: int
+    ) -> AsyncIterator[Tuple[List[Tuple], List[str]]]:
+        """Fetch MySQL results with an unbuffered (server-side) cursor, batch by batch."""
+        async with self._checkout() as connection:
+            cursor = await connection.cursor(aiomysql.SSCursor)
+            finished = False
+            try:
+                await cursor.execute(sql, param_values or None)
+                columns = [desc[0] for desc in cursor.description] if cursor.description else []
+                while columns:
+                    rows = await cursor.fetchmany(batch_size)
+                    yield rows, columns
+                    if not rows:
+                        break
+                finished = True
+            finally:
+                if finished or not isinstance(self.connection, aiomysql.Pool):
+                    await cursor.close()
+                else:
+                    # Closing an unbuffered cursor reads the rest of the result from the server. When the
+                    # consumer stops early the connection is closed instead, so the server stops sending
+                    # rows, and the pool drops it on release
+                    connection.close()
+
+    async def _explain_query(self, sql: str, param_values: List[Any]) -> QueryPlan:
+        """Get the MySQL JSON plan, using the optimizer's query cost as the estimate."""
+        async with self._checkout() as connection, connection.cursor() as cursor:
+            await cursor.execute(f"EXPLAIN FORMAT=JSON {sql}", param_values or None)
+            row = await cursor.fetchone()
+
+        plan = json.loads(row[0])
+        query_cost = plan.get("query_block", {}).get("cost_info", {}).get("query_cost")
+
+        return QueryPlan(plan, "json", float(query_cost) if query_cost is not None else None)
+
     async def close(self):
-        """Close the MySQL connection."""
-        self.connection.close()
-        await self.connection.wait_closed()
+        """Close the MySQL connection (shared pools stay open for other datasources)."""
+        if not isinstance(self.connection, aiomysql.Pool):
+            self.connection.close()
+            await self.connection.wait_closed()
+
+    @classmethod
+    async def release_datasource(cls, datasource_id: int) -> None:
+        """Release a changed or deleted datasource's pool, closing it when no other datasource shares it."""
+        await shared_pools.release_datasource(datasource_id)
+
+    @classmethod
+    async def release_all(cls) -> None:
+        """Close every shared pool."""
+        await shared_pools.release_all()
+
+    @staticmethod
+    async def _close_pool(pool) -> None:
+        pool.close()
+        await pool.wait_closed()
 
     @classmethod
     async def create(cls, datasource: Datasource) -> "MySQLConnection":
-        """Create a new MySQL connection."""
+        """Create a MySQL connection backed by the pool shared by datasources with the same target."""
         try:
+            additional_params = dict(datasource.additional_params or {})
+            pool = pool_config(additional_params)
+
             if datasource.connection_string:
                 # Parse connection string
                 parsed = urlparse(datasource.connection_string)
@@ -50,7 +149,6 @@ class MySQLConnection(DatabaseConnection):
                     "port": parsed.port or 3306,
                     "user": parsed.username or datasource.username,
                     "password": parsed.password or datasource.password,
-                    "db": datasource.database,
                 }
             else:
                 connection_params = {
@@ -58,14 +156,38 @@ class MySQLConnection(DatabaseConnection):
                     "port": datasource.port or 3306,
                     "user": datasource.username,
                     "password": datasource.decrypted_password,
-                    "db": datasource.database,
                 }
 
-            # Add additional parameters
-            if datasource.additional_params:
-                connection_params.update(datasource.additional_params)
+            # Add additional parameters (pool settings are not connection arguments)
+            connection_params.update({key: value for key, value in additional_params.items() if key not in POOL_PARAMS})
+            database = connection_params.pop("db", None) or datasource.database
+
+            if datasource.id is None:
+                # Unsaved datasource (connection test) - a single connection, closed with the connection
+                connection = await aiomysql.connect(db=database, **connection_params)
+                return cls(connection, database)
+
+            # Pooled connections must not be left inside a transaction, or the pool closes them on release
+            connection_params.setdefault("autocommit", True)
+
+            async def open_pool():
+                return await aiomysql.create_pool(
+                    minsize=pool["min_size"],
+                    maxsize=pool["max_size"],
+                    pool_recycle=int(pool["recycle"]),
+                    db=database,
+                    **connection_params,
+                )
 
-            connection = await aiomysql.connect(**connection_params)
-            return cls(connection)
+            # The database is selected on checkout, so only datasources without one get a pool of their own
+            fingerprint = connection_fingerprint(
+                **connection_params,
+                default_database=database is None,
+                min_size=pool["min_size"],
+                max_size=pool["max_size"],
+                recycle=pool["recycle"],
+            )
+            connection = await shared_pools.get(datasource.id, fingerprint, open_pool, cls._close_pool)
+            return cls(connection, database, pool["timeout"])
         except Exception as e:
             cls._handle_connection_error(datasource, e)
@@ -1,15 +1,48 @@
+import asyncio
+import json
 import logging
-from typing import Any, Dict, List, Tuple
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 import asyncpg
 
 from ..models.database import Datasource
-from .base import DatabaseConnection
+from .base import DatabaseConnection, QueryPlan, bind_in_list_as_array, bind_named_parameters
+from .shared_pools import POOL_PARAMS, SharedPoolRegistry, connection_fingerprint, pool_config
 
 logger = logging.getLogger(__name__)
 
+# additional_params applied to each checked-out connection instead of keying the shared pool
+SESSION_PARAMS = ("search_path", "schema")
+
+# COPY output chunks buffered ahead of the consumer; when it falls behind, COPY stops reading from the server
+COPY_BUFFER_CHUNKS = 16
+
+# Global shared pool registry, keyed by connection target
+shared_pools = SharedPoolRegistry("PostgreSQL")
+
 
 class PostgreSQLConnection(DatabaseConnection):
+    supports_cost_estimate = True
+
+    def __init__(self, connection, search_path: Optional[str] = None, acquire_timeout: Optional[float] = None):
+        super().__init__(connection)
+        self.search_path = search_path
+        self.acquire_timeout = acquire_timeout
+
+    @asynccontextmanager
+    async def _checkout(self):
+        """Check out a connection from the shared pool with this datasource's search_path applied."""
+        if not isinstance(self.connection, asyncpg.Pool):
+            yield self.connection
+            return
+
+        # The pool runs RESET ALL when a connection is released, so session settings never leak
+        async with self.connection.acquire(timeout=self.acquire_timeout) as connection:
+            if self.search_path:
+                await connection.execute("SELECT set_config('search_path', $1, false)", self.search_path)
+            yield connection
+
     def _convert_postgresql_types(self, value):
         """Convert PostgreSQL-specific types to JSON-serializable formats."""
         # Handle asyncpg BitString type
@@ -31,19 +64,14 @@ class PostgreSQLConnection(DatabaseConnection):
 
     def _convert_parameters(self, sql: str, parameters: Dict[str, Any]) -> Tuple[str, List[Any]]:
         """Convert named parameters to PostgreSQL positional parameters."""
-        if not parameters:
-            return sql, []
-
-        # Replace named parameters with positional parameters
-        param_keys = list(parameters.keys())
-        for i, key in enumerate(param_keys):
-            sql = sql.replace(f":{key}", f"${i + 1}")
-
-        return sql, list(parameters.values())
+        return bind_named_parameters(
+            sql, parameters, lambda position: f"${position}", numbered=True, bind_in_list=bind_in_list_as_array
+        )
 
     async def _execute_query(self, sql: str, param_values: List[Any]) -> Tuple[List[Dict[str, Any]], List[str]]:
         """Execute PostgreSQL query and return results with column names."""
-        result = await self.connection.fetch(sql, *param_values)
+        async with self._checkout() as connection:
+            result = await connection.fetch(sql, *param_values)
 
         # Convert asyncpg Record objects to dictionaries with type conversion
         if result:
@@ -55,23 +83,103 @@ class PostgreSQLConnection(DatabaseConnection):
 
         return data, keys
 
+    async def _stream_query(
+        self, sql: str, param_values: List[Any], batch_size: int
+    ) -> AsyncIterator[Tuple[List[Dict[str, Any]], List[str]]]:
+        """Fetch PostgreSQL results through a server-side cursor (asyncpg cursors need a transaction)."""
+        async with self._checkout() as connection, connection.transaction():
+            cursor = await connection.cursor(sql, *param_values)
+            while True:
+                records = await cursor.fetch(batch_size)
+                if not records:
+                    break
+                data = [self._convert_record_to_dict(record) for record in records]
+                yield data, list(data[0].keys())
+
+    async def export_csv(
+        self, sql: str, parameters: Dict[str, Any] = None, delimiter: str = ",", batch_size: int = 1000
+    ) -> AsyncIterator[bytes]:
+        """
+        Export a query result with COPY ... TO STDOUT, yielding the CSV bytes as the server sends them.
+
+        No rows are decoded into Python objects, so values are formatted by PostgreSQL.
+        batch_size is not used; the server decides the chunk size.
+        """
+        converted_sql, param_values = self._convert_parameters(sql, parameters or {})
+        query = converted_sql.strip().rstrip(";")
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=COPY_BUFFER_CHUNKS)
+        errors: List[BaseException] = []
+
+        async with self._checkout() as connection:
+
+            async def copy() -> None:
+                try:
+                    await connection.copy_from_query(
+                        query, *param_values, output=chunks.put, format="csv", header=True, delimiter=delimiter
+                    )
+                except Exception as e:
+                    errors.append(e)
+                # Not reached when the consumer stops early and the copy is cancelled
+                await chunks.put(None)
+
+            task = asyncio.create_task(copy())
+            try:
+                while (chunk := await chunks.get()) is not None:
+                    yield chunk
+                if errors:
+                    raise errors[0]
+            finally:
+                # Release the connection only once the COPY is finished or cancelled
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+    async def _explain_query(self, sql: str, param_values: List[Any]) -> QueryPlan:
+        """Get the PostgreSQL JSON plan, using the planner's total cost as the estimate."""
+        async with self._checkout() as connection:
+            raw_plan = await connection.fetchval(f"EXPLAIN (FORMAT JSON) {sql}", *param_values)
+        plan = json.loads(raw_plan) if isinstance(raw_plan, str) else raw_plan
+
+        return QueryPlan(plan, "json", float(plan[0]["Plan"]["Total Cost"]))
+
     def _process_results(self, raw_result: List[Dict[str, Any]], columns: List[str]) -> List[Dict[str, Any]]:
         """PostgreSQL results are already processed by _execute_query."""
         return raw_result
 
     async def close(self):
-        """Close the PostgreSQL connection."""
-        await self.connection.close()
+        """Close the PostgreSQL connection (shared pools stay open for other datasources)."""
+        if not isinstance(self.connection, asyncpg.Pool):
+            await self.connection.close()
+
+    @classmethod
+    async def release_datasource(cls, datasource_id: int) -> None:
+        """Release a changed or deleted datasource's pool, closing it when no other datasource shares it."""
+        await shared_pools.release_datasource(datasource_id)
+
+    @classmethod
+    async def release_all(cls) -> None:
+        """Close every shared pool."""
+        await shared_pools.release_all()
+
+    @staticmethod
+    async def _close_pool(pool) -> None:
+        await pool.close()
 
     @classmethod
     async def create(cls, datasource: Datasource) -> "PostgreSQLConnection":
-        """Create a new PostgreSQL connection."""
+        """Create a PostgreSQL connection backed by the pool shared by datasources with the same target."""
         try:
+            additional_params = dict(datasource.additional_params or {})
+            search_path = additional_params.get("search_path") or additional_params.get("schema")
+            pool = pool_config(additional_params)
+
             if datasource.connection_string:
                 # Use connection string if provided
                 # Note: Connection strings with passwords should be handled carefully
                 # The password in connection string should be encrypted if stored
-                connection = await asyncpg.connect(datasource.connection_string)
+                connection_params = {"dsn": datasource.connection_string}
             else:
                 # Build connection parameters
                 connection_params = {
@@ -86,12 +194,34 @@ class PostgreSQLConnection(DatabaseConnection):
                 if datasource.ssl_mode:
                     connection_params["ssl"] = datasource.ssl_mode
 
-                # Add additional parameters
-                if datasource.additional_params:
-                    connection_params.update(datasource.additional_params)
-
+                # Add additional parameters (session and pool settings are not connection arguments)
+                connection_params.update(
+                    {
+                        key: value
+                        for key, value in additional_params.items()
+                        if key not in (*SESSION_PARAMS, *POOL_PARAMS)
+                    }
+                )
+
+            if datasource.id is None:
+                # Unsaved datasource (connection test) - a single connection, closed with the connection
                 connection = await asyncpg.connect(**connection_params)
-
-            return cls(connection)
+                if search_path:
+                    await connection.execute("SELECT set_config('search_path', $1, false)", search_path)
+                return cls(connection, search_path)
+
+            async def open_pool():
+                return await asyncpg.create_pool(
+                    min_size=pool["min_size"],
+                    max_size=pool["max_size"],
+                    max_inactive_connection_lifetime=pool["recycle"],
+                    **connection_params,
+                )
+
+            fingerprint = connection_fingerprint(
+                **connection_params, min_size=pool["min_size"], max_size=pool["max_size"], recycle=pool["recycle"]
+            )
+            connection = await shared_pools.get(datasource.id, fingerprint, open_pool, cls._close_pool)
+            return cls(connection, search_path, pool["timeout"])
         except Exception as e:
             cls._handle_connection_error(datasource, e)
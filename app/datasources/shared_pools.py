@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Set, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# additional_params keys that size a shared pool instead of being passed to the driver
+POOL_PARAMS = ("pool_size", "max_overflow", "pool_timeout", "pool_recycle")
+
+
+def pool_config(additional_params: Dict[str, Any]) -> Dict[str, Any]:
+    """Get the pool sizing of a datasource from its additional_params, defaulting to the settings."""
+    pool_size = int(additional_params.get("pool_size", settings.datasource_pool_size))
+    max_overflow = int(additional_params.get("max_overflow", settings.datasource_max_overflow))
+    return {
+        "min_size": min(settings.datasource_pool_min_size, pool_size),
+        "max_size": max(1, pool_size + max_overflow),
+        "timeout": float(additional_params.get("pool_timeout", settings.datasource_pool_timeout_seconds)),
+        "recycle": float(additional_params.get("pool_recycle", settings.datasource_pool_recycle_seconds)),
+    }
+
+
+def connection_fingerprint(**target: Any) -> str:
+    """Normalize a connection target (host, port, database, user, password, SSL, parameters) to a key.
+
+    The key is hashed so that credentials are never kept in plain text.
+    """
+    normalized = repr(sorted((key, repr(value)) for key, value in target.items() if value not in (None, "", {})))
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+class SharedPool:
+    """A pool opened once and used by every datasource with the same connection fingerprint."""
+
+    def __init__(self, opening: "asyncio.Task", close: Callable[[Any], Awaitable[None]]):
+        self.opening = opening
+        self.close = close
+        self.datasource_ids: Set[int] = set()
+
+
+class SharedPoolRegistry:
+    """
+    Connection pools shared between datasources that point at the same server, database and credentials.
+
+    Datasources that only differ by name or session settings (e.g. search_path) get the same pool, so
+    many logical datasources stay within the database's connection limit. A pool is closed once the
+    last datasource using it is released. Pools belong to the event loop they were opened on.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._pools: Dict[Tuple[str, asyncio.AbstractEventLoop], SharedPool] = {}
+        self._datasources: Dict[Hashable, Tuple[str, asyncio.AbstractEventLoop]] = {}
+
+    async def get(
+        self,
+        datasource_id: int,
+        fingerprint: str,
+        open_pool: Callable[[], Awaitable[Any]],
+        close_pool: Callable[[Any], Awaitable[None]],
+    ) -> Any:
+        """Get the pool for a connection fingerprint, opening it on first use."""
+        loop = asyncio.get_running_loop()
+        key = (fingerprint, loop)
+        self._drop_closed_loops()
+
+        # A datasource whose connection target changed moves to another pool
+        previous = self._datasources.get(datasource_id)
+        if previous is not None and previous != key:
+            await self.release_datasource(datasource_id)
+
+        shared = self._pools.get(key)
+        if shared is None:
+            shared = SharedPool(asyncio.ensure_future(open_pool()), close_pool)
+            self._pools[key] = shared
+            logger.info(f"Opening shared {self.name} pool for datasource {datasource_id}")
+
+        try:
+            pool = await asyncio.shield(shared.opening)
+        except Exception:
+            if self._pools.get(key) is shared:
+                del self._pools[key]
+            raise
+
+        shared.datasource_ids.add(datasource_id)
+        self._datasources[datasource_id] = key
+        return pool
+
+    async def release_datasource(self, datasource_id: int) -> None:
+        """Stop a datasource from using its pool, closing the pool when no other datasource uses it."""
+        key = self._datasources.pop(datasource_id, None)
+        shared = self._pools.get(key) if key is not None else None
+        if shared is None:
+            return
+
+        shared.datasource_ids.discard(datasource_id)
+        if not shared.datasource_ids:
+            del self._pools[key]
+            await self._close(shared)
+
+    async def release_all(self) -> None:
+        """Close every pool opened on the running event loop."""
+        loop = asyncio.get_running_loop()
+        for key in [key for key in self._pools if key[1] is loop]:
+            await self._close(self._pools.pop(key))
+        self._datasources = {ds_id: key for ds_id, key in self._datasources.items() if key in self._pools}
+
+    async def _close(self, shared: SharedPool) -> None:
+        try:
+            await shared.close(await shared.opening)
+        except Exception as e:
+            logger.debug(f"Ignoring error while closing shared {self.name} pool: {e}")
+
+    def _drop_closed_loops(self) -> None:
+        """Forget pools of event loops that no longer run; their connections went with the loop."""
+        for key in [key for key in self._pools if key[1].is_closed()]:
+            del self._pools[key]
+        self._datasources = {ds_id: key for ds_id, key in self._datasources.items() if key in self._pools}
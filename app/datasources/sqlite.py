@@ -1,43 +1,316 @@
+import asyncio
+import concurrent.futures
+import json
 import logging
-from typing import Any, Dict, List, Tuple
+import sqlite3
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, Union
 
 import aiosqlite
 
+from ..core.config import settings
+from ..core.sqlite import PRAGMA_PARAMS, sqlite_pragmas
 from ..models.database import Datasource
-from .base import DatabaseConnection
+from ..services.sql_analysis import is_read_only_sql
+from .base import DatabaseConnection, QueryPlan, bind_named_parameters
 
 logger = logging.getLogger(__name__)
 
 
+async def _close_quietly(connection: aiosqlite.Connection) -> None:
+    try:
+        await connection.close()
+    except Exception as e:
+        logger.debug(f"Ignoring error while closing SQLite connection: {e}")
+
+
+class SQLiteConnectionSlots:
+    """Bounded set of aiosqlite connections opened on demand.
+
+    Waiters are plain concurrent futures, which keeps the slots usable from any event loop.
+    """
+
+    def __init__(self, open_connection: Callable[[], Awaitable[aiosqlite.Connection]], max_connections: int):
+        self._open = open_connection
+        self.max_connections = max(1, max_connections)
+        self._lock = threading.Lock()
+        self._idle: List[aiosqlite.Connection] = []
+        self._waiters: Deque[concurrent.futures.Future] = deque()
+        self._size = 0
+        self._closed = False
+
+    async def acquire(self) -> aiosqlite.Connection:
+        """Check out a connection, opening a new one while below max_connections."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("SQLite connection pool is closed")
+            if self._idle:
+                return self._idle.pop()
+            waiter: Optional[concurrent.futures.Future] = None
+            if self._size < self.max_connections:
+                self._size += 1
+            else:
+                waiter = concurrent.futures.Future()
+                self._waiters.append(waiter)
+
+        # A waiter resolves to a released connection, or to None when a slot was freed up
+        connection = None
+        if waiter is not None:
+            try:
+                connection = await asyncio.wrap_future(waiter)
+            except asyncio.CancelledError:
+                # Hand back whatever was passed to us after we stopped waiting
+                if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                    await self.release(waiter.result())
+                raise
+            if connection is not None:
+                return connection
+
+        try:
+            return await self._open()
+        except BaseException:
+            await self.release(None)
+            raise
+
+    async def release(self, connection: Optional[aiosqlite.Connection], discard: bool = False) -> None:
+        """Return a connection, or give up its slot when it is discarded."""
+        if connection is not None and (discard or self._closed):
+            await _close_quietly(connection)
+            connection = None
+
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if waiter.set_running_or_notify_cancel():
+                    waiter.set_result(connection)
+                    return
+            if connection is None:
+                self._size -= 1
+            else:
+                self._idle.append(connection)
+
+    async def close(self) -> None:
+        """Close idle connections; checked-out connections close on release."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            waiters, self._waiters = list(self._waiters), deque()
+
+        for waiter in waiters:
+            if waiter.set_running_or_notify_cancel():
+                waiter.set_exception(RuntimeError("SQLite connection pool is closed"))
+        for connection in idle:
+            await _close_quietly(connection)
+
+
+class SQLiteConnectionPool:
+    """Read-only connections plus a single writer for one SQLite datasource.
+
+    Reads run in parallel on their own connections (each aiosqlite connection is one thread), while
+    writes go through the writer one at a time. The writer is opened first so that it can switch the
+    database to WAL mode, which lets the readers run alongside it.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pragmas: List[str],
+        read_pragmas: List[str],
+        read_connections: int,
+        immutable: bool = False,
+    ):
+        self.db_path = db_path
+        self.pragmas = pragmas
+        self.read_pragmas = read_pragmas
+        self.immutable = immutable
+        self.writer = SQLiteConnectionSlots(self._open_writer, 1)
+        # An in-memory database only exists on the connection that created it
+        in_memory = db_path in ("", ":memory:") or db_path.startswith("file::memory:")
+        self.readers: Optional[SQLiteConnectionSlots] = None
+        if not in_memory and read_connections > 0:
+            self.readers = SQLiteConnectionSlots(self._open_reader, read_connections)
+        self._writer_opened = False
+
+    @staticmethod
+    async def _connect(database: str, pragmas: List[str], **kwargs) -> aiosqlite.Connection:
+        connection = aiosqlite.connect(database, **kwargs)
+        # Idle pooled connections must not keep the interpreter from exiting
+        connection.daemon = True
+        await connection
+        await SQLiteConnection._apply_pragmas(connection, pragmas)
+        return connection
+
+    async def _open_writer(self) -> aiosqlite.Connection:
+        connection = await self._connect(self.db_path, self.pragmas)
+        self._writer_opened = True
+        return connection
+
+    async def _open_reader(self) -> aiosqlite.Connection:
+        # immutable skips locking and change detection entirely - only safe for files nothing writes to
+        uri = Path(self.db_path).resolve().as_uri() + ("?mode=ro&immutable=1" if self.immutable else "?mode=ro")
+        return await self._connect(uri, self.read_pragmas, uri=True)
+
+    @asynccontextmanager
+    async def checkout(self, read_only: bool) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read connection for read-only SQL, or the writer for anything else."""
+        slots = self.readers if read_only and self.readers is not None and self._writer_opened else self.writer
+        connection = await slots.acquire()
+        try:
+            yield connection
+        except BaseException:
+            if slots is self.writer and connection.in_transaction:
+                await connection.rollback()
+            await slots.release(connection)
+            raise
+        await slots.release(connection)
+
+    async def close(self) -> None:
+        """Close every idle connection of the pool."""
+        if self.readers is not None:
+            await self.readers.close()
+        await self.writer.close()
+
+
+# Pools are shared by every SQLiteConnection for the same datasource, keyed by datasource id
+_pools: Dict[int, Tuple[str, SQLiteConnectionPool]] = {}
+_pools_lock = threading.Lock()
+
+
 class SQLiteConnection(DatabaseConnection):
+    def __init__(self, connection: Union[aiosqlite.Connection, SQLiteConnectionPool], owns_pool: bool = False):
+        super().__init__(connection)
+        self.owns_pool = owns_pool
+
     def _convert_parameters(self, sql: str, parameters: Dict[str, Any]) -> Tuple[str, List[Any]]:
-        """Convert named parameters to SQLite ? placeholders."""
-        if not parameters:
-            return sql, []
+        """Convert named parameters to SQLite ? placeholders, binding IN lists as one JSON array."""
+        return bind_named_parameters(sql, parameters, lambda position: "?", bind_in_list=self._bind_in_list)
 
-        # SQLite uses ? for parameter placeholders
-        for key in parameters.keys():
-            sql = sql.replace(f":{key}", "?")
+    @staticmethod
+    def _bind_in_list(negated: bool, placeholder: str, values: List[Any]) -> Tuple[str, Any]:
+        # SQLite has no array type and caps the number of ? placeholders, so the list is read with json_each
+        operator = "NOT IN" if negated else "IN"
+        return f"{operator} (SELECT value FROM json_each({placeholder}))", json.dumps(values, default=str)
 
-        return sql, list(parameters.values())
+    @asynccontextmanager
+    async def _checkout(self, sql: str) -> AsyncIterator[aiosqlite.Connection]:
+        """Get a pooled connection suited to the statement (or the single wrapped connection)."""
+        if isinstance(self.connection, SQLiteConnectionPool):
+            async with self.connection.checkout(is_read_only_sql(sql)) as connection:
+                yield connection
+        else:
+            yield self.connection
 
     async def _execute_query(self, sql: str, param_values: List[Any]) -> Tuple[List[Tuple], List[str]]:
         """Execute SQLite query and return results with column names."""
-        cursor = await self.connection.execute(sql, param_values)
-        result = await cursor.fetchall()
+        async with self._checkout(sql) as connection:
+            cursor = await connection.execute(sql, param_values)
+            result = await cursor.fetchall()
+            if connection.in_transaction:
+                await connection.commit()
 
         # Get column names from cursor description
         columns = [desc[0] for desc in cursor.description] if cursor.description else []
 
         return result, columns
 
+    async def _stream_query(
+        self, sql: str, param_values: List[Any], batch_size: int
+    ) -> AsyncIterator[Tuple[List[Tuple], List[str]]]:
+        """Fetch SQLite results from the cursor batch by batch."""
+        async with self._checkout(sql) as connection:
+            cursor = await connection.execute(sql, param_values)
+            try:
+                columns = [desc[0] for desc in cursor.description] if cursor.description else []
+                while columns:
+                    rows = await cursor.fetchmany(batch_size)
+                    yield rows, columns
+                    if not rows:
+                        break
+            finally:
+                await cursor.close()
+            if connection.in_transaction:
+                await connection.commit()
+
+    async def _explain_query(self, sql: str, param_values: List[Any]) -> QueryPlan:
+        """Get the SQLite query plan steps - SQLite does not report a cost estimate."""
+        async with self._checkout(sql) as connection:
+            cursor = await connection.execute(f"EXPLAIN QUERY PLAN {sql}", param_values)
+            rows = await cursor.fetchall()
+
+        plan = [{"id": row[0], "parent": row[1], "detail": row[3]} for row in rows]
+        return QueryPlan(plan, "rows")
+
     async def close(self):
-        """Close the SQLite connection."""
-        await self.connection.close()
+        """Close the SQLite connection (shared pools stay open for other requests)."""
+        if isinstance(self.connection, SQLiteConnectionPool):
+            if self.owns_pool:
+                await self.connection.close()
+        else:
+            await self.connection.close()
+
+    @staticmethod
+    async def _apply_pragmas(connection: aiosqlite.Connection, pragmas: List[str]) -> None:
+        """Apply the SQLite tuning PRAGMAs, skipping ones the database rejects (e.g. read-only files)."""
+        for pragma in pragmas:
+            try:
+                await connection.execute(pragma)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not apply '{pragma}': {e}")
+
+    @classmethod
+    def _get_pool(
+        cls, datasource: Datasource, db_path: str
+    ) -> Tuple[SQLiteConnectionPool, Optional[SQLiteConnectionPool]]:
+        """Get the shared pool for the datasource, replacing it when its configuration changed.
+
+        Returns the pool and, if one was replaced, the stale pool that should be closed.
+        """
+        additional_params = datasource.additional_params or {}
+        overrides = {key: additional_params[key] for key in PRAGMA_PARAMS if key in additional_params}
+        pool_config = {
+            "db_path": db_path,
+            "pragmas": sqlite_pragmas(overrides),
+            "read_pragmas": sqlite_pragmas(overrides, read_only=True),
+            "read_connections": int(additional_params.get("read_connections", settings.sqlite_read_connections)),
+            "immutable": bool(additional_params.get("immutable", False)),
+        }
+
+        if datasource.id is None:
+            # Unsaved datasource (connection test) - private pool, closed with the connection
+            return SQLiteConnectionPool(**pool_config), None
+
+        fingerprint = repr(sorted(pool_config.items()))
+        with _pools_lock:
+            existing = _pools.get(datasource.id)
+            if existing and existing[0] == fingerprint:
+                return existing[1], None
+            pool = SQLiteConnectionPool(**pool_config)
+            _pools[datasource.id] = (fingerprint, pool)
+            return pool, existing[1] if existing else None
+
+    @classmethod
+    async def release_datasource(cls, datasource_id: int) -> None:
+        """Close the shared pool of a changed or deleted datasource; the next connection opens a new one."""
+        with _pools_lock:
+            existing = _pools.pop(datasource_id, None)
+        if existing:
+            await existing[1].close()
+
+    @classmethod
+    async def release_all(cls) -> None:
+        """Close every shared pool."""
+        with _pools_lock:
+            pools = [pool for _, pool in _pools.values()]
+            _pools.clear()
+        for pool in pools:
+            await pool.close()
 
     @classmethod
     async def create(cls, datasource: Datasource) -> "SQLiteConnection":
-        """Create a new SQLite connection."""
+        """Create a new SQLite connection backed by the datasource's shared pool."""
         try:
             if datasource.connection_string:
                 # Extract database path from connection string
@@ -48,7 +321,10 @@ class SQLiteConnection(DatabaseConnection):
             else:
                 db_path = datasource.database
 
-            connection = await aiosqlite.connect(db_path)
-            return cls(connection)
+            pool, stale_pool = cls._get_pool(datasource, db_path)
+            if stale_pool is not None:
+                await stale_pool.close()
+
+            return cls(pool, owns_pool=datasource.id is None)
         except Exception as e:
             cls._handle_connection_error(datasource, e)
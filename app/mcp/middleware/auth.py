@@ -1,15 +1,43 @@
 """Authentication middleware for MCP operations."""
 
 import logging
+import time
+from typing import Any, Dict
 
 from fastmcp.server.dependencies import get_http_headers
 from fastmcp.server.middleware import Middleware, MiddlewareContext
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.exceptions import AuthenticationError
 from app.core.jwt_validator import jwt_validator
 
 logger = logging.getLogger(__name__)
 
+# Validated token claims by authorization header, so tokens are decoded once rather than per message
+_claims_cache = TTLCache(max_entries=10000)
+
+
+def get_token_claims(auth_header: str) -> Dict[str, Any]:
+    """
+    Get the claims of a bearer token, validating it on first use.
+
+    Raises:
+        AuthenticationError: If the token is invalid or expired
+    """
+    claims = _claims_cache.get(auth_header)
+    if claims is not None:
+        return claims
+
+    claims = jwt_validator.validate_token(auth_header)
+    # Never cache claims past the token's expiry
+    ttl_seconds = settings.mcp_claims_cache_ttl_seconds
+    if claims.get("exp"):
+        ttl_seconds = min(ttl_seconds, claims["exp"] - time.time())
+    if ttl_seconds > 0:
+        _claims_cache.set(auth_header, claims, ttl_seconds)
+    return claims
+
 
 class AuthMiddleware(Middleware):
     """Middleware that checks for authentication."""
@@ -25,7 +53,7 @@ class AuthMiddleware(Middleware):
         # Skip the authentication check for the tools/list method
         # if context.method != 'tools/list' :
         try:
-            decoded_payload = jwt_validator.validate_token(auth_header)
+            decoded_payload = get_token_claims(auth_header)
             logger.debug(f"User ID: {decoded_payload}")
         except AuthenticationError as e:
             logger.warning(f"Authentication failed: {e.message}")
@@ -1,55 +1,41 @@
-from fastmcp import FastMCP
+"""Tool access middleware for MCP operations."""
+
+import logging
+
 from fastmcp.exceptions import ToolError
+from fastmcp.server.dependencies import get_http_headers
 from fastmcp.server.middleware import Middleware, MiddlewareContext
 
-mcp = FastMCP(
-    name="MyServer",
-    include_fastmcp_meta=True,  # include tags & FastMCP metadata under _meta._fastmcp
-)
+from app.core.exceptions import AuthenticationError
+from app.mcp.middleware.auth import get_token_claims
+from app.services.tool_access import get_roles, tool_access_index
 
+logger = logging.getLogger(__name__)
 
-# Tag your tools so you can filter them later
-@mcp.tool(tags={"public"})
-def greet(name: str) -> str:
-    return f"Hello, {name}!"
 
+def _get_caller_roles():
+    try:
+        claims = get_token_claims(get_http_headers().get("authorization", ""))
+    except AuthenticationError:
+        return []
+    return get_roles(claims)
 
-@mcp.tool(tags={"admin"})
-def purge_cache() -> str:
-    return "Cache purged."
 
+class ToolAccessMiddleware(Middleware):
+    """Middleware that limits the tools a caller can list and call to those their roles allow."""
 
-# Yet to implement role based access control
-class CustomizeToolsList(Middleware):
     async def on_list_tools(self, context: MiddlewareContext, call_next):
-        tools = await call_next(context)  # list[Tool] (FastMCP component objects)
-
-        # Example 1: filter by tag (hide admin-only tools for non-admins)
-        # is_admin = False  # swap for your real check (token/claims, etc.)
-        # if not is_admin:
-        #     tools = [t for t in tools if "admin" not in t.tags]
-
-        # Example 2: rename/retitle/add meta by returning transformed copies
-        # new_tools = []
-        # for t in tools:
-        #     if t.name == "greet":
-        #         t = Tool.from_tool(
-        #             t,
-        #             name="friendly_greet",
-        #             description="Say hello to a user by name.",
-        #             meta={"category": "examples", "priority": "low"},
-        #             tags={"public", "examples"},
-        #         )
-        #     new_tools.append(t)
-
-        return tools
+        """Called for tools/list."""
+        tools = await call_next(context)
+        if not tool_access_index.enabled:
+            return tools
+        return tool_access_index.filter(_get_caller_roles(), tools)
 
     async def on_call_tool(self, context: MiddlewareContext, call_next):
-        # Enforce the same policy at execution time
-        blocked = {"purge_cache"}  # hide/deny execution for tools you filtered out
-        if context.message.name in blocked:
-            raise ToolError("Access denied")
+        """Called for tools/call - enforces the same policy as the tool list."""
+        if tool_access_index.enabled:
+            roles = _get_caller_roles()
+            if not tool_access_index.is_allowed(roles, context.message.name):
+                logger.warning(f"Denied tool {context.message.name} for roles {roles}")
+                raise ToolError(f"Access denied to tool '{context.message.name}'")
         return await call_next(context)
-
-
-mcp.add_middleware(CustomizeToolsList())
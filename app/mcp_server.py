@@ -10,12 +10,22 @@ import concurrent.futures
 import inspect
 import sys
 import traceback
-from typing import Any, Callable, Dict, List, Optional
+from typing import Annotated, Any, Callable, Dict, List, Optional
 
 from fastmcp import Context
+from fastmcp.exceptions import NotFoundError
 from fastmcp.server.dependencies import get_http_headers
+from fastmcp.tools import Tool
+from pydantic import Field
 
+from app.core.cache import TTLCache
+from app.core.exceptions import AuthenticationError
 from app.database import get_db
+from app.mcp.middleware.auth import get_token_claims
+from app.models.schemas import ParameterDefinition, ResultProjection
+from app.services.change_bus import change_bus
+from app.services.parameter_validation import signature_parameter
+from app.services.tool_access import tool_access_index
 from app.services.tool_execution_service import ToolExecutionService
 from app.services.tool_service import ToolService
 
@@ -56,6 +66,18 @@ PYTHON_RESERVED_KEYWORDS = {
     "None",
 }
 
+# Arguments every tool accepts to have the database project, filter and sort its result, unless one of
+# the tool's own parameters has the same name
+RESULT_PARAMETERS = [
+    inspect.Parameter(
+        name,
+        inspect.Parameter.KEYWORD_ONLY,
+        annotation=Annotated[field.annotation, Field(description=field.description)],
+        default=None,
+    )
+    for name, field in ResultProjection.model_fields.items()
+]
+
 DEFAULT_ERROR_RESPONSE = {
     "success": False,
     "data": [],
@@ -67,6 +89,15 @@ DEFAULT_ERROR_RESPONSE = {
 }
 
 
+def _get_caller_id() -> Optional[str]:
+    """The authenticated user calling a tool, who may download its spilled result; None without a valid token."""
+    try:
+        claims = get_token_claims(get_http_headers().get("authorization", ""))
+    except AuthenticationError:
+        return None
+    return str(claims.get("user_id", claims.get("sub", "anonymous")))
+
+
 class MCPServer:
     """MCP Server class that provides various tools and functionality."""
 
@@ -75,8 +106,15 @@ class MCPServer:
         self.mcp = mcp_instance
         self.mcp.tool(self.ping)
         self.mcp.prompt(self.example_prompt)
+        # Registered database tools by tool ID
+        self._registered_tools: Dict[int, Tool] = {}
+        # Built MCP tools (signature and JSON schema) by tool ID and revision
+        self._tool_cache = TTLCache(max_entries=1000)
         self._register_database_tools()
 
+        # Tool changes made through any worker are applied to this worker's tool registry
+        change_bus.subscribe("tool", self._on_tool_change)
+
         # Example to add prompts, seem to be working only based on the annoation
         # self.mcp.add_prompt(self.example_prompt)
 
@@ -87,8 +125,7 @@ class MCPServer:
             tools = self._list_tools()
             self._log_debug(f"Found {len(tools)} tools in database")
 
-            for tool in tools:
-                self._register_single_tool(tool)
+            self._sync_tools(tools)
 
             self._log_debug("Finished registering database tools")
 
@@ -96,16 +133,66 @@ class MCPServer:
             self._log_error(f"Error registering database tools: {e}")
             traceback.print_exc(file=sys.stderr)
 
+    def _sync_tools(self, tools: List[Dict[str, Any]]) -> None:
+        """Register the given tools and unregister database tools that are no longer among them."""
+        tool_ids = {tool["id"] for tool in tools}
+        for tool_id in list(self._registered_tools):
+            if tool_id not in tool_ids:
+                self._unregister_tool(tool_id)
+
+        for tool in tools:
+            self._register_single_tool(tool)
+        self._rebuild_access_index()
+
     def _register_single_tool(self, tool: Dict[str, Any]) -> None:
-        """Register a single tool from the database."""
+        """Register a single tool from the database, replacing its previous registration."""
         try:
-            tool_func = self._create_tool_function(tool)
-            self.mcp.tool(tool_func)
+            key = (tool["id"], str(tool.get("updated_at")))
+            mcp_tool = self._tool_cache.get(key)
+            if mcp_tool is None:
+                mcp_tool = Tool.from_function(self._create_tool_function(tool), tags=set(tool.get("tags") or []))
+                self._tool_cache.set(key, mcp_tool)
+
+            if self._registered_tools.get(tool["id"]) is mcp_tool:
+                return
+            self._unregister_tool(tool["id"])
+            self.mcp.add_tool(mcp_tool)
+            self._registered_tools[tool["id"]] = mcp_tool
             self._log_debug(f"Registered tool: {tool['name']}")
 
         except Exception as tool_error:
             self._log_error(f"Failed to register tool {tool.get('name', 'unknown')}: {tool_error}")
 
+    def _unregister_tool(self, tool_id: int) -> None:
+        """Remove a database tool from the MCP server."""
+        mcp_tool = self._registered_tools.pop(tool_id, None)
+        if mcp_tool is None:
+            return
+        try:
+            self.mcp.remove_tool(mcp_tool.name)
+            self._log_debug(f"Unregistered tool: {mcp_tool.name}")
+        except NotFoundError:
+            pass
+
+    async def _on_tool_change(self, event) -> None:
+        """Apply a tool change published by any worker."""
+        if event.action == "refresh":
+            self._sync_tools(await self._list_tools_async())
+        elif event.action == "deleted":
+            self._unregister_tool(event.entity_id)
+        else:
+            tool = await self._get_tool_async(event.entity_id)
+            if tool:
+                self._register_single_tool(tool)
+            else:
+                self._unregister_tool(event.entity_id)
+        if event.action != "refresh":
+            self._rebuild_access_index()
+
+    def _rebuild_access_index(self) -> None:
+        """Recompute which roles can see which database tools."""
+        tool_access_index.rebuild({mcp_tool.name: mcp_tool.tags for mcp_tool in self._registered_tools.values()})
+
     def ping(self, ctx: Context, name: str = "World", tags: List[str] = ["ping"]) -> Dict[str, Any]:
         """Ping tool to get the info about the current request."""
 
@@ -174,26 +261,27 @@ class MCPServer:
         parameters: List[Dict[str, Any]],
     ) -> Callable:
         """Create a tool function that accepts parameters."""
-        param_names = [param["name"] for param in parameters]
-        valid_param_names, param_mapping = self._sanitize_parameter_names(param_names)
+        definitions = [ParameterDefinition.model_validate(param) for param in parameters]
+        valid_param_names, param_mapping = self._sanitize_parameter_names([param.name for param in definitions])
 
-        def tool_function(**kwargs):
+        async def tool_function(**kwargs):
             """Dynamic tool function with parameters."""
 
+            projection = self._pop_projection(kwargs, valid_param_names)
             parameters = self._map_parameters(kwargs, param_mapping)
-            return self.execute_tool_by_id(tool_id, parameters)
+            return await self.execute_tool_by_id(tool_id, parameters, projection)
 
-        self._set_function_metadata(tool_function, tool_name, description, valid_param_names)
+        self._set_function_metadata(tool_function, tool_name, description, valid_param_names, definitions)
         return tool_function
 
     def _create_simple_tool_function(self, tool_id: int, tool_name: str, description: str) -> Callable:
         """Create a tool function without parameters."""
 
-        def tool_function():
+        async def tool_function(**kwargs):
             """Dynamic tool function without parameters."""
 
             # Passed the token validation, now execute the tool
-            return self.execute_tool_by_id(tool_id, {})
+            return await self.execute_tool_by_id(tool_id, {}, self._pop_projection(kwargs, []))
 
         self._set_function_metadata(tool_function, tool_name, description, [])
         return tool_function
@@ -224,36 +312,54 @@ class MCPServer:
                 parameters[original_name] = value
         return parameters
 
+    def _pop_projection(self, kwargs: Dict[str, Any], param_names: List[str]) -> Optional[ResultProjection]:
+        """Take the result arguments out of the call arguments, leaving those named like a tool parameter."""
+        values = {
+            parameter.name: kwargs.pop(parameter.name)
+            for parameter in RESULT_PARAMETERS
+            if parameter.name in kwargs and parameter.name not in param_names
+        }
+        projection = ResultProjection.model_validate(values)
+        return None if projection.is_empty else projection
+
     def _set_function_metadata(
         self,
         func: Callable,
         name: str,
         description: str,
         param_names: Optional[List[str]] = None,
+        definitions: Optional[List[ParameterDefinition]] = None,
     ) -> None:
         """Set metadata for the tool function."""
         func.__name__ = name
         func.__doc__ = description
 
-        if param_names:
-            self._set_function_signature(func, param_names)
+        self._set_function_signature(func, param_names or [], definitions or [])
 
-    def _set_function_signature(self, func: Callable, param_names: List[str]) -> None:
-        """Set the function signature with the given parameter names."""
+    def _set_function_signature(
+        self,
+        func: Callable,
+        param_names: List[str],
+        definitions: List[ParameterDefinition],
+    ) -> None:
+        """Set the function signature: the given parameters, typed from their definitions, then the result arguments."""
         sig = inspect.signature(func)
         new_params = [
-            inspect.Parameter(param_name, inspect.Parameter.POSITIONAL_OR_KEYWORD, default=None)
-            for param_name in param_names
+            signature_parameter(param_name, definition) for param_name, definition in zip(param_names, definitions)
         ]
+        new_params += [parameter for parameter in RESULT_PARAMETERS if parameter.name not in param_names]
 
         func.__signature__ = sig.replace(parameters=new_params)
+        func.__annotations__ = {param.name: param.annotation for param in new_params}
         self._log_debug(f"Tool function signature: {func.__signature__}")
 
-    def execute_tool_by_id(self, tool_id: int, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a tool by its ID with parameters."""
+    async def execute_tool_by_id(
+        self, tool_id: int, parameters: Dict[str, Any], projection: Optional[ResultProjection] = None
+    ) -> Dict[str, Any]:
+        """Execute a tool by its ID with parameters, and the requested result columns, filters and ordering."""
         try:
             self._log_debug(f"Executing tool {tool_id} with parameters: {parameters}")
-            result = self._execute_tool_async(tool_id, parameters)
+            result = await self._execute_tool_async(tool_id, parameters, projection)
             self._log_debug(f"Tool execution result: {result}")
             return result
 
@@ -263,27 +369,14 @@ class MCPServer:
             # Preserve the response envelope expected by MCP clients
             return {**DEFAULT_ERROR_RESPONSE, "error": str(e)}
 
-    def _execute_tool_async(self, tool_id: int, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute tool asynchronously in a separate thread."""
-
-        async def _execute_tool_async():
-            async for db in get_db():
-                service = ToolExecutionService(db)
-                result = await service.execute_named_tool(tool_id, parameters)
-                return result.model_dump()
-
-        # Run in a new event loop to avoid conflicts with the main event loop
-        def run_in_new_loop():
-            new_loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(new_loop)
-            try:
-                return new_loop.run_until_complete(_execute_tool_async())
-            finally:
-                new_loop.close()
-
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(run_in_new_loop)
-            return future.result()
+    async def _execute_tool_async(
+        self, tool_id: int, parameters: Dict[str, Any], projection: Optional[ResultProjection] = None
+    ) -> Dict[str, Any]:
+        """Execute tool on the server's event loop, so concurrent tool calls don't block each other."""
+        async for db in get_db():
+            service = ToolExecutionService(db)
+            result = await service.execute_named_tool(tool_id, parameters, None, projection, owner=_get_caller_id())
+            return result.model_dump()
 
     def _list_tools(self) -> List[Dict[str, Any]]:
         """Get list of tools from database using sync wrapper."""
@@ -308,6 +401,12 @@ class MCPServer:
             tools = await tool_service.list_tools()
             return [tool.model_dump() for tool in tools]
 
+    async def _get_tool_async(self, tool_id: int) -> Optional[Dict[str, Any]]:
+        """Get a tool from database asynchronously."""
+        async for db in get_db():
+            tool = await ToolService(db).get_tool(tool_id)
+            return tool.model_dump() if tool else None
+
     def _log_debug(self, message: str) -> None:
         """Log debug message to stderr."""
         print(f"[DMCP DEBUG] {message}", file=sys.stderr)
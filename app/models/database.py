@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, JSON, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
@@ -121,11 +121,18 @@ class Tool(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, unique=True)
     description = Column(Text)
-    type = Column(String(50), nullable=False, default='query')
+    type = Column(String(50), nullable=False, default='query', index=True)
     sql = Column(Text, nullable=False)
-    datasource_id = Column(Integer, ForeignKey("datasources.id"), nullable=False)
+    datasource_id = Column(Integer, ForeignKey("datasources.id"), nullable=False, index=True)
     parameters = Column(JSON, default=[])
     tags = Column(JSON, default=lambda: [])
+    execution_options = Column(JSON, default=lambda: {})
+    # Template analysis computed when the tool is saved; NULL for tools saved before it existed
+    is_template = Column(Boolean, nullable=True)
+    template_variables = Column(JSON, nullable=True)
+    statement_kind = Column(String(10), nullable=True)
+    template_placeholders = Column(JSON, nullable=True)
+    table_dependencies = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc)
@@ -136,3 +143,29 @@ class Tool(Base):
 
     def __repr__(self):
         return f"<Tool(id={self.id}, name='{self.name}', type='{self.type}', datasource_id={self.datasource_id})>"         
+
+
+class ToolTag(Base):
+    """Link between a tool and one of its tags; tools.tags holds the same tag names for reading."""
+
+    __tablename__ = "tool_tags"
+
+    tool_id = Column(Integer, ForeignKey("tools.id", ondelete="CASCADE"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+    def __repr__(self):
+        return f"<ToolTag(tool_id={self.tool_id}, tag_id={self.tag_id})>"
+
+
+class ChangeEvent(Base):
+    __tablename__ = "change_events"
+
+    id = Column(Integer, primary_key=True)
+    entity_type = Column(String(50), nullable=False)
+    entity_id = Column(Integer, nullable=True)
+    action = Column(String(20), nullable=False)
+    payload = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
+
+    def __repr__(self):
+        return f"<ChangeEvent(id={self.id}, entity_type='{self.entity_type}', action='{self.action}')>"
@@ -31,6 +31,7 @@ class DatabaseType(str, Enum):
     MYSQL = "mysql"
     SQLITE = "sqlite"
     DATABRICKS = "databricks"
+    DUCKDB = "duckdb"
 
 
 class ParameterType(str, Enum):
@@ -55,6 +56,47 @@ class ParameterDefinition(BaseModel):
     validation: Optional[Dict[str, Any]] = Field(None, description="Validation rules")
 
 
+class ToolExecutionOptions(BaseModel):
+    """Per-tool execution settings."""
+
+    coalesce_requests: bool = Field(
+        False,
+        description="Share one database execution between identical concurrent calls (read-only tools only)",
+    )
+    max_cost: Optional[float] = Field(
+        None,
+        gt=0,
+        description="Reject executions whose estimated plan cost exceeds this value (PostgreSQL and MySQL only)",
+    )
+    max_rows: Optional[int] = Field(None, gt=0, description="Maximum number of rows returned per call")
+    max_bytes: Optional[int] = Field(None, gt=0, description="Maximum size of the returned rows as JSON, in bytes")
+    spill_to_file: bool = Field(
+        False,
+        description="Write the complete result of truncated calls to a file that can be downloaded by handle",
+    )
+    bind_parameters: Optional[bool] = Field(
+        None,
+        description="Send template values as bind parameters instead of literals (default: TEMPLATE_BIND_PARAMETERS)",
+    )
+    cache_ttl_seconds: Optional[float] = Field(
+        None,
+        gt=0,
+        description="Cache results for this many seconds; writes through dmcp to the tables read evict them early "
+        "(read-only tools only)",
+    )
+    refresh_after_seconds: Optional[float] = Field(
+        None,
+        gt=0,
+        description="Serve cached results older than this right away and refresh them in the background "
+        "(requires cache_ttl_seconds)",
+    )
+    prewarm_schedule: Optional[str] = Field(
+        None,
+        description="Cron expression (UTC) on which the result of a call without parameters is refreshed; "
+        "it is also refreshed at startup and when the tool is saved (requires cache_ttl_seconds)",
+    )
+
+
 class FieldDefinition(BaseModel):
     """Definition of a form field for datasource configuration."""
 
@@ -130,6 +172,9 @@ class ToolCreate(BaseModel):
     datasource_id: int = Field(..., description="ID of the datasource to use")
     parameters: Optional[List[ParameterDefinition]] = Field(default_factory=list, description="Parameter definitions")
     tags: Optional[List[str]] = Field(default_factory=list, description="List of tags for categorizing the tool")
+    execution_options: Optional[ToolExecutionOptions] = Field(
+        default_factory=ToolExecutionOptions, description="Execution settings"
+    )
 
 
 class ToolUpdate(BaseModel):
@@ -140,6 +185,7 @@ class ToolUpdate(BaseModel):
     datasource_id: Optional[int] = Field(None, description="ID of the datasource to use")
     parameters: Optional[List[ParameterDefinition]] = Field(None, description="Parameter definitions")
     tags: Optional[List[str]] = Field(None, description="List of tags for categorizing the tool")
+    execution_options: Optional[ToolExecutionOptions] = Field(None, description="Execution settings")
 
 
 class ToolResponse(BaseModel):
@@ -151,6 +197,13 @@ class ToolResponse(BaseModel):
     datasource_id: int
     parameters: List[ParameterDefinition]
     tags: List[str]
+    execution_options: ToolExecutionOptions = Field(default_factory=ToolExecutionOptions)
+    is_template: Optional[bool] = Field(None, description="Whether the SQL is a Jinja template")
+    template_variables: Optional[List[str]] = Field(None, description="Variables the SQL template reads")
+    statement_kind: Optional[str] = Field(None, description="Whether the SQL reads or writes data")
+    table_dependencies: Optional[Dict[str, Optional[List[str]]]] = Field(
+        None, description="Tables the SQL reads and writes; a list is null when the tables cannot be told"
+    )
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
@@ -171,6 +224,10 @@ class ToolResponse(BaseModel):
                     continue
             obj.parameters = converted_params
 
+        if hasattr(obj, "execution_options") and obj.execution_options is None:
+            # Tools created before execution options existed
+            obj.execution_options = {}
+
         return super().model_validate(obj)
 
 
@@ -188,9 +245,174 @@ class PaginationResponse(BaseModel):
     has_prev: bool
 
 
+class ToolListFilters(BaseModel):
+    """Filters for listing tools."""
+
+    tag: Optional[str] = Field(None, description="Only tools with this tag")
+    datasource_id: Optional[int] = Field(None, description="Only tools of this datasource")
+    type: Optional[str] = Field(None, description="Only tools of this type")
+    search: Optional[str] = Field(None, description="Only tools whose name contains this text")
+
+
+class ToolListResponse(BaseModel):
+    """One page of tools."""
+
+    items: List[ToolResponse]
+    pagination: PaginationResponse
+
+
+class FilterOperator(str, Enum):
+    EQ = "eq"
+    NE = "ne"
+    LT = "lt"
+    LTE = "lte"
+    GT = "gt"
+    GTE = "gte"
+    IN = "in"
+    NOT_IN = "not_in"
+    LIKE = "like"
+    IS_NULL = "is_null"
+    IS_NOT_NULL = "is_not_null"
+
+
+class SortDirection(str, Enum):
+    ASC = "asc"
+    DESC = "desc"
+
+
+class ResultFilter(BaseModel):
+    """Condition on one result column."""
+
+    column: str = Field(..., description="Result column")
+    op: FilterOperator = Field(FilterOperator.EQ, description="Comparison operator")
+    value: Optional[Any] = Field(None, description="Value to compare with - a list for in and not_in, none for is_null")
+
+
+class ResultOrder(BaseModel):
+    """Sort key on one result column."""
+
+    column: str = Field(..., description="Result column")
+    direction: SortDirection = Field(SortDirection.ASC, description="Sort direction")
+
+
+class ResultProjection(BaseModel):
+    """Columns, filters and ordering applied to a tool's result by the database."""
+
+    columns: Optional[List[str]] = Field(None, description="Only return these result columns, in this order")
+    filters: Optional[List[ResultFilter]] = Field(None, description="Only return rows matching all of these filters")
+    order_by: Optional[List[ResultOrder]] = Field(None, description="Sort the result by these columns")
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.columns or self.filters or self.order_by)
+
+
 class ToolExecutionRequest(BaseModel):
     parameters: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Tool parameters")
     pagination: Optional[PaginationRequest] = Field(None, description="Pagination settings")
+    columns: Optional[List[str]] = Field(None, description="Only return these result columns, in this order")
+    filters: Optional[List[ResultFilter]] = Field(None, description="Only return rows matching all of these filters")
+    order_by: Optional[List[ResultOrder]] = Field(None, description="Sort the result by these columns")
+
+    def get_projection(self) -> Optional[ResultProjection]:
+        """Get the columns, filters and ordering to apply to the result, if any were requested."""
+        projection = ResultProjection(columns=self.columns, filters=self.filters, order_by=self.order_by)
+        return None if projection.is_empty else projection
+
+
+class ToolExplainRequest(BaseModel):
+    parameters: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Tool parameters")
+
+
+class QueryPlanResponse(BaseModel):
+    sql: str = Field(..., description="Rendered SQL the plan was computed for")
+    database_type: str
+    format: str = Field(..., description="Plan format: json, rows or text")
+    plan: Any
+    estimated_cost: Optional[float] = Field(None, description="Estimated cost, when the database reports one")
+    cached: bool = Field(False, description="Plan was served from the plan cache")
+
+
+class LatencyProfile(BaseModel):
+    window_seconds: float = Field(..., description="Time span the latency percentiles cover")
+    executions: int = Field(0, description="Executions since the server started")
+    errors: int = Field(0, description="Failed executions since the server started")
+    last_executed_at: Optional[datetime] = None
+    sample_count: int = Field(0, description="Executions within the window")
+    mean_ms: Optional[float] = None
+    min_ms: Optional[float] = None
+    max_ms: Optional[float] = None
+    p50_ms: Optional[float] = None
+    p90_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+
+
+class SlowQueryEntry(BaseModel):
+    tool_id: Optional[int] = Field(None, description="Tool ID, or None for raw queries")
+    sql: str = Field(..., description="Rendered SQL")
+    parameter_fingerprint: str = Field(..., description="Hash of the parameter values")
+    execution_time_ms: float
+    timings: Dict[str, float] = Field(default_factory=dict, description="Milliseconds spent per execution phase")
+    row_count: int
+    result_bytes: int
+    error: Optional[str] = None
+    executed_at: datetime
+
+
+class ToolStatsResponse(BaseModel):
+    tool_id: int
+    latency: LatencyProfile
+    coalescing: Dict[str, int] = Field(default_factory=dict, description="Execution and coalesced call counts")
+    result_cache: Dict[str, float] = Field(
+        default_factory=dict, description="Stale results served, their staleness, background refresh counts and cost"
+    )
+    slow_queries: List[SlowQueryEntry] = Field(default_factory=list, description="Recent slow executions")
+
+
+class ToolJobRequest(BaseModel):
+    parameters: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Tool parameters")
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    TSV = "tsv"
+
+
+class ToolExportRequest(BaseModel):
+    parameters: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Tool parameters")
+    format: ExportFormat = Field(ExportFormat.CSV, description="csv, or tsv for tab-separated values")
+
+    @property
+    def delimiter(self) -> str:
+        """Field delimiter of the format."""
+        return "\t" if self.format == ExportFormat.TSV else ","
+
+    @property
+    def media_type(self) -> str:
+        """Content type of the format."""
+        return "text/tab-separated-values" if self.format == ExportFormat.TSV else "text/csv"
+
+
+class ToolJobResponse(BaseModel):
+    job_id: str
+    tool_id: int
+    status: str = Field(..., description="queued, running, succeeded, failed or cancelled")
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = Field(None, description="When the job and its result are removed")
+    columns: List[str] = Field(default_factory=list)
+    row_count: int = Field(0, description="Rows stored so far")
+    truncated: bool = Field(False, description="The result stopped at the job result size limit")
+    error: Optional[str] = None
+
+
+class ToolJobResultPage(BaseModel):
+    job_id: str
+    columns: List[str]
+    data: List[Dict[str, Any]]
+    pagination: PaginationResponse
 
 
 class RawQueryRequest(BaseModel):
@@ -208,6 +430,12 @@ class ToolExecutionResponse(BaseModel):
     execution_time_ms: float
     pagination: Optional[PaginationResponse]
     error: Optional[str] = None
+    coalesced: bool = Field(False, description="Result was shared from an identical in-flight execution")
+    cached: bool = Field(False, description="Result was served from the result cache")
+    truncated: bool = Field(False, description="Rows were left out because a row or byte limit was reached")
+    truncation_reason: Optional[str] = Field(None, description="Limit that truncated the result: max_rows or max_bytes")
+    result_handle: Optional[str] = Field(None, description="Handle for downloading the complete result, when spilled")
+    result_row_count: Optional[int] = Field(None, description="Number of rows in the spilled result")
 
 
 class QueryExecutionResponse(BaseModel):
@@ -296,6 +524,7 @@ class TagResponse(BaseModel):
     name: str
     description: Optional[str]
     color: Optional[str]
+    tool_count: int = Field(0, description="Number of tools with this tag")
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.database import ChangeEvent
+from .base import BaseRepository
+
+
+class ChangeEventRepository(BaseRepository[ChangeEvent]):
+    """Repository for the change event log shared by all workers."""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(ChangeEvent, db)
+
+    async def get_since(self, last_id: int, limit: int = 500) -> List[ChangeEvent]:
+        """Get events newer than last_id, oldest first."""
+        result = await self.db.execute(
+            select(ChangeEvent).where(ChangeEvent.id > last_id).order_by(ChangeEvent.id).limit(limit)
+        )
+        return result.scalars().all()
+
+    async def get_latest_id(self) -> Optional[int]:
+        """Get the ID of the newest event."""
+        result = await self.db.execute(select(func.max(ChangeEvent.id)))
+        return result.scalar_one_or_none()
+
+    async def delete_older_than(self, cutoff: datetime) -> int:
+        """Delete events created before the cutoff."""
+        result = await self.db.execute(delete(ChangeEvent).where(ChangeEvent.created_at < cutoff))
+        await self.db.commit()
+        return result.rowcount
@@ -1,9 +1,11 @@
-from typing import Optional
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..core.exceptions import TagNotFoundError
-from ..models.database import Tag
+from ..core.exceptions import DMCPError, TagNotFoundError
+from ..models.database import Tag, Tool, ToolTag
 from .base import BaseRepository
 
 
@@ -17,6 +19,21 @@ class TagRepository(BaseRepository[Tag]):
         """Get tag by name."""
         return await self.find_one_by(name=name)
 
+    async def get_all_with_counts(self) -> List[Tuple[Tag, int]]:
+        """Get all tags with the number of tools using each."""
+        result = await self.db.execute(
+            select(Tag, func.count(ToolTag.tool_id))
+            .outerjoin(ToolTag, ToolTag.tag_id == Tag.id)
+            .group_by(Tag.id)
+            .order_by(Tag.id)
+        )
+        return [(tag, count) for tag, count in result.all()]
+
+    async def get_tool_count(self, tag_id: int) -> int:
+        """Get the number of tools using a tag."""
+        result = await self.db.execute(select(func.count()).where(ToolTag.tag_id == tag_id))
+        return result.scalar_one()
+
     async def create_tag(self, **kwargs) -> Tag:
         """Create a new tag with validation."""
         existing = await self.get_by_name(kwargs.get("name"))
@@ -33,15 +50,42 @@ class TagRepository(BaseRepository[Tag]):
         return tag
 
     async def update_tag(self, tag_id: int, **kwargs) -> Optional[Tag]:
-        """Update tag by ID."""
+        """Update tag by ID. A new name is also applied to the tags of the tools using the tag."""
         tag = await self.get_by_id(tag_id)
         if not tag:
             raise TagNotFoundError(tag_id)
-        return await self.update(tag_id, **kwargs)
+
+        old_name = tag.name
+        try:
+            kwargs["updated_at"] = datetime.now(timezone.utc)
+            result = await self.db.execute(update(Tag).where(Tag.id == tag_id).values(**kwargs).returning(Tag))
+            updated_tag = result.scalar_one_or_none()
+            if kwargs.get("name", old_name) != old_name:
+                await self._rename_on_tools(tag_id, old_name, kwargs["name"])
+            await self.db.commit()
+            return updated_tag
+        except Exception as e:
+            await self.db.rollback()
+            raise DMCPError(f"Failed to update Tag: {str(e)}")
 
     async def delete_tag(self, tag_id: int) -> bool:
-        """Delete tag by ID."""
+        """Delete tag by ID, removing it from the tools using it."""
         tag = await self.get_by_id(tag_id)
         if not tag:
             raise TagNotFoundError(tag_id)
+
+        await self._rename_on_tools(tag_id, tag.name, None)
+        await self.db.execute(delete(ToolTag).where(ToolTag.tag_id == tag_id))
         return await self.delete(tag_id)
+
+    async def _rename_on_tools(self, tag_id: int, old_name: str, new_name: Optional[str]) -> None:
+        """Keep the tags column of the tools linked to a tag in sync (new_name=None removes the tag)."""
+        result = await self.db.execute(
+            select(Tool).where(Tool.id.in_(select(ToolTag.tool_id).where(ToolTag.tag_id == tag_id)))
+        )
+        now = datetime.now(timezone.utc)
+        for tool in result.scalars():
+            tags = [name for name in tool.tags or [] if name != old_name]
+            if new_name is not None:
+                tags.append(new_name)
+            await self.db.execute(update(Tool).where(Tool.id == tool.id).values(tags=tags, updated_at=now))
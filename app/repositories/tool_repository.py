@@ -1,14 +1,21 @@
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from ..core.exceptions import ToolNotFoundError
-from ..models.database import Tool
+from ..core.exceptions import DMCPError, ToolNotFoundError
+from ..models.database import Tag, Tool, ToolTag
+from ..models.schemas import ToolListFilters
 from .base import BaseRepository
 
 
+def _like_pattern(value: str) -> str:
+    """Escape LIKE wildcards in a value."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
 class ToolRepository(BaseRepository[Tool]):
     """Repository for tool operations."""
 
@@ -29,18 +36,60 @@ class ToolRepository(BaseRepository[Tool]):
         result = await self.db.execute(select(Tool).options(selectinload(Tool.datasource)))
         return result.scalars().all()
 
+    def _apply_filters(self, query, filters: Optional[ToolListFilters]):
+        if filters is None:
+            return query
+        if filters.tag:
+            tagged = select(ToolTag.tool_id).join(Tag, Tag.id == ToolTag.tag_id)
+            query = query.where(Tool.id.in_(tagged.where(Tag.name == filters.tag.strip().lower())))
+        if filters.datasource_id is not None:
+            query = query.where(Tool.datasource_id == filters.datasource_id)
+        if filters.type:
+            query = query.where(Tool.type == filters.type.lower())
+        if filters.search:
+            query = query.where(Tool.name.ilike(f"%{_like_pattern(filters.search)}%", escape="\\"))
+        return query
+
+    async def search(
+        self,
+        filters: Optional[ToolListFilters] = None,
+        offset: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tool]:
+        """Get tools matching the filters, ordered by ID."""
+        query = self._apply_filters(select(Tool), filters).order_by(Tool.id).offset(offset).limit(limit)
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def get_list_version(self, filters: Optional[ToolListFilters] = None) -> Tuple[int, Optional[datetime]]:
+        """Get the number of tools matching the filters and their latest update time."""
+        query = self._apply_filters(select(func.count(Tool.id), func.max(Tool.updated_at)), filters)
+        result = await self.db.execute(query)
+        count, last_updated = result.one()
+        return count, last_updated
+
     async def get_by_datasource(self, datasource_id: int) -> List[Tool]:
         """Get all tools for a specific datasource."""
         return await self.find_by(datasource_id=datasource_id)
 
     async def create_tool(self, **kwargs) -> Tool:
-        """Create a new tool with validation."""
+        """Create a new tool with validation, linking it to its tags."""
         # Check if tool with same name already exists
         existing = await self.get_by_name(kwargs.get("name"))
         if existing:
             raise ValueError(f"Tool with name '{kwargs['name']}' already exists")
 
-        return await self.create(**kwargs)
+        try:
+            tool = Tool(**kwargs)
+            self.db.add(tool)
+            await self.db.flush()
+            await self._link_tags(tool.id, tool.tags or [])
+            await self.db.commit()
+            await self.db.refresh(tool)
+            return tool
+        except Exception as e:
+            await self.db.rollback()
+            raise DMCPError(f"Failed to create Tool: {str(e)}")
 
     async def get_by_id(self, tool_id: int) -> Optional[Tool]:
         """Get tool by ID."""
@@ -54,11 +103,45 @@ class ToolRepository(BaseRepository[Tool]):
         tool = await self.get_by_id(tool_id)
         if not tool:
             raise ToolNotFoundError(tool_id)
-        return await self.update(tool_id, **kwargs)
+
+        try:
+            kwargs["updated_at"] = datetime.now(timezone.utc)
+            result = await self.db.execute(update(Tool).where(Tool.id == tool_id).values(**kwargs).returning(Tool))
+            updated_tool = result.scalar_one_or_none()
+            if updated_tool is not None and "tags" in kwargs:
+                await self._link_tags(tool_id, kwargs["tags"] or [])
+            await self.db.commit()
+            return updated_tool
+        except Exception as e:
+            await self.db.rollback()
+            raise DMCPError(f"Failed to update Tool: {str(e)}")
 
     async def delete_tool(self, tool_id: int) -> bool:
         """Delete tool by ID."""
         tool = await self.get_by_id(tool_id)
         if not tool:
             raise ToolNotFoundError(tool_id)
+        # Removed explicitly as well, since SQLite does not enforce the cascade by default
+        await self.db.execute(delete(ToolTag).where(ToolTag.tool_id == tool_id))
         return await self.delete(tool_id)
+
+    async def _link_tags(self, tool_id: int, names: Iterable[str]) -> None:
+        """Point the tool's tag links at the given tag names, creating tags that do not exist yet."""
+        names = set(names)
+        tags = (await self.db.execute(select(Tag).where(Tag.name.in_(names)))).scalars().all() if names else []
+        tag_ids = {tag.name: tag.id for tag in tags}
+        for name in names - set(tag_ids):
+            tag = Tag(name=name)
+            self.db.add(tag)
+            await self.db.flush()
+            tag_ids[name] = tag.id
+
+        linked = set((await self.db.execute(select(ToolTag.tag_id).where(ToolTag.tool_id == tool_id))).scalars())
+        wanted = set(tag_ids.values())
+        if linked - wanted:
+            await self.db.execute(
+                delete(ToolTag).where(ToolTag.tool_id == tool_id, ToolTag.tag_id.in_(linked - wanted))
+            )
+        for tag_id in wanted - linked:
+            self.db.add(ToolTag(tool_id=tool_id, tag_id=tag_id))
+        await self.db.flush()
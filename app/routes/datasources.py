@@ -212,6 +212,26 @@ async def get_datasource_field_config():
                     }
                 ],
             },
+            "duckdb": {
+                "database_type": DatabaseType.DUCKDB,
+                "fields": [
+                    FieldDefinition(
+                        name="database",
+                        type="text",
+                        label="Database File Path",
+                        required=True,
+                        placeholder="/path/to/reference.duckdb",
+                        description="Path to the DuckDB database file, opened read-only",
+                    )
+                ],
+                "sections": [
+                    {
+                        "id": "duckdb-config",
+                        "title": "DuckDB Configuration",
+                        "description": "Query a local DuckDB analytical file (read-only)",
+                    }
+                ],
+            },
         }
 
         return create_success_response(data=field_configs)
@@ -1,24 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.tool_execution_service import ToolExecutionService
 
+from ..core.exceptions import DMCPError, ParameterValidationError, handle_dmcp_error
 from ..core.responses import (
     create_success_response,
+    etag_matches,
     raise_http_error,
 )
 from ..database import get_db
 from ..models.schemas import (
+    PaginationRequest,
     StandardAPIResponse,
     ToolCreate,
     ToolExecutionRequest,
+    ToolExplainRequest,
+    ToolExportRequest,
+    ToolJobRequest,
+    ToolListFilters,
     ToolUpdate,
 )
+from ..services.tool_jobs import tool_jobs
 from ..services.tool_service import ToolService
 
 router = APIRouter(prefix="/tools", tags=["tools"])
 
 
+def _job_owner(request: Request) -> str:
+    """Jobs belong to the authenticated user that submitted them."""
+    user_info = getattr(request.state, "user", None) or {}
+    return str(user_info.get("user_id", user_info.get("sub", "anonymous")))
+
+
 @router.post("", response_model=StandardAPIResponse)
 async def create_tool(
     tool: ToolCreate,
@@ -36,12 +53,112 @@ async def create_tool(
 
 
 @router.get("", response_model=StandardAPIResponse)
-async def list_tools(db: AsyncSession = Depends(get_db)):
-    """List all available named tools."""
+async def list_tools(
+    request: Request,
+    response: Response,
+    page: Optional[int] = Query(None, ge=1, description="Page number (1-based); omit to list all tools"),
+    page_size: int = Query(50, ge=1, le=500, description="Number of tools per page"),
+    tag: Optional[str] = Query(None, description="Only tools with this tag"),
+    datasource_id: Optional[int] = Query(None, description="Only tools of this datasource"),
+    type: Optional[str] = Query(None, description="Only tools of this type"),
+    search: Optional[str] = Query(None, description="Only tools whose name contains this text"),
+    db: AsyncSession = Depends(get_db),
+):
+    """List the available named tools, optionally filtered and paginated."""
     try:
         service = ToolService(db)
-        result = await service.list_tools()
+        filters = ToolListFilters(tag=tag, datasource_id=datasource_id, type=type, search=search)
+        pagination = PaginationRequest(page=page, page_size=page_size) if page is not None else None
+
+        # Unchanged lists are answered from the client's copy without loading the tools
+        etag = await service.get_list_etag(filters, pagination)
+        if etag_matches(etag, request.headers.get("if-none-match")):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        if pagination is not None:
+            result = await service.list_tools_page(pagination, filters)
+        else:
+            result = await service.list_tools(filters)
+        response.headers["ETag"] = etag
+        return create_success_response(data=result)
+    except Exception as e:
+        raise_http_error(500, "Internal server error", [str(e)])
+
+
+@router.get("/slow", response_model=StandardAPIResponse)
+async def list_slow_queries(
+    tool_id: Optional[int] = Query(None, description="Only return slow queries of this tool"),
+    limit: int = Query(50, ge=1, le=1000, description="Maximum number of entries"),
+    db: AsyncSession = Depends(get_db),
+):
+    """List the most recent slow tool executions, newest first."""
+    try:
+        service = ToolExecutionService(db)
+        return create_success_response(data=service.get_slow_queries(tool_id, limit))
+    except Exception as e:
+        raise_http_error(500, "Internal server error", [str(e)])
+
+
+@router.get("/results/{handle}")
+async def download_result(
+    handle: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    """Download the complete result of a truncated tool execution as NDJSON."""
+    service = ToolExecutionService(db)
+    # Results of other users are not found, like their jobs
+    path = service.get_result_file(handle, _job_owner(request))
+    if not path:
+        raise_http_error(404, "Result not found or expired")
+    return FileResponse(path, media_type="application/x-ndjson", filename=f"{handle}.ndjson")
+
+
+@router.get("/jobs", response_model=StandardAPIResponse)
+async def list_jobs(request: Request):
+    """List the current user's tool jobs, newest first."""
+    try:
+        return create_success_response(data=tool_jobs.list_jobs(_job_owner(request)))
+    except Exception as e:
+        raise_http_error(500, "Internal server error", [str(e)])
+
+
+@router.get("/jobs/{job_id}", response_model=StandardAPIResponse)
+async def get_job(job_id: str, request: Request):
+    """Get the status of a tool job."""
+    try:
+        return create_success_response(data=tool_jobs.get(job_id, _job_owner(request)))
+    except DMCPError as e:
+        raise handle_dmcp_error(e)
+    except Exception as e:
+        raise_http_error(500, "Internal server error", [str(e)])
+
+
+@router.get("/jobs/{job_id}/results", response_model=StandardAPIResponse)
+async def get_job_results(
+    job_id: str,
+    request: Request,
+    page: int = Query(1, ge=1, description="Page number (1-based)"),
+    page_size: int = Query(1000, ge=1, le=10000, description="Number of rows per page"),
+):
+    """Get a page of the rows a tool job has stored so far."""
+    try:
+        pagination = PaginationRequest(page=page, page_size=page_size)
+        result = await tool_jobs.get_results(job_id, _job_owner(request), pagination)
         return create_success_response(data=result)
+    except DMCPError as e:
+        raise handle_dmcp_error(e)
+    except Exception as e:
+        raise_http_error(500, "Internal server error", [str(e)])
+
+
+@router.delete("/jobs/{job_id}", response_model=StandardAPIResponse)
+async def cancel_job(job_id: str, request: Request):
+    """Cancel a queued or running tool job, or delete a finished one with its result."""
+    try:
+        return create_success_response(data=await tool_jobs.cancel(job_id, _job_owner(request)))
+    except DMCPError as e:
+        raise handle_dmcp_error(e)
     except Exception as e:
         raise_http_error(500, "Internal server error", [str(e)])
 
@@ -105,16 +222,110 @@ async def delete_tool(
 async def execute_named_tool(
     tool_id: int,
     execution_request: ToolExecutionRequest,
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
     """Execute a named tool with parameters and pagination."""
     try:
         service = ToolExecutionService(db)
-        result = await service.execute_named_tool(tool_id, execution_request.parameters, execution_request.pagination)
+        result = await service.execute_named_tool(
+            tool_id,
+            execution_request.parameters,
+            execution_request.pagination,
+            execution_request.get_projection(),
+            owner=_job_owner(request),
+        )
         if result.error:
             raise_http_error(400, "Tool execution failed", [result.error])
         return create_success_response(data=result)
     except HTTPException:
         raise
+    except ParameterValidationError as e:
+        raise handle_dmcp_error(e)
+    except Exception as e:
+        raise_http_error(500, "Internal server error", [str(e)])
+
+
+@router.post("/{tool_id}/explain", response_model=StandardAPIResponse)
+async def explain_named_tool(
+    tool_id: int,
+    explain_request: ToolExplainRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Get the database query plan for a named tool with parameters, without executing it."""
+    try:
+        service = ToolExecutionService(db)
+        result = await service.explain_named_tool(tool_id, explain_request.parameters)
+        return create_success_response(data=result)
+    except DMCPError as e:
+        raise handle_dmcp_error(e)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise_http_error(500, "Internal server error", [str(e)])
+
+
+@router.post("/{tool_id}/export")
+async def export_named_tool(
+    tool_id: int,
+    export_request: ToolExportRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream the complete result of a read-only named tool as CSV or TSV with a header row."""
+    try:
+        service = ToolExecutionService(db)
+        chunks = service.export_named_tool(tool_id, export_request.parameters, export_request.delimiter)
+        # Errors before the first chunk, like invalid parameters, still get an error response
+        first_chunk = await anext(chunks, b"")
+    except DMCPError as e:
+        raise handle_dmcp_error(e)
+    except Exception as e:
+        raise_http_error(500, "Internal server error", [str(e)])
+
+    async def body():
+        try:
+            yield first_chunk
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    filename = f"tool-{tool_id}.{export_request.format.value}"
+    return StreamingResponse(
+        body(),
+        media_type=export_request.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/{tool_id}/stats", response_model=StandardAPIResponse)
+async def get_tool_stats(
+    tool_id: int,
+    db: AsyncSession = Depends(get_db),
+):
+    """Get the rolling latency profile and recent slow executions of a named tool."""
+    try:
+        service = ToolExecutionService(db)
+        result = await service.get_tool_stats(tool_id)
+        return create_success_response(data=result)
+    except DMCPError as e:
+        raise handle_dmcp_error(e)
+    except Exception as e:
+        raise_http_error(500, "Internal server error", [str(e)])
+
+
+@router.post("/{tool_id}/jobs", response_model=StandardAPIResponse, status_code=202)
+async def submit_tool_job(
+    tool_id: int,
+    job_request: ToolJobRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    """Run a named tool in the background and return its job right away."""
+    try:
+        result = await tool_jobs.submit(db, tool_id, job_request.parameters, _job_owner(request))
+        return create_success_response(data=result)
+    except DMCPError as e:
+        raise handle_dmcp_error(e)
     except Exception as e:
         raise_http_error(500, "Internal server error", [str(e)])
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..database import AsyncSessionLocal
+from ..models.database import ChangeEvent
+from ..repositories.change_event_repository import ChangeEventRepository
+
+logger = logging.getLogger(__name__)
+
+ChangeHandler = Callable[[ChangeEvent], Awaitable[None]]
+
+# How long a gap in event IDs (an insert that is not committed yet) holds back the poll position
+GAP_GRACE_SECONDS = 30.0
+
+
+class ChangeBus:
+    """
+    Propagates tool, datasource and tag changes to every worker process.
+
+    Changes are appended to the change_events table of the metadata database. Each worker polls the
+    table for events it has not seen yet and passes them to the subscribed handlers, which keep
+    in-process state (registered MCP tools, caches) consistent across workers.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        poll_interval_seconds: float = 1.0,
+        retention_seconds: float = 86400.0,
+    ):
+        self.session_factory = session_factory
+        self.poll_interval_seconds = poll_interval_seconds
+        self.retention_seconds = retention_seconds
+        self._handlers: Dict[str, List[ChangeHandler]] = defaultdict(list)
+        # Every event with an ID up to the watermark has been handled; _seen holds handled IDs above it
+        self._watermark: Optional[int] = None
+        self._seen: Set[int] = set()
+        self._stalled_since: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_prune = time.monotonic()
+
+    def subscribe(self, entity_type: str, handler: ChangeHandler) -> None:
+        """Call handler for every change to the entity type ("*" for all changes)."""
+        self._handlers[entity_type].append(handler)
+
+    async def publish(
+        self,
+        db: AsyncSession,
+        entity_type: str,
+        action: str,
+        entity_id: Optional[int] = None,
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Record a change for all workers and apply it to this worker right away.
+
+        Publishing happens after the change itself was committed, so a failure is logged rather than
+        raised - other workers then only catch up on their next full refresh.
+        """
+        try:
+            repository = ChangeEventRepository(db)
+            if self._watermark is None:
+                await self._init_watermark(repository)
+            await repository.create(entity_type=entity_type, entity_id=entity_id, action=action, payload=payload)
+            await self.poll()
+        except Exception as e:
+            logger.error(f"Failed to publish {entity_type} {action} event for {entity_id}: {e}")
+
+    async def poll(self) -> int:
+        """Handle new events and return how many were handled."""
+        async with self._get_lock():
+            async with self.session_factory() as db:
+                repository = ChangeEventRepository(db)
+                if self._watermark is None:
+                    await self._init_watermark(repository)
+                    return 0
+
+                events = await repository.get_since(self._watermark)
+
+            handled = 0
+            for event in events:
+                if event.id in self._seen:
+                    continue
+                self._seen.add(event.id)
+                await self._dispatch(event)
+                handled += 1
+
+            self._advance_watermark()
+            return handled
+
+    async def start(self) -> None:
+        """Start polling in the background. Events from before the start are not replayed."""
+        if self._task is not None:
+            return
+        await self.poll()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval_seconds)
+            try:
+                await self.poll()
+                await self._prune_if_due()
+            except Exception as e:
+                logger.warning(f"Failed to poll change events: {e}")
+
+    async def _dispatch(self, event: ChangeEvent) -> None:
+        for handler in self._handlers.get(event.entity_type, []) + self._handlers.get("*", []):
+            try:
+                await handler(event)
+            except Exception as e:
+                logger.error(f"Change handler failed for {event.entity_type} {event.action} {event.entity_id}: {e}")
+
+    async def _init_watermark(self, repository: ChangeEventRepository) -> None:
+        self._watermark = await repository.get_latest_id() or 0
+
+    def _advance_watermark(self) -> None:
+        while self._watermark + 1 in self._seen:
+            self._watermark += 1
+            self._seen.discard(self._watermark)
+
+        if not self._seen:
+            self._stalled_since = None
+            return
+
+        # A missing ID is an insert that is still in flight or was rolled back - stop waiting after a while
+        if self._stalled_since is None:
+            self._stalled_since = time.monotonic()
+        elif time.monotonic() - self._stalled_since > GAP_GRACE_SECONDS:
+            self._watermark = min(self._seen) - 1
+            self._stalled_since = None
+            self._advance_watermark()
+
+    async def _prune_if_due(self) -> None:
+        if time.monotonic() - self._last_prune < 3600:
+            return
+        self._last_prune = time.monotonic()
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.retention_seconds)
+        async with self.session_factory() as db:
+            removed = await ChangeEventRepository(db).delete_older_than(cutoff)
+        if removed:
+            logger.info(f"Pruned {removed} change events")
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+
+# Global change bus instance
+change_bus = ChangeBus(
+    poll_interval_seconds=settings.change_poll_interval_seconds,
+    retention_seconds=settings.change_event_retention_seconds,
+)
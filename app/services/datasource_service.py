@@ -7,6 +7,7 @@ from ..core.exceptions import DatasourceNotFoundError
 from ..database_connections import DatabaseConnectionManager
 from ..models.schemas import DatasourceCreate, DatasourceResponse
 from ..repositories.datasource_repository import DatasourceRepository
+from .change_bus import change_bus
 
 
 class DatasourceService:
@@ -115,6 +116,7 @@ class DatasourceService:
 
                 await self.db.commit()
                 await self.db.refresh(datasource)
+                await change_bus.publish(self.db, "datasource", "updated", datasource_id)
                 return DatasourceResponse(
                     id=datasource.id,
                     name=datasource.name,
@@ -132,6 +134,7 @@ class DatasourceService:
             else:
                 # No password update, use normal repository method
                 updated_datasource = await self.repository.update_datasource(datasource_id, **kwargs)
+                await change_bus.publish(self.db, "datasource", "updated", datasource_id)
                 return DatasourceResponse.model_validate(updated_datasource)
         except DatasourceNotFoundError:
             raise
@@ -143,7 +146,10 @@ class DatasourceService:
     async def delete_datasource(self, datasource_id: int) -> bool:
         """Delete a datasource by ID."""
         try:
-            return await self.repository.delete_datasource(datasource_id)
+            deleted = await self.repository.delete_datasource(datasource_id)
+            if deleted:
+                await change_bus.publish(self.db, "datasource", "deleted", datasource_id)
+            return deleted
         except DatasourceNotFoundError:
             raise
         except ValueError as e:
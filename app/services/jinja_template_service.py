@@ -1,26 +1,136 @@
 import re
-from typing import Any, Dict, Optional, Set
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from jinja2 import Environment, Template, TemplateError, Undefined
+from jinja2 import Environment, Template, TemplateError, Undefined, meta, nodes
 from jinja2.exceptions import SecurityError, UndefinedError
+from jinja2.sandbox import ImmutableSandboxedEnvironment
 
+from ..core.cache import TTLCache
+from ..core.config import settings
 from ..core.exceptions import ToolExecutionError
+from .sql_analysis import classify_statement, table_dependencies
+
+# Values of the expressions output while a template renders in bind mode
+_bound_values: ContextVar[List[Any]] = ContextVar("bound_values")
+
+# Stands in for a bound value in the rendered text until string literals are resolved
+_BIND_MARKER = "\0{}\0"
+_BIND_MARKER_RE = re.compile(r"\0(\d+)\0")
+_LITERAL_OR_MARKER_RE = re.compile(r"'(?:[^']|'')*'|\0(\d+)\0")
+
+_IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_$]*(\.[A-Za-z_][A-Za-z0-9_$]*)*$")
+
+# Builtin filters and globals templates may use; everything else is removed from the sandbox. Filters that
+# read attributes (map, select, groupby, ...) go through the sandbox's attribute checks. Left out are attr,
+# which bypasses the check for private attributes before rendering, random, whose results would be cached,
+# and the HTML filters
+ALLOWED_FILTERS = frozenset(
+    "abs batch capitalize center count d default dictsort first float format groupby indent int items join last"
+    " length list lower map max min reject rejectattr replace reverse round select selectattr slice sort string sum"
+    " title tojson trim truncate unique upper wordcount wordwrap".split()
+)
+ALLOWED_GLOBALS = frozenset({"dict", "namespace", "range"})
+
+# Compiled templates with their security verdict, by environment and source, so a tool's SQL is
+# parsed and checked once rather than on every call
+template_cache = TTLCache(max_entries=settings.template_cache_max_entries)
+
+
+class SQLText(str):
+    """Rendered SQL text that bind mode keeps in the statement instead of binding."""
+
+
+def sql_identifier(value) -> SQLText:
+    """Inline a column, table or keyword name, rejecting anything that is not a plain identifier."""
+    if not _IDENTIFIER_RE.match(str(value)):
+        raise ValueError(f"Invalid SQL identifier: {value!r}")
+    return SQLText(value)
+
+
+class TemplateAnalysis:
+    """
+    Facts about a tool's SQL, computed once when the tool is saved and stored on the tool.
+
+    placeholders lists the {{ }} expressions in template order, each with the variables it reads and
+    the filters applied to it, e.g. {"variables": ["ids"], "filters": ["sql_in"]}. tables holds the
+    tables the SQL reads and writes, {"reads": [...], "writes": [...]}, a list being None when unknown.
+    """
+
+    def __init__(
+        self,
+        is_template: bool,
+        variables: List[str],
+        statement_kind: str,
+        placeholders: Optional[List[Dict[str, Any]]] = None,
+        tables: Optional[Dict[str, Optional[List[str]]]] = None,
+    ):
+        self.is_template = is_template
+        self.variables = variables
+        self.statement_kind = statement_kind
+        self.placeholders = placeholders or []
+        self.tables = tables or {"reads": None, "writes": None}
+
+    @classmethod
+    def for_tool(cls, tool, database_type: Optional[str] = None) -> "TemplateAnalysis":
+        """Read the analysis stored on a tool, analyzing its SQL if the tool was saved before it existed."""
+        if tool.statement_kind is None or tool.table_dependencies is None:
+            return JinjaTemplateService().analyze_template(tool.sql, check_security=False, database_type=database_type)
+        return cls(
+            bool(tool.is_template),
+            tool.template_variables or [],
+            tool.statement_kind,
+            tool.template_placeholders,
+            tool.table_dependencies,
+        )
+
+    @property
+    def read_only(self) -> bool:
+        return self.statement_kind == "read"
+
+    def used_parameters(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """The parameters the SQL actually reads - other values cannot change the result."""
+        return {name: value for name, value in parameters.items() if name in self.variables}
+
+    def to_columns(self) -> Dict[str, Any]:
+        """The analysis as Tool column values."""
+        return {
+            "is_template": self.is_template,
+            "template_variables": self.variables,
+            "statement_kind": self.statement_kind,
+            "template_placeholders": self.placeholders,
+            "table_dependencies": self.tables,
+        }
 
 
 class JinjaTemplateService:
     """Service for compiling and rendering Jinja templates for SQL queries."""
 
     def __init__(self):
-        # Create a secure Jinja environment with custom undefined handling
-        self.env = Environment(
-            undefined=self._create_undefined_handler(),
+        # Create a sandboxed Jinja environment with custom undefined handling
+        self.env = self._create_environment(undefined=self._create_undefined_handler())
+
+        # Add custom filters for SQL operations
+        self._add_custom_filters()
+        self._bind_env: Optional[Environment] = None
+
+    @staticmethod
+    def _create_environment(**options) -> Environment:
+        """
+        Create a sandboxed environment limited to the allow-listed filters and globals.
+
+        The sandbox blocks private attributes and unsafe callables at render time and, being
+        immutable, rejects calls that modify lists and dicts passed in as parameters.
+        """
+        env = ImmutableSandboxedEnvironment(
             autoescape=False,  # SQL doesn't need HTML escaping
             trim_blocks=True,
             lstrip_blocks=True,
+            **options,
         )
-
-        # Add custom filters for SQL operations
-        self._add_custom_filters()
+        env.filters = {name: value for name, value in env.filters.items() if name in ALLOWED_FILTERS}
+        env.globals = {name: value for name, value in env.globals.items() if name in ALLOWED_GLOBALS}
+        return env
 
     def _create_undefined_handler(self):
         """Create a custom undefined handler for missing variables."""
@@ -89,14 +199,151 @@ class JinjaTemplateService:
             return f"'{str(value).replace('%', '\\%').replace('_', '\\_')}'"
 
         self.env.filters["sql_like"] = sql_like
+        self.env.filters["sql_identifier"] = sql_identifier
+
+    @property
+    def bind_env(self) -> Environment:
+        """Environment whose {{ }} expressions render as bind parameters instead of SQL literals."""
+        if self._bind_env is None:
+            self._bind_env = self._create_environment(undefined=self.env.undefined, finalize=self._bind_output)
+            self._bind_env.filters.update(
+                {
+                    # Values are bound as they are, so quoting and escaping are no longer needed
+                    "sql_quote": lambda value: value,
+                    # The list is bound as one value; each datasource decides how "IN :list" is sent
+                    "sql_in": lambda values: SQLText(self._bind_value(list(values or []))),
+                    "sql_like": lambda value: (
+                        value if value is None else str(value).replace("%", "\\%").replace("_", "\\_")
+                    ),
+                    "sql_identifier": sql_identifier,
+                }
+            )
+        return self._bind_env
+
+    @staticmethod
+    def _bind_value(value: Any) -> str:
+        values = _bound_values.get()
+        values.append(value)
+        return _BIND_MARKER.format(len(values) - 1)
+
+    def _bind_output(self, value: Any) -> str:
+        """Jinja finalize hook of the bind environment: bind the value of every {{ }} expression."""
+        if isinstance(value, SQLText):
+            return value
+        if isinstance(value, Undefined):
+            return ""
+        return self._bind_value(value)
 
     def compile_template(self, template_string: str) -> Template:
         """Compile a Jinja template string."""
         try:
-            return self.env.from_string(template_string)
+            return self._compile(self.env, "literal", template_string)[0]
+        except TemplateError as e:
+            raise ToolExecutionError(None, f"Template compilation error: {str(e)}")
+
+    @classmethod
+    def _compile(cls, env: Environment, mode: str, template_string: str) -> Tuple[Template, Optional[str]]:
+        """
+        Compile a template and check its security, reusing the result of an earlier call with the same source.
+
+        Returns:
+            The compiled template, and why it is unsafe (None if it passed the security check)
+        """
+        key = (mode, template_string)
+        entry = template_cache.get(key)
+        if entry is None:
+            ast = env.parse(template_string)
+            entry = (env.from_string(ast), cls._security_verdict(ast))
+            template_cache.set(key, entry)
+        return entry
+
+    @staticmethod
+    def _security_verdict(ast: nodes.Template) -> Optional[str]:
+        """
+        Check a parsed template for constructs the sandbox would only reject while rendering.
+
+        Variable names are not checked: the sandbox's only globals are the allow-listed ones, so any
+        other name can only be a tool parameter.
+        """
+        for node in ast.find_all((nodes.Getattr, nodes.Getitem)):
+            if isinstance(node, nodes.Getattr) and node.attr.startswith("_"):
+                return f"Access to private attribute detected: {node.attr}"
+            if (
+                isinstance(node, nodes.Getitem)
+                and isinstance(node.arg, nodes.Const)
+                and str(node.arg.value).startswith("_")
+            ):
+                return f"Access to private attribute detected: {node.arg.value}"
+        return None
+
+    @staticmethod
+    def _check_verdict(verdict: Optional[str]) -> None:
+        if verdict is not None:
+            raise SecurityError(verdict)
+
+    def analyze_template(
+        self, sql: str, check_security: bool = True, database_type: Optional[str] = None
+    ) -> TemplateAnalysis:
+        """
+        Analyze a tool's SQL once, so executions only read the stored result.
+
+        Args:
+            sql: SQL string that may contain Jinja2 template syntax
+            check_security: Reject templates with dangerous constructs
+            database_type: Datasource type whose SQL dialect the tables are read with
+
+        Returns:
+            The variables the template reads, its {{ }} placeholders, whether it reads or writes data and
+            the tables it reads and writes
+
+        Raises:
+            ToolExecutionError: If the template does not compile or fails the security check
+        """
+        statement_kind = classify_statement(sql)
+        tables = table_dependencies(sql, database_type)
+        if not self._has_template_syntax(sql):
+            return TemplateAnalysis(False, [], statement_kind, tables=tables)
+
+        try:
+            _, verdict = self._compile(self.env, "literal", sql)
+            if check_security:
+                self._check_verdict(verdict)
+            ast = self.env.parse(sql)
+        except SecurityError as e:
+            raise ToolExecutionError(None, f"Template security check failed: {str(e)}")
         except TemplateError as e:
             raise ToolExecutionError(None, f"Template compilation error: {str(e)}")
 
+        placeholders = []
+        for output in ast.find_all(nodes.Output):
+            for expression in output.nodes:
+                if isinstance(expression, nodes.TemplateData):
+                    continue
+                placeholders.append(
+                    {
+                        "variables": sorted({name.name for name in self._names(expression)}),
+                        "filters": [node.name for node in self._filter_chain(expression)],
+                    }
+                )
+
+        return TemplateAnalysis(True, sorted(meta.find_undeclared_variables(ast)), statement_kind, placeholders, tables)
+
+    @staticmethod
+    def _names(expression: nodes.Node) -> List[nodes.Name]:
+        """The variables read by an output expression, including the expression itself."""
+        if isinstance(expression, nodes.Name):
+            return [expression]
+        return list(expression.find_all(nodes.Name))
+
+    @staticmethod
+    def _filter_chain(expression: nodes.Node) -> List[nodes.Filter]:
+        """The filters applied to an output expression, innermost first."""
+        chain = []
+        while isinstance(expression, nodes.Filter):
+            chain.append(expression)
+            expression = expression.node
+        return list(reversed(chain))
+
     def render_template(
         self,
         template_string: str,
@@ -116,12 +363,12 @@ class JinjaTemplateService:
             Rendered SQL string
         """
         try:
-            # Compile the template
-            template = self.compile_template(template_string)
+            # Compile the template, with the security verdict reached when it was first compiled
+            template, verdict = self._compile(self.env, "literal", template_string)
 
             # Apply security restrictions if in safe mode
             if safe_mode:
-                self._validate_template_security(template_string, parameters)
+                self._check_verdict(verdict)
 
             # Pre-process parameters with defaults if provided
             processed_params = self._prepare_parameters(parameters, default_values)
@@ -146,41 +393,15 @@ class JinjaTemplateService:
             else:
                 raise ToolExecutionError(None, f"Template compilation error: {str(e)}")
 
+        except SecurityError as e:
+            raise ToolExecutionError(None, f"Template security check failed: {str(e)}")
+
         except TemplateError as e:
             raise ToolExecutionError(None, f"Template compilation error: {str(e)}")
 
         except Exception as e:
             raise ToolExecutionError(None, f"Template processing error: {str(e)}")
 
-    def _validate_template_security(self, template_string: str, parameters: Dict[str, Any]):
-        """Validate template for security concerns."""
-        # Check for potentially dangerous Jinja constructs
-        dangerous_patterns = [
-            r"{{\s*config\s*}}",
-            r"{{\s*request\s*}}",
-            r"{{\s*session\s*}}",
-            r"{{\s*g\s*}}",
-            r"{{\s*url_for\s*}}",
-            r"{{\s*get_flashed_messages\s*}}",
-        ]
-
-        for pattern in dangerous_patterns:
-            if re.search(pattern, template_string, re.IGNORECASE):
-                raise SecurityError(f"Potentially dangerous template construct detected: {pattern}")
-
-        # Check for file system access attempts
-        file_access_patterns = [
-            r"open\s*\(",
-            r"file\s*\(",
-            r"__import__\s*\(",
-            r"eval\s*\(",
-            r"exec\s*\(",
-        ]
-
-        for pattern in file_access_patterns:
-            if re.search(pattern, template_string, re.IGNORECASE):
-                raise SecurityError(f"Potentially dangerous function call detected: {pattern}")
-
     def _post_process_sql(self, sql: str) -> str:
         """Post-process the rendered SQL for common issues."""
         # Remove extra whitespace
@@ -200,13 +421,12 @@ class JinjaTemplateService:
             Dict of missing variables if any
         """
         try:
-            template = self.compile_template(template_string)
             missing_vars = {}
 
-            # Get all variable names from the template
-            template_vars = template.module.__code__.co_names
+            # Get all variable names the template reads
+            template_vars = meta.find_undeclared_variables(self.env.parse(template_string))
 
-            for var_name in template_vars:
+            for var_name in sorted(template_vars):
                 if var_name not in parameters and not var_name.startswith("_"):
                     missing_vars[var_name] = f"Required template variable '{var_name}' is missing"
 
@@ -218,18 +438,18 @@ class JinjaTemplateService:
     def get_template_variables(self, template_string: str) -> set:
         """Extract all variable names used in a template."""
         try:
-            template = self.compile_template(template_string)
-            return set(template.module.__code__.co_names)
+            return set(meta.find_undeclared_variables(self.env.parse(template_string)))
         except Exception:
             return set()
 
-    def process_sql_template(self, sql: str, parameters: Dict[str, Any]) -> str:
+    def process_sql_template(self, sql: str, parameters: Dict[str, Any], is_template: Optional[bool] = None) -> str:
         """
         Process SQL template with Jinja2 and parameters.
 
         Args:
             sql: SQL string that may contain Jinja2 template syntax
             parameters: Dictionary of parameters to substitute
+            is_template: Whether the SQL is a template, if already known from its analysis
 
         Returns:
             Processed SQL string with parameters substituted
@@ -237,13 +457,18 @@ class JinjaTemplateService:
         Raises:
             ToolExecutionError: If template processing fails
         """
-        try:
-            # Check if the SQL contains Jinja template syntax
-            if not self._has_template_syntax(sql):
-                return sql
+        # Check if the SQL contains Jinja template syntax
+        if not (self._has_template_syntax(sql) if is_template is None else is_template):
+            return sql
+
+        return self._render(self.env, "literal", sql, parameters)
 
+    def _render(self, env: Environment, mode: str, sql: str, parameters: Dict[str, Any]) -> str:
+        """Render a SQL template in the given environment, reporting failures as ToolExecutionError."""
+        try:
             # Create template and render with parameters
-            template = self.env.from_string(sql)
+            template, verdict = self._compile(env, mode, sql)
+            self._check_verdict(verdict)
             # Should not fail here if parameters are missing
             rendered_sql = template.render(**parameters)
             return rendered_sql
@@ -260,12 +485,71 @@ class JinjaTemplateService:
             else:
                 raise ToolExecutionError(None, f"Template compilation error: {str(e)}")
 
+        except SecurityError as e:
+            raise ToolExecutionError(None, f"Template security check failed: {str(e)}")
+
         except TemplateError as e:
             raise ToolExecutionError(None, f"Template compilation error: {str(e)}")
 
         except Exception as e:
             raise ToolExecutionError(None, f"Template processing error: {str(e)}")
 
+    def render_bound_sql(
+        self, sql: str, parameters: Dict[str, Any], is_template: Optional[bool] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Render a SQL template with the values of {{ }} expressions as bind parameters.
+
+        {% if %} and {% for %} blocks still shape the statement, but values are sent separately as
+        :bind_N parameters, so calls with the same structure produce the same SQL text and reuse the
+        database's cached plans. Use the sql_identifier filter for names that must stay in the SQL.
+
+        Args:
+            sql: SQL string that may contain Jinja2 template syntax
+            parameters: Dictionary of parameters to substitute
+            is_template: Whether the SQL is a template, if already known from its analysis
+
+        Returns:
+            Rendered SQL with :bind_N placeholders and the values by placeholder name
+
+        Raises:
+            ToolExecutionError: If template processing fails
+        """
+        if not (self._has_template_syntax(sql) if is_template is None else is_template):
+            return sql, {}
+
+        token = _bound_values.set([])
+        try:
+            rendered_sql = self._render(self.bind_env, "bind", sql, parameters)
+            return self._resolve_bind_markers(rendered_sql, _bound_values.get())
+        finally:
+            _bound_values.reset(token)
+
+    @staticmethod
+    def _resolve_bind_markers(rendered_sql: str, values: List[Any]) -> Tuple[str, Dict[str, Any]]:
+        """Turn bind markers into :bind_N placeholders, handling markers written inside string literals."""
+        bind_parameters: Dict[str, Any] = {}
+
+        def bind(value: Any) -> str:
+            name = f"bind_{len(bind_parameters) + 1}"
+            bind_parameters[name] = value
+            return f":{name}"
+
+        def replace(match: re.Match) -> str:
+            if match.group(1) is not None:
+                return bind(values[int(match.group(1))])
+
+            literal = match.group(0)
+            marker = _BIND_MARKER_RE.fullmatch(literal[1:-1])
+            if marker:
+                # '{{ value }}' - the whole literal becomes a text parameter
+                return bind(str(values[int(marker.group(1))]))
+
+            # Part of a longer literal, e.g. '%{{ name }}%' - the escaped text stays in the literal
+            return _BIND_MARKER_RE.sub(lambda m: str(values[int(m.group(1))]).replace("'", "''"), literal)
+
+        return _LITERAL_OR_MARKER_RE.sub(replace, rendered_sql), bind_parameters
+
     def _has_template_syntax(self, sql: str) -> bool:
         """Check if SQL contains Jinja template syntax."""
         template_indicators = ["{{", "{%", "{#"]
@@ -318,8 +602,8 @@ class JinjaTemplateService:
                 }
 
             # Parse template to extract variables
-            template = self.env.from_string(sql)
-            template_variables = self._extract_template_variables(template)
+            self.compile_template(sql)
+            template_variables = self._extract_template_variables(sql)
 
             # Check for missing required variables
             missing_vars = set()
@@ -336,12 +620,12 @@ class JinjaTemplateService:
         except Exception as e:
             raise ToolExecutionError(None, f"Template validation error: {str(e)}")
 
-    def _extract_template_variables(self, template) -> Set[str]:
+    def _extract_template_variables(self, sql: str) -> Set[str]:
         """
         Extract variable names from a Jinja2 template.
 
         Args:
-            template: Jinja2 template object
+            sql: Jinja2 template source
 
         Returns:
             Set of variable names used in the template
@@ -349,20 +633,15 @@ class JinjaTemplateService:
         variables = set()
 
         try:
-            # Get the AST (Abstract Syntax Tree) of the template
-            ast = template.environment.parse(template.source)
-
-            # Extract variable names from the AST
-            for node in ast.find_all(self.env.variable_start_string):
-                if hasattr(node, "name"):
-                    variables.add(node.name)
+            # Variables the template reads without assigning them itself (loop variables, {% set %})
+            variables.update(meta.find_undeclared_variables(self.env.parse(sql)))
 
         except Exception:
             # Fallback: try to extract variables using regex
             import re
 
             var_pattern = r"\{\{\s*(\w+)\s*\}\}"
-            matches = re.findall(var_pattern, template.source)
+            matches = re.findall(var_pattern, sql)
             variables.update(matches)
 
         return variables
@@ -385,8 +664,8 @@ class JinjaTemplateService:
                     "template_syntax": None,
                 }
 
-            template = self.env.from_string(sql)
-            variables = self._extract_template_variables(template)
+            self.compile_template(sql)
+            variables = self._extract_template_variables(sql)
 
             return {
                 "is_template": True,
@@ -0,0 +1,225 @@
+import inspect
+import json
+import logging
+import re
+from datetime import date, datetime
+from typing import Annotated, Any, Dict, List, Optional, Tuple
+
+from pydantic import AfterValidator, BeforeValidator, ConfigDict, Field, create_model
+from pydantic import ValidationError as PydanticValidationError
+
+from ..core.cache import TTLCache
+from ..core.exceptions import ParameterValidationError
+from ..models.schemas import ParameterDefinition, ParameterType
+
+logger = logging.getLogger(__name__)
+
+# Validation rule names and the pydantic Field constraint they map to
+_CONSTRAINT_RULES = {
+    "min": "ge",
+    "minimum": "ge",
+    "max": "le",
+    "maximum": "le",
+    "min_length": "min_length",
+    "max_length": "max_length",
+    "pattern": "pattern",
+}
+VALIDATION_RULES = set(_CONSTRAINT_RULES) | {"enum", "items"}
+
+
+def _parse_json_string(expected: type):
+    """Accept JSON-encoded arrays/objects (and comma separated arrays), as agents often send them as strings."""
+
+    def parse(value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+        stripped = value.strip()
+        if stripped.startswith(("[", "{")):
+            try:
+                return json.loads(stripped)
+            except ValueError:
+                return value
+        if expected is list:
+            return [item.strip() for item in stripped.split(",")] if stripped else []
+        return value
+
+    return BeforeValidator(parse)
+
+
+def _one_of(allowed: List[Any]):
+    def check(value: Any) -> Any:
+        if value not in allowed:
+            raise ValueError(f"must be one of {allowed}")
+        return value
+
+    return AfterValidator(check)
+
+
+def python_type(param_type: ParameterType, validation: Optional[Dict[str, Any]] = None) -> Any:
+    """Get the Python type (with coercion from strings) for a parameter type."""
+    validation = validation or {}
+
+    if param_type == ParameterType.ARRAY:
+        item_type = python_type(ParameterType(validation["items"])) if validation.get("items") else Any
+        return Annotated[List[item_type], _parse_json_string(list)]
+    if param_type == ParameterType.OBJECT:
+        return Annotated[Dict[str, Any], _parse_json_string(dict)]
+
+    return {
+        ParameterType.STRING: str,
+        ParameterType.INTEGER: int,
+        ParameterType.FLOAT: float,
+        ParameterType.BOOLEAN: bool,
+        ParameterType.DATE: date,
+        ParameterType.DATETIME: datetime,
+    }[param_type]
+
+
+def parameter_annotation(definition: ParameterDefinition, strict_rules: bool = False) -> Any:
+    """
+    Get the annotated type of a parameter, carrying its validation rules and JSON schema.
+
+    Raises:
+        ValueError: If a validation rule is invalid, or unknown with strict_rules
+    """
+    rules = dict(definition.validation or {})
+    unknown = set(rules) - VALIDATION_RULES
+    if unknown:
+        if strict_rules:
+            raise ValueError(f"Unknown validation rules for parameter '{definition.name}': {sorted(unknown)}")
+        logger.warning(f"Ignoring unknown validation rules for parameter '{definition.name}': {sorted(unknown)}")
+
+    if rules.get("pattern") is not None:
+        try:
+            re.compile(rules["pattern"])
+        except re.error as e:
+            raise ValueError(f"Invalid pattern for parameter '{definition.name}': {e}")
+
+    annotation = python_type(definition.type, rules)
+    constraints: Dict[str, Any] = {
+        constraint: rules[rule] for rule, constraint in _CONSTRAINT_RULES.items() if rules.get(rule) is not None
+    }
+    if "enum" in rules:
+        annotation = Annotated[annotation, _one_of(list(rules["enum"]))]
+        constraints["json_schema_extra"] = {"enum": list(rules["enum"])}
+    if constraints:
+        annotation = Annotated[annotation, Field(**constraints)]
+    return annotation
+
+
+def signature_parameter(param_name: str, definition: ParameterDefinition) -> inspect.Parameter:
+    """Get a typed function signature parameter for a definition, used for MCP tool input schemas."""
+    annotation = parameter_annotation(definition)
+    if not definition.required:
+        annotation = Optional[annotation]
+    if definition.description:
+        annotation = Annotated[annotation, Field(description=definition.description)]
+
+    # Keyword-only parameters, so required and optional parameters can keep their defined order
+    default = inspect.Parameter.empty if definition.required else definition.default
+    return inspect.Parameter(param_name, inspect.Parameter.KEYWORD_ONLY, annotation=annotation, default=default)
+
+
+class ParameterValidator:
+    """Validates and coerces the parameters of one tool, compiled once from its parameter definitions."""
+
+    def __init__(self, definitions: List[ParameterDefinition], strict_rules: bool = False):
+        self.names = [definition.name for definition in definitions]
+        # Optional parameters without a default are left out when not provided, so templates see them as undefined
+        self._unset_when_omitted = {
+            definition.name for definition in definitions if not definition.required and definition.default is None
+        }
+        fields = {
+            f"param_{index}": self._build_field(definition, strict_rules)
+            for index, definition in enumerate(definitions)
+        }
+        # Fields use generated names with the parameter name as alias, so any parameter name is allowed;
+        # parameters that are not defined are passed through unchanged
+        self.model = create_model(
+            "ToolParameters",
+            __config__=ConfigDict(extra="allow", populate_by_name=False),
+            **fields,
+        )
+
+    @staticmethod
+    def _build_field(definition: ParameterDefinition, strict_rules: bool) -> Tuple[Any, Any]:
+        annotation = parameter_annotation(definition, strict_rules)
+        if definition.required:
+            return annotation, Field(..., alias=definition.name)
+        return Optional[annotation], Field(definition.default, alias=definition.name, validate_default=True)
+
+    def validate(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply defaults, coercion and validation rules.
+
+        Raises:
+            ValueError: With one message per invalid parameter
+        """
+        # None means "not provided" for defined parameters, so their default applies
+        values = {key: value for key, value in parameters.items() if value is not None or key not in self.names}
+        try:
+            validated = self.model.model_validate(values)
+        except PydanticValidationError as e:
+            raise ValueError(self.format_errors(e.errors())) from None
+        return {
+            key: value
+            for key, value in validated.model_dump(by_alias=True).items()
+            if value is not None or key not in self._unset_when_omitted
+        }
+
+    def format_errors(self, errors: List[Dict[str, Any]]) -> str:
+        """Format pydantic errors as "name: message" pairs, using the parameter names."""
+        messages = []
+        for error in errors:
+            name = str(error["loc"][0]) if error["loc"] else "parameters"
+            if name.startswith("param_") and name[6:].isdigit():
+                name = self.names[int(name[6:])]
+            messages.append(f"{name}: {error['msg']}")
+        return "; ".join(messages)
+
+
+# Compiled validators by tool ID and revision
+_validators = TTLCache(max_entries=1000)
+
+
+def get_parameter_validator(tool) -> ParameterValidator:
+    """Get the compiled validator for a tool, compiling it on first use of each tool revision."""
+    key = (tool.id, str(tool.updated_at))
+    validator = _validators.get(key)
+    if validator is None:
+        definitions = [ParameterDefinition.model_validate(parameter) for parameter in tool.parameters or []]
+        validator = ParameterValidator(definitions)
+        _validators.set(key, validator)
+    return validator
+
+
+def validate_tool_parameters(tool, parameters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Validate and coerce parameters for a tool call before any database work."""
+    try:
+        return get_parameter_validator(tool).validate(parameters or {})
+    except ValueError as e:
+        raise ParameterValidationError(tool.id, str(e))
+
+
+def check_parameter_definitions(definitions: List[ParameterDefinition]) -> None:
+    """
+    Check that parameter definitions compile and their defaults are valid, when a tool is saved.
+
+    Raises:
+        ValueError: If a definition is invalid
+    """
+    names = [definition.name for definition in definitions]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate parameter names: {duplicates}")
+
+    try:
+        validator = ParameterValidator(definitions, strict_rules=True)
+        # Optional parameters fall back to their (validated) defaults; only report those errors
+        validator.model.model_validate({})
+    except PydanticValidationError as e:
+        invalid_defaults = [error for error in e.errors() if error["type"] != "missing"]
+        if invalid_defaults:
+            raise ValueError(f"Invalid parameter default: {validator.format_errors(invalid_defaults)}")
+    except Exception as e:
+        raise ValueError(f"Invalid parameter definitions: {e}")
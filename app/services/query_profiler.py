@@ -0,0 +1,247 @@
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from ..core.config import settings
+from ..models.schemas import LatencyProfile, SlowQueryEntry
+
+logger = logging.getLogger(__name__)
+
+# Rendered SQL kept in slow query entries is cut off after this many characters
+MAX_SLOW_QUERY_SQL_LENGTH = 4000
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram (HDR-style).
+
+    Bucket boundaries grow geometrically, so percentiles have a bounded relative error while memory
+    stays a few hundred counters no matter how many samples are recorded.
+    """
+
+    def __init__(self, precision: float = 0.02):
+        self._log_base = math.log1p(precision)
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+
+    def record(self, value_ms: float) -> None:
+        index = math.floor(math.log(max(value_ms, 0.001)) / self._log_base)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.min_ms = min(self.min_ms, value_ms)
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.min_ms = min(self.min_ms, other.min_ms)
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """Get the latency at the quantile (0-1), or None when nothing was recorded."""
+        if not self.count:
+            return None
+
+        rank = quantile * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # Middle of the bucket, clamped to the observed range
+                value = math.exp((index + 0.5) * self._log_base)
+                return min(max(value, self.min_ms), self.max_ms)
+        return self.max_ms
+
+
+class _ToolProfile:
+    """Rolling latency profile for one tool, made of the current and the previous time window."""
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self.window_started = time.monotonic()
+        self.current = LatencyHistogram()
+        self.previous = LatencyHistogram()
+        self.executions = 0
+        self.errors = 0
+        self.last_executed_at: Optional[datetime] = None
+
+    def rotate(self) -> None:
+        elapsed = time.monotonic() - self.window_started
+        if elapsed < self.window_seconds:
+            return
+
+        # Skip straight to an empty history when no calls were made for a whole window
+        self.previous = self.current if elapsed < 2 * self.window_seconds else LatencyHistogram()
+        self.current = LatencyHistogram()
+        self.window_started = time.monotonic()
+
+    def combined(self) -> LatencyHistogram:
+        histogram = LatencyHistogram()
+        histogram.merge(self.previous)
+        histogram.merge(self.current)
+        return histogram
+
+
+class PhaseTimer:
+    """Collects the duration of consecutive execution phases in milliseconds."""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._phase_started = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        """End the running phase under the given name and start the next one."""
+        now = time.perf_counter()
+        self.timings[phase] = round((now - self._phase_started) * 1000, 3)
+        self._phase_started = now
+
+
+class QueryProfiler:
+    """
+    Always-on latency profiles per tool and a bounded log of slow queries.
+
+    Recording a fast execution only updates a few counters; the rendered SQL, parameter fingerprint
+    and result size are only captured for executions above the slow query threshold.
+    """
+
+    def __init__(
+        self,
+        slow_query_threshold_ms: float = 1000.0,
+        slow_query_log_size: int = 200,
+        window_seconds: float = 300.0,
+    ):
+        self.slow_query_threshold_ms = slow_query_threshold_ms
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._profiles: Dict[int, _ToolProfile] = {}
+        self._slow_queries: Deque[SlowQueryEntry] = deque(maxlen=slow_query_log_size)
+
+    @staticmethod
+    def fingerprint_parameters(parameters: Dict[str, Any]) -> str:
+        """Fingerprint parameter values so slow calls can be grouped without storing the values."""
+        payload = json.dumps(parameters or {}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    def record(
+        self,
+        tool_id: Optional[int],
+        execution_time_ms: float,
+        sql: Optional[str] = None,
+        parameters: Optional[Dict[str, Any]] = None,
+        timings: Optional[Dict[str, float]] = None,
+        data: Optional[List[Dict[str, Any]]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Record one execution. Raw queries (tool_id None) only show up in the slow query log."""
+        try:
+            if tool_id is not None:
+                with self._lock:
+                    profile = self._profiles.get(tool_id)
+                    if profile is None:
+                        profile = self._profiles[tool_id] = _ToolProfile(self.window_seconds)
+                    profile.rotate()
+                    profile.current.record(execution_time_ms)
+                    profile.executions += 1
+                    profile.errors += 1 if error else 0
+                    profile.last_executed_at = datetime.now(timezone.utc)
+
+            if execution_time_ms >= self.slow_query_threshold_ms:
+                self._record_slow_query(tool_id, execution_time_ms, sql, parameters, timings, data, error)
+        except Exception as e:
+            # Profiling must never fail a tool call
+            logger.warning(f"Failed to record query profile for tool {tool_id}: {e}")
+
+    def _record_slow_query(
+        self,
+        tool_id: Optional[int],
+        execution_time_ms: float,
+        sql: Optional[str],
+        parameters: Optional[Dict[str, Any]],
+        timings: Optional[Dict[str, float]],
+        data: Optional[List[Dict[str, Any]]],
+        error: Optional[str],
+    ) -> None:
+        entry = SlowQueryEntry(
+            tool_id=tool_id,
+            sql=(sql or "")[:MAX_SLOW_QUERY_SQL_LENGTH],
+            parameter_fingerprint=self.fingerprint_parameters(parameters or {}),
+            execution_time_ms=round(execution_time_ms, 3),
+            timings=timings or {},
+            row_count=len(data or []),
+            result_bytes=len(json.dumps(data or [], default=str).encode()),
+            error=error,
+            executed_at=datetime.now(timezone.utc),
+        )
+        with self._lock:
+            self._slow_queries.append(entry)
+
+        logger.info(f"Slow query for tool {tool_id}: {entry.execution_time_ms}ms, {entry.row_count} rows")
+
+    def get_profile(self, tool_id: int) -> LatencyProfile:
+        """Get the rolling latency profile of a tool."""
+        with self._lock:
+            profile = self._profiles.get(tool_id)
+            if profile is None:
+                return LatencyProfile(window_seconds=self.window_seconds * 2)
+
+            profile.rotate()
+            histogram = profile.combined()
+            executions, errors, last_executed_at = profile.executions, profile.errors, profile.last_executed_at
+
+        return LatencyProfile(
+            window_seconds=self.window_seconds * 2,
+            executions=executions,
+            errors=errors,
+            last_executed_at=last_executed_at,
+            sample_count=histogram.count,
+            mean_ms=round(histogram.total_ms / histogram.count, 3) if histogram.count else None,
+            min_ms=round(histogram.min_ms, 3) if histogram.count else None,
+            max_ms=round(histogram.max_ms, 3) if histogram.count else None,
+            p50_ms=self._round(histogram.percentile(0.50)),
+            p90_ms=self._round(histogram.percentile(0.90)),
+            p95_ms=self._round(histogram.percentile(0.95)),
+            p99_ms=self._round(histogram.percentile(0.99)),
+        )
+
+    def get_slow_queries(self, tool_id: Optional[int] = None, limit: int = 50) -> List[SlowQueryEntry]:
+        """Get the most recent slow queries, newest first, optionally for one tool."""
+        with self._lock:
+            entries = list(self._slow_queries)
+
+        entries.reverse()
+        if tool_id is not None:
+            entries = [entry for entry in entries if entry.tool_id == tool_id]
+        return entries[:limit]
+
+    def reset(self, tool_id: Optional[int] = None) -> None:
+        """Forget the profile of one tool, or of all tools and the slow query log."""
+        with self._lock:
+            if tool_id is None:
+                self._profiles.clear()
+                self._slow_queries.clear()
+            else:
+                self._profiles.pop(tool_id, None)
+
+    @staticmethod
+    def _round(value: Optional[float]) -> Optional[float]:
+        return round(value, 3) if value is not None else None
+
+
+# Global query profiler instance
+query_profiler = QueryProfiler(
+    slow_query_threshold_ms=settings.slow_query_threshold_ms,
+    slow_query_log_size=settings.slow_query_log_size,
+    window_seconds=settings.latency_window_seconds,
+)
@@ -0,0 +1,129 @@
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..models.schemas import PaginationRequest, ResultProjection, ToolExecutionResponse
+
+logger = logging.getLogger(__name__)
+
+
+class RequestCoalescer:
+    """
+    Single-flight execution for identical concurrent tool calls.
+
+    The first call for a key runs the query; calls with the same key that arrive while it is in flight
+    wait for it and share its result. Waiters use thread-safe futures, so calls made from different
+    event loops (e.g. MCP tool calls) are coalesced as well.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, concurrent.futures.Future] = {}
+        self._executions: Dict[int, int] = defaultdict(int)
+        self._coalesced: Dict[int, int] = defaultdict(int)
+
+    @staticmethod
+    def make_key(
+        tool_id: int,
+        sql_version: str,
+        parameters: Dict[str, Any],
+        pagination: Optional[PaginationRequest] = None,
+        projection: Optional[ResultProjection] = None,
+    ) -> str:
+        """
+        Build the coalescing key for a tool call.
+
+        Args:
+            tool_id: ID of the tool
+            sql_version: Identifies the tool SQL revision, so calls made across an update are never shared
+            parameters: Call parameters
+            pagination: Pagination settings, if any
+            projection: Requested columns, filters and ordering, if any
+
+        Returns:
+            Hex digest identifying identical calls
+        """
+        payload = json.dumps(
+            {
+                "tool_id": tool_id,
+                "sql_version": sql_version,
+                "parameters": parameters,
+                "pagination": pagination.model_dump() if pagination else None,
+                "projection": projection.model_dump(mode="json") if projection else None,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def run(
+        self,
+        tool_id: int,
+        key: str,
+        execute: Callable[[], Awaitable[ToolExecutionResponse]],
+    ) -> ToolExecutionResponse:
+        """Run execute() for the key, or wait for the identical call already in flight."""
+        while True:
+            with self._lock:
+                future = self._in_flight.get(key)
+                is_leader = future is None
+                if is_leader:
+                    future = concurrent.futures.Future()
+                    self._in_flight[key] = future
+                    self._executions[tool_id] += 1
+                else:
+                    self._coalesced[tool_id] += 1
+
+            if is_leader:
+                return await self._lead(key, future, execute)
+
+            try:
+                # Shield so a cancelled waiter doesn't cancel the shared future for everyone else
+                result = await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    # The leading call was cancelled rather than this one - run it again
+                    continue
+                raise
+
+            logger.debug(f"Coalesced call to tool {tool_id} onto an in-flight execution")
+            return result.model_copy(update={"coalesced": True})
+
+    async def _lead(
+        self,
+        key: str,
+        future: concurrent.futures.Future,
+        execute: Callable[[], Awaitable[ToolExecutionResponse]],
+    ) -> ToolExecutionResponse:
+        try:
+            result = await execute()
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._in_flight.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def get_stats(self, tool_id: int) -> Dict[str, int]:
+        """Get the number of executions and coalesced calls for a tool."""
+        with self._lock:
+            return {
+                "executions": self._executions.get(tool_id, 0),
+                "coalesced": self._coalesced.get(tool_id, 0),
+            }
+
+
+# Global request coalescer instance
+request_coalescer = RequestCoalescer()
@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models.schemas import ToolExecutionResponse
+
+logger = logging.getLogger(__name__)
+
+# (datasource ID, tool ID, tables the tool reads or None when unknown, call key)
+ResultKey = Tuple[int, int, Optional[FrozenSet[str]], str]
+
+
+class ResultCache:
+    """
+    Results of read-only tool calls, kept for the TTL the tool sets.
+
+    Entries are keyed by datasource and by the tables their tool reads, so a write made through dmcp
+    evicts the results that depend on the tables it writes right away instead of when they expire.
+    Writes made outside dmcp are only picked up once an entry's TTL has passed.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self._cache = TTLCache(max_entries=max_entries)
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a result read before a write is not stored after it
+        self._generations: Dict[int, int] = defaultdict(int)
+        self._invalidations = 0
+
+    @staticmethod
+    def make_key(datasource_id: int, tool_id: int, read_tables: Optional[List[str]], call_key: str) -> ResultKey:
+        """Build the cache key of a tool call from its coalescing key and the tables the tool reads."""
+        return (datasource_id, tool_id, frozenset(read_tables) if read_tables is not None else None, call_key)
+
+    def get(self, key: ResultKey) -> Optional[ToolExecutionResponse]:
+        """Get a cached result, or None if there is none or it expired."""
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: ResultKey) -> Optional[Tuple[ToolExecutionResponse, float]]:
+        """Get a cached result and its age in seconds, or None if there is none or it expired."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        return result.model_copy(update={"cached": True, "coalesced": False}), time.monotonic() - stored_at
+
+    def generation(self, datasource_id: int) -> int:
+        """Get the invalidation generation of a datasource, to pass to set() once the result is read."""
+        with self._lock:
+            return self._generations[datasource_id]
+
+    def set(self, key: ResultKey, result: ToolExecutionResponse, ttl_seconds: float, generation: int) -> bool:
+        """
+        Store a result read at the given generation, unless a write invalidated the datasource meanwhile.
+
+        Failed calls are not stored, nor are spilled results, whose file expires on its own schedule.
+        """
+        if not result.success or result.result_handle is not None:
+            return False
+
+        with self._lock:
+            if self._generations[key[0]] != generation:
+                return False
+            self._cache.set(key, (time.monotonic(), result), ttl_seconds)
+        return True
+
+    def invalidate_tables(self, datasource_id: int, tables: Optional[List[str]]) -> int:
+        """
+        Evict the results of a datasource that read any of the tables.
+
+        Args:
+            datasource_id: Datasource that was written
+            tables: Tables that were written, or None when unknown, which evicts every result of the datasource
+
+        Returns:
+            Number of results evicted
+        """
+        written = frozenset(tables) if tables is not None else None
+
+        def depends(key: ResultKey) -> bool:
+            if key[0] != datasource_id:
+                return False
+            return written is None or key[2] is None or not key[2].isdisjoint(written)
+
+        with self._lock:
+            self._generations[datasource_id] += 1
+            self._invalidations += 1
+            evicted = self._cache.evict(depends)
+        if evicted:
+            logger.debug(f"Evicted {evicted} cached results of datasource {datasource_id} after a write")
+        return evicted
+
+    def evict_datasource(self, datasource_id: int) -> int:
+        """Evict every result of a datasource."""
+        return self.invalidate_tables(datasource_id, None)
+
+    def evict_tool(self, tool_id: int) -> int:
+        """Evict every result of a tool."""
+        return self._cache.evict(lambda key: key[1] == tool_id)
+
+    def clear(self) -> None:
+        """Remove all results."""
+        self._cache.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get the entry count, hit/miss counters and number of invalidations."""
+        with self._lock:
+            invalidations = self._invalidations
+        return {**self._cache.get_stats(), "invalidations": invalidations}
+
+
+# Global result cache instance
+result_cache = ResultCache(max_entries=settings.result_cache_max_entries)
@@ -0,0 +1,261 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from ..core.config import settings
+from ..datasources import DatabaseConnection
+from ..models.schemas import ToolExecutionOptions
+
+logger = logging.getLogger(__name__)
+
+_HANDLE_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _smallest_limit(*limits: Optional[int]) -> Optional[int]:
+    values = [limit for limit in limits if limit]
+    return min(values) if values else None
+
+
+class ResultLimits:
+    """Row and byte limits for one tool execution."""
+
+    def __init__(self, max_rows: Optional[int] = None, max_bytes: Optional[int] = None, spill: bool = False):
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.spill = spill
+
+    @classmethod
+    def for_tool(cls, options: Optional[ToolExecutionOptions] = None) -> "ResultLimits":
+        """Combine a tool's limits with the global ones - the smaller limit wins."""
+        options = options or ToolExecutionOptions()
+        return cls(
+            max_rows=_smallest_limit(options.max_rows, settings.result_max_rows),
+            max_bytes=_smallest_limit(options.max_bytes, settings.result_max_bytes),
+            spill=options.spill_to_file,
+        )
+
+    @property
+    def batch_size(self) -> int:
+        """Fetch batch size - no more than one row past the row limit unless the rest is spilled."""
+        if self.max_rows and not self.spill:
+            return min(settings.result_fetch_batch_size, self.max_rows + 1)
+        return settings.result_fetch_batch_size
+
+
+class LimitedResult:
+    """Rows returned to the caller, plus truncation and spill details."""
+
+    def __init__(self):
+        self.rows: List[Dict[str, Any]] = []
+        self.byte_count = 0
+        self.truncation_reason: Optional[str] = None
+        self.result_handle: Optional[str] = None
+        self.result_row_count: Optional[int] = None
+
+    @property
+    def truncated(self) -> bool:
+        return self.truncation_reason is not None
+
+
+class SpillFile:
+    """NDJSON file receiving the complete result of a truncated execution."""
+
+    def __init__(self, handle: str, path: str, max_bytes: int):
+        self.handle = handle
+        self.path = path
+        self.max_bytes = max_bytes
+        self.row_count = 0
+        self.byte_count = 0
+        self.complete = True
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            line = json.dumps(row, default=str) + "\n"
+            if self.byte_count + len(line) > self.max_bytes:
+                self.complete = False
+                return
+            self._file.write(line)
+            self.byte_count += len(line)
+            self.row_count += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ResultSpillStore:
+    """Directory of spilled results, addressed by random handles and removed after a TTL."""
+
+    def __init__(self, directory: Optional[str] = None, ttl_seconds: float = 3600.0, max_bytes: int = 1 << 30):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "dmcp-results")
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._last_cleanup = 0.0
+
+    def create(self, owner: Optional[str] = None) -> SpillFile:
+        """Start a new spill file, downloadable by its owner."""
+        os.makedirs(self.directory, exist_ok=True)
+        self.cleanup_expired()
+        handle = uuid.uuid4().hex
+        if owner is not None:
+            self.grant(handle, owner)
+        return SpillFile(handle, self._path(handle), self.max_bytes)
+
+    def grant(self, handle: str, owner: str) -> None:
+        """Allow another user to download a spilled result, e.g. one shared by coalesced or cached calls."""
+        if not _HANDLE_RE.match(handle or "") or owner in self._owners(handle):
+            return
+        with self._lock, open(self._owners_path(handle), "a", encoding="utf-8") as owners:
+            owners.write(owner + "\n")
+
+    def get_path(self, handle: str, owner: Optional[str] = None) -> Optional[str]:
+        """
+        Get the file of a handle, or None if it is unknown or expired.
+
+        With an owner, files that were not created for or granted to that user are not found either.
+        """
+        if not _HANDLE_RE.match(handle or ""):
+            return None
+        if owner is not None and owner not in self._owners(handle):
+            return None
+
+        path = self._path(handle)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                return None
+        except OSError:
+            return None
+        return path
+
+    def cleanup_expired(self, force: bool = False) -> int:
+        """Remove expired spill files - runs at most once a minute unless forced."""
+        with self._lock:
+            if not force and time.monotonic() - self._last_cleanup < 60:
+                return 0
+            self._last_cleanup = time.monotonic()
+
+        removed = 0
+        cutoff = time.time() - self.ttl_seconds
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return 0
+
+        for entry in entries:
+            try:
+                if entry.name.endswith((".ndjson", ".owners")) and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += entry.name.endswith(".ndjson")
+            except OSError:
+                continue
+        return removed
+
+    def _owners(self, handle: str) -> List[str]:
+        try:
+            with open(self._owners_path(handle), encoding="utf-8") as owners:
+                return owners.read().splitlines()
+        except OSError:
+            return []
+
+    def _path(self, handle: str) -> str:
+        return os.path.join(self.directory, f"{handle}.ndjson")
+
+    def _owners_path(self, handle: str) -> str:
+        return os.path.join(self.directory, f"{handle}.owners")
+
+
+async def fetch_with_limits(
+    connection: DatabaseConnection,
+    sql: str,
+    limits: ResultLimits,
+    stream: bool = True,
+    parameters: Optional[Dict[str, Any]] = None,
+    owner: Optional[str] = None,
+) -> LimitedResult:
+    """
+    Fetch a query result, stopping as soon as a row or byte limit is reached.
+
+    With stream=True rows are read from the cursor in batches, so nothing past the limit is fetched.
+    Statements that may modify data should use stream=False, which runs them to completion and
+    truncates afterwards. When spilling is enabled the complete result is also written to a file,
+    which only the owner can download.
+    """
+    result = LimitedResult()
+    spill: Optional[SpillFile] = None
+
+    if stream:
+        batches = connection.stream(sql, parameters, batch_size=limits.batch_size)
+    else:
+        wrapper = await connection.execute(sql, parameters)
+        batches = _iterate_batches(await wrapper.fetchall(), limits.batch_size)
+
+    try:
+        async for batch in batches:
+            if spill is not None:
+                await asyncio.to_thread(spill.write_rows, batch)
+                if not spill.complete:
+                    break
+                continue
+
+            cut = _take_rows(result, batch, limits)
+            if cut is None:
+                continue
+
+            if not limits.spill:
+                break
+
+            spill = await asyncio.to_thread(spill_store.create, owner)
+            await asyncio.to_thread(spill.write_rows, result.rows + batch[cut:])
+            if not spill.complete:
+                break
+    finally:
+        await batches.aclose()
+        if spill is not None:
+            await asyncio.to_thread(spill.close)
+
+    if spill is not None:
+        result.result_handle = spill.handle
+        result.result_row_count = spill.row_count if spill.complete else None
+        if not spill.complete:
+            logger.warning(f"Spilled result {spill.handle} stopped at the {spill.max_bytes} byte limit")
+
+    return result
+
+
+def _take_rows(result: LimitedResult, batch: List[Dict[str, Any]], limits: ResultLimits) -> Optional[int]:
+    """Add rows from the batch until a limit is hit; return the index of the first row left out, if any."""
+    for index, row in enumerate(batch):
+        if limits.max_rows and len(result.rows) >= limits.max_rows:
+            result.truncation_reason = "max_rows"
+            return index
+
+        if limits.max_bytes:
+            row_bytes = len(json.dumps(row, default=str))
+            if result.byte_count + row_bytes > limits.max_bytes:
+                result.truncation_reason = "max_bytes"
+                return index
+            result.byte_count += row_bytes
+
+        result.rows.append(row)
+    return None
+
+
+async def _iterate_batches(rows: List[Dict[str, Any]], batch_size: int):
+    for start in range(0, len(rows), batch_size):
+        yield rows[start : start + batch_size]
+
+
+# Global spill store instance
+spill_store = ResultSpillStore(
+    directory=settings.result_spill_directory,
+    ttl_seconds=settings.result_spill_ttl_seconds,
+    max_bytes=settings.result_spill_max_bytes,
+)
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from ..core.cron import CronSchedule
+from ..database import AsyncSessionLocal
+from ..models.schemas import ToolExecutionResponse
+from ..repositories.tool_repository import ToolRepository
+from .change_bus import change_bus
+from .result_refresher import ResultRefresher, result_refresher
+from .tool_execution_service import ToolExecutionService
+
+logger = logging.getLogger(__name__)
+
+# Longest sleep between schedule checks, so a clock change is noticed
+MAX_SLEEP_SECONDS = 60
+
+
+class ResultPrewarmer:
+    """
+    Keeps the cached results of tools with a prewarm_schedule warm.
+
+    The result of the call without parameters is refreshed when the prewarmer starts, when the tool is
+    saved, and whenever its cron schedule (UTC) comes due. Refreshes run on the bounded result refresher.
+    Each worker has its own result cache, so each worker pre-warms its own.
+    """
+
+    def __init__(self, refresher: ResultRefresher = result_refresher, session_factory=AsyncSessionLocal):
+        self.refresher = refresher
+        self.session_factory = session_factory
+        self._schedules: Dict[int, CronSchedule] = {}
+        self._next_runs: Dict[int, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self) -> None:
+        """Pre-warm every scheduled tool and keep pre-warming them on schedule in the background."""
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        await self.reload()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop pre-warming on schedule."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def reload(self, tool_id: Optional[int] = None) -> None:
+        """
+        Read the schedule of one tool, or of every tool, and pre-warm the scheduled ones now.
+
+        Args:
+            tool_id: ID of the tool, or None to reload every tool
+        """
+        async with self.session_factory() as db:
+            repository = ToolRepository(db)
+            tools = [await repository.get_by_id(tool_id)] if tool_id is not None else await repository.get_all()
+
+        if tool_id is None:
+            self._schedules.clear()
+            self._next_runs.clear()
+        else:
+            self.unschedule(tool_id)
+
+        now = datetime.now(timezone.utc)
+        for tool in tools:
+            expression = (tool.execution_options or {}).get("prewarm_schedule") if tool else None
+            if not expression:
+                continue
+            try:
+                schedule = CronSchedule(expression)
+                next_run = schedule.next_after(now)
+            except ValueError as e:
+                logger.warning(f"Not pre-warming tool {tool.id}: {e}")
+                continue
+            self._schedules[tool.id] = schedule
+            self._next_runs[tool.id] = next_run
+            self.prewarm(tool.id)
+        self._wake()
+
+    def unschedule(self, tool_id: int) -> None:
+        """Stop pre-warming a tool."""
+        self._schedules.pop(tool_id, None)
+        self._next_runs.pop(tool_id, None)
+
+    def get_next_run(self, tool_id: int) -> Optional[datetime]:
+        """Get when a tool is next pre-warmed, or None if it is not scheduled."""
+        return self._next_runs.get(tool_id)
+
+    def prewarm(self, tool_id: int) -> bool:
+        """Refresh the cached result of a tool's call without parameters in the background."""
+        return self.refresher.submit(tool_id, ("prewarm", tool_id), lambda: self._execute(tool_id), "prewarms")
+
+    async def _execute(self, tool_id: int) -> ToolExecutionResponse:
+        # Runs after the request or event that scheduled it has finished, so it uses its own session
+        async with self.session_factory() as db:
+            return await ToolExecutionService(db).execute_named_tool(tool_id, refresh=True)
+
+    async def _run(self) -> None:
+        while True:
+            now = datetime.now(timezone.utc)
+            for tool_id, next_run in list(self._next_runs.items()):
+                if next_run <= now:
+                    self._next_runs[tool_id] = self._schedules[tool_id].next_after(now)
+                    self.prewarm(tool_id)
+
+            sleep = MAX_SLEEP_SECONDS
+            if self._next_runs:
+                sleep = min(sleep, max(0.0, (min(self._next_runs.values()) - now).total_seconds()))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=sleep)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _on_tool_change(self, event) -> None:
+        # Only a started prewarmer follows tool changes
+        if self._task is None:
+            return
+        if event.action == "deleted":
+            self.unschedule(event.entity_id)
+        elif event.action in ("created", "updated"):
+            await self.reload(event.entity_id)
+
+
+# Global result prewarmer instance
+result_prewarmer = ResultPrewarmer()
+change_bus.subscribe("tool", result_prewarmer._on_tool_change)
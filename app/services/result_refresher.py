@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Hashable, Set
+
+from ..core.config import settings
+from ..models.schemas import ToolExecutionResponse
+
+logger = logging.getLogger(__name__)
+
+RefreshLoader = Callable[[], Awaitable[ToolExecutionResponse]]
+
+
+class ResultRefresher:
+    """
+    Bounded background scheduler for the refreshes of cached tool results.
+
+    Refreshes replace a cached result without a caller waiting for them: stale-while-revalidate
+    refreshes of results served after their tool's refresh_after_seconds, and scheduled pre-warming.
+    At most max_concurrency refreshes run at once, a result has at most one refresh queued or running,
+    and refreshes submitted while max_pending are queued or running are skipped.
+    """
+
+    def __init__(self, max_concurrency: int = 2, max_pending: int = 100):
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending: Set[Hashable] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._slots = None
+        self._stats: Dict[int, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    def serve_stale(self, tool_id: int, key: Hashable, staleness_seconds: float, load: RefreshLoader) -> bool:
+        """
+        Record that a stale result was served and refresh it in the background.
+
+        Args:
+            tool_id: ID of the tool
+            key: Identifies the cached result, so it is refreshed once however often it is served
+            staleness_seconds: How long ago the result should have been refreshed
+            load: Runs the tool call and stores its result
+
+        Returns:
+            Whether a refresh was scheduled
+        """
+        with self._lock:
+            stats = self._stats[tool_id]
+            stats["stale_served"] += 1
+            stats["staleness_seconds_total"] += staleness_seconds
+            stats["max_staleness_seconds"] = max(stats["max_staleness_seconds"], staleness_seconds)
+        return self.submit(tool_id, key, load, "refreshes")
+
+    def submit(self, tool_id: int, key: Hashable, load: RefreshLoader, kind: str = "refreshes") -> bool:
+        """Run load() in the background, counted as kind, unless the key or too many refreshes are pending."""
+        with self._lock:
+            if key in self._pending or len(self._pending) >= self.max_pending:
+                self._stats[tool_id]["skipped"] += 1
+                return False
+            self._pending.add(key)
+
+        task = asyncio.create_task(self._run(tool_id, key, load, kind))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def wait(self) -> None:
+        """Wait until the refreshes submitted so far have finished."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def shutdown(self) -> None:
+        """Cancel every queued or running refresh."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self, tool_id: int) -> Dict[str, float]:
+        """Get the stale results served, their staleness, and the count and cost of background refreshes of a tool."""
+        with self._lock:
+            stats = dict(self._stats.get(tool_id, {}))
+
+        stale_served = stats.pop("stale_served", 0)
+        staleness_total = stats.pop("staleness_seconds_total", 0.0)
+        succeeded = stats.get("refreshes", 0) + stats.get("prewarms", 0)
+        refresh_ms_total = stats.pop("refresh_ms_total", 0.0)
+        return {
+            "stale_served": int(stale_served),
+            "mean_staleness_seconds": staleness_total / stale_served if stale_served else 0.0,
+            "max_staleness_seconds": stats.get("max_staleness_seconds", 0.0),
+            "refreshes": int(stats.get("refreshes", 0)),
+            "prewarms": int(stats.get("prewarms", 0)),
+            "refresh_failures": int(stats.get("failures", 0)),
+            "skipped_refreshes": int(stats.get("skipped", 0)),
+            "mean_refresh_ms": refresh_ms_total / succeeded if succeeded else 0.0,
+        }
+
+    def reset(self, tool_id: int) -> None:
+        """Forget the counters of a tool."""
+        with self._lock:
+            self._stats.pop(tool_id, None)
+
+    async def _run(self, tool_id: int, key: Hashable, load: RefreshLoader, kind: str) -> None:
+        try:
+            async with self._get_slots():
+                start = time.perf_counter()
+                try:
+                    result = await load()
+                    error = None if result.success else result.error
+                except Exception as e:
+                    error = str(e)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+
+            with self._lock:
+                stats = self._stats[tool_id]
+                if error is None:
+                    stats[kind] += 1
+                    stats["refresh_ms_total"] += elapsed_ms
+                else:
+                    stats["failures"] += 1
+            if error is not None:
+                logger.warning(f"Background {kind} of tool {tool_id} failed: {error}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        """Get the refresh slots of the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots[0] is not loop:
+            self._slots = (loop, asyncio.Semaphore(self.max_concurrency))
+        return self._slots[1]
+
+
+# Global result refresher instance
+result_refresher = ResultRefresher(
+    max_concurrency=settings.result_refresh_max_concurrency,
+    max_pending=settings.result_refresh_max_pending,
+)
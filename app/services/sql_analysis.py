@@ -0,0 +1,151 @@
+import logging
+import re
+from typing import Dict, List, Optional
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+
+from .sql_rewriter import DIALECTS
+
+logger = logging.getLogger(__name__)
+
+# Jinja tags, SQL comments and string literals are removed before looking at keywords
+_TEMPLATE_TAG_RE = re.compile(r"{#.*?#}|{%.*?%}|{{.*?}}", re.DOTALL)
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+
+# Literals replaced when computing a statement's shape. Row limits are kept since they change the plan.
+_SHAPE_TOKEN_RE = re.compile(
+    r"(?P<keep>\b(?:limit|offset|top|first|next)\s+\d+)"
+    r"|(?P<string>'(?:[^']|'')*')"
+    r"|(?P<number>(?<![\w$:?.])\d+(?:\.\d+)?(?:e[+-]?\d+)?\b)",
+    re.IGNORECASE,
+)
+_IN_LIST_RE = re.compile(r"\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+
+# Template tags when reading a template's tables: {{ }} becomes an identifier that is recognized if it
+# names a table, the other tags are dropped so both branches of an {% if %} count
+_TEMPLATE_OUTPUT_RE = re.compile(r"{{.*?}}", re.DOTALL)
+_TEMPLATE_BLOCK_RE = re.compile(r"{#.*?#}|{%.*?%}", re.DOTALL)
+_TEMPLATE_VALUE = "dmcp_template_value"
+
+# Statements and clauses that write the table they name
+_WRITE_TARGETS = (exp.Insert, exp.Update, exp.Delete, exp.Merge, exp.Create, exp.Drop, exp.Alter, exp.Into)
+
+READ_STATEMENTS = {"select", "with", "show", "describe", "desc", "explain", "values", "table"}
+
+# Keywords that make an otherwise read-looking statement modify data (e.g. data-modifying CTEs,
+# SELECT ... INTO, EXPLAIN ANALYZE, SELECT ... FOR UPDATE)
+_WRITE_KEYWORD_RE = re.compile(
+    r"\b(insert|update|delete|merge|upsert|create|alter|drop|truncate|grant|revoke|copy|call|exec|execute"
+    r"|into|analyze|vacuum|attach|detach|lock)\b",
+    re.IGNORECASE,
+)
+
+
+def strip_sql_noise(sql: str) -> str:
+    """Remove Jinja tags, comments and string literals so only SQL keywords and identifiers remain."""
+    sql = _TEMPLATE_TAG_RE.sub(" ", sql)
+    sql = _COMMENT_RE.sub(" ", sql)
+    return _STRING_RE.sub("''", sql)
+
+
+def classify_statement(sql: str) -> str:
+    """
+    Classify SQL (or a SQL template) as "read" or "write".
+
+    The check is deliberately conservative: anything that is not clearly a read is treated as a write.
+
+    Args:
+        sql: SQL string that may contain Jinja2 template syntax
+
+    Returns:
+        "read" if every statement only reads data, "write" otherwise
+    """
+    statements = [statement.strip() for statement in strip_sql_noise(sql).split(";") if statement.strip()]
+    if not statements:
+        return "write"
+
+    for statement in statements:
+        words = statement.lstrip("(").split(None, 1)
+        if not words or words[0].lower() not in READ_STATEMENTS or _WRITE_KEYWORD_RE.search(statement):
+            return "write"
+
+    return "read"
+
+
+def is_read_only_sql(sql: str) -> bool:
+    """Check whether SQL (or a SQL template) only reads data."""
+    return classify_statement(sql) == "read"
+
+
+def sql_shape(sql: str) -> str:
+    """
+    Normalize rendered SQL to its shape, so statements that only differ in literal values match.
+
+    String and numeric literals become ?, IN lists of any length become IN (?), comments are dropped
+    and whitespace is collapsed. LIMIT/OFFSET values are kept.
+    """
+
+    def replace(match: re.Match) -> str:
+        return match.group("keep") or "?"
+
+    shape = _SHAPE_TOKEN_RE.sub(replace, _COMMENT_RE.sub(" ", sql))
+    shape = _IN_LIST_RE.sub("IN (?)", shape)
+    return " ".join(shape.split()).rstrip(";").strip()
+
+
+def table_dependencies(sql: str, database_type: Optional[str] = None) -> Dict[str, Optional[List[str]]]:
+    """
+    Find the tables SQL (or a SQL template) reads and writes.
+
+    Table names are lower-cased and unqualified, so the same table matches however a statement names
+    it. A list is None when it cannot be told - the SQL does not parse, a template picks the table, or
+    a write (e.g. a procedure call) does not name its table - and callers must then assume any table.
+
+    Args:
+        sql: SQL string that may contain Jinja2 template syntax
+        database_type: Datasource type whose SQL dialect is parsed
+
+    Returns:
+        {"reads": [...], "writes": [...]}
+    """
+    unknown = {"reads": None, "writes": None}
+    source = _TEMPLATE_BLOCK_RE.sub(" ", _TEMPLATE_OUTPUT_RE.sub(_TEMPLATE_VALUE, sql))
+    try:
+        statements = [
+            statement
+            for statement in sqlglot.parse(source, read=DIALECTS.get((database_type or "").lower()))
+            if statement is not None and not isinstance(statement, exp.Semicolon)
+        ]
+    except SqlglotError as e:
+        logger.debug(f"Could not parse SQL for its tables: {e}")
+        return unknown
+
+    reads, writes, writes_known = set(), set(), True
+    for statement in statements:
+        if isinstance(statement, exp.Command):
+            return unknown
+
+        ctes = {cte.alias_or_name.lower() for cte in statement.find_all(exp.CTE)}
+        targets = set()
+        for node in statement.find_all(*_WRITE_TARGETS):
+            target = node.this if isinstance(node.this, exp.Table) else node.find(exp.Table)
+            if target is not None:
+                targets.add(id(target))
+                writes.add(target.name.lower())
+        for node in statement.find_all(exp.TruncateTable):
+            for target in node.expressions:
+                targets.add(id(target))
+                writes.add(target.name.lower())
+        if classify_statement(statement.sql()) == "write" and not targets:
+            writes_known = False
+
+        for table in statement.find_all(exp.Table):
+            if id(table) not in targets and table.name and table.name.lower() not in ctes:
+                reads.add(table.name.lower())
+
+    if _TEMPLATE_VALUE in reads | writes:
+        return unknown
+    return {"reads": sorted(reads), "writes": sorted(writes) if writes_known else None}
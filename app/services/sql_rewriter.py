@@ -0,0 +1,246 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.dialects.dialect import Dialect
+from sqlglot.errors import SqlglotError
+from sqlglot.optimizer.normalize_identifiers import normalize_identifiers
+from sqlglot.tokens import Token, TokenType
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models.schemas import FilterOperator, ResultProjection
+
+logger = logging.getLogger(__name__)
+
+# sqlglot dialect of each datasource type
+DIALECTS = {
+    "postgresql": "postgres",
+    "mysql": "mysql",
+    "sqlite": "sqlite",
+    "duckdb": "duckdb",
+    "databricks": "databricks",
+}
+
+# Datasource types that quote identifiers with backticks rather than double quotes
+BACKTICK_QUOTED = {"mysql", "databricks"}
+
+# SQL of the filter operators that compare with a single bound value
+COMPARISONS = {
+    FilterOperator.EQ: "=",
+    FilterOperator.NE: "<>",
+    FilterOperator.LT: "<",
+    FilterOperator.LTE: "<=",
+    FilterOperator.GT: ">",
+    FilterOperator.GTE: ">=",
+    FilterOperator.LIKE: "LIKE",
+}
+
+
+class RewritePlan:
+    """
+    Where a statement can be extended or cut, found once by parsing it.
+
+    Rewrites edit the original text at these positions rather than regenerating SQL from the parse
+    tree, so vendor syntax and :name placeholders reach the database exactly as written.
+    """
+
+    def __init__(
+        self,
+        is_query: bool,
+        end: int,
+        order_start: Optional[int] = None,
+        bounded: bool = False,
+        columns: Optional[List[str]] = None,
+    ):
+        self.is_query = is_query
+        # End of the statement, before trailing semicolons and whitespace
+        self.end = end
+        # Start of the outermost ORDER BY, if any
+        self.order_start = order_start
+        # Whether the statement already limits its rows (LIMIT, OFFSET, FETCH FIRST)
+        self.bounded = bounded
+        # Output column names, when every selected expression is named (no * and no unnamed expressions)
+        self.columns = columns
+
+
+class SQLRewriter:
+    """
+    Dialect-aware pagination, count and projection rewrites of tool SQL.
+
+    Each statement is parsed once per datasource type and its RewritePlan cached by SQL text - with
+    bind parameters a tool renders the same text for every call with the same shape. SQL that cannot
+    be parsed is wrapped in a subquery instead.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self._plans = TTLCache(max_entries=max_entries)
+
+    def paginate(self, sql: str, database_type: str, limit: int, offset: int) -> str:
+        """Return one page of a query's rows; statements that are not queries are left unchanged."""
+        limit, offset = int(limit), int(offset)
+        plan = self.get_plan(sql, database_type)
+        if plan is None:
+            return f"SELECT * FROM ({self._strip(sql)}\n) AS page_query LIMIT {limit} OFFSET {offset}"
+        if not plan.is_query:
+            return sql
+
+        body = sql[: plan.end]
+        if plan.bounded:
+            # The page is taken from the rows the query already limits itself to
+            return f"SELECT * FROM ({body}) AS page_query LIMIT {limit} OFFSET {offset}"
+        return f"{body} LIMIT {limit} OFFSET {offset}"
+
+    def count(self, sql: str, database_type: str) -> Optional[str]:
+        """Count the rows of a query, without its ORDER BY; None for statements that are not queries."""
+        plan = self.get_plan(sql, database_type)
+        if plan is None:
+            return f"SELECT COUNT(*) AS total FROM ({self._strip(sql)}\n) AS count_query"
+        if not plan.is_query:
+            return None
+
+        # Ordering cannot change the count unless it decides which rows a LIMIT keeps
+        end = plan.order_start if plan.order_start is not None and not plan.bounded else plan.end
+        return f"SELECT COUNT(*) AS total FROM ({sql[:end].rstrip()}) AS count_query"
+
+    def project(
+        self,
+        sql: str,
+        database_type: str,
+        projection: ResultProjection,
+        known_columns: Optional[List[str]] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Select columns of a query's rows, filtered and sorted by the database.
+
+        Args:
+            sql: Rendered tool SQL
+            database_type: Datasource type the identifiers are quoted for
+            projection: Requested columns, filters and ordering
+            known_columns: Output columns of the query - requested columns must be one of them (any
+                spelling case), or are taken as given when None
+
+        Returns:
+            The query wrapped in a subquery, and the filter values as bind parameters
+
+        Raises:
+            ValueError: The statement is not a query, a column is unknown or a filter value does not fit its operator
+        """
+        plan = self.get_plan(sql, database_type)
+        if plan is not None and not plan.is_query:
+            raise ValueError("Columns, filters and ordering can only be applied to queries")
+
+        by_name = {column.lower(): column for column in known_columns or []}
+
+        def quote(column: str) -> str:
+            if known_columns is not None:
+                if column.lower() not in by_name:
+                    raise ValueError(f"Unknown result column '{column}', expected one of: {', '.join(known_columns)}")
+                column = by_name[column.lower()]
+            quote_char = "`" if (database_type or "").lower() in BACKTICK_QUOTED else '"'
+            return f"{quote_char}{column.replace(quote_char, quote_char * 2)}{quote_char}"
+
+        select = ", ".join(quote(column) for column in projection.columns or []) or "*"
+        conditions, bind_parameters = [], {}
+        for index, condition in enumerate(projection.filters or []):
+            column, name = quote(condition.column), f"result_filter_{index}"
+            if condition.op in (FilterOperator.IS_NULL, FilterOperator.IS_NOT_NULL):
+                conditions.append(f"{column} IS {'NOT ' if condition.op == FilterOperator.IS_NOT_NULL else ''}NULL")
+                continue
+
+            if condition.op in (FilterOperator.IN, FilterOperator.NOT_IN):
+                if not isinstance(condition.value, list):
+                    raise ValueError(f"Filter '{condition.op.value}' on '{condition.column}' needs a list of values")
+                # Bound as one list, which each datasource expands or binds as an array
+                conditions.append(f"{column} {'NOT IN' if condition.op == FilterOperator.NOT_IN else 'IN'} :{name}")
+            else:
+                if condition.value is None or isinstance(condition.value, (list, dict)):
+                    raise ValueError(f"Filter '{condition.op.value}' on '{condition.column}' needs a single value")
+                conditions.append(f"{column} {COMPARISONS[condition.op]} :{name}")
+            bind_parameters[name] = condition.value
+
+        body = sql[: plan.end] if plan is not None else f"{self._strip(sql)}\n"
+        projected = f"SELECT {select} FROM ({body}) AS projected_query"
+        if conditions:
+            projected += f" WHERE {' AND '.join(conditions)}"
+        if projection.order_by:
+            keys = ", ".join(f"{quote(key.column)} {key.direction.value.upper()}" for key in projection.order_by)
+            projected += f" ORDER BY {keys}"
+        return projected, bind_parameters
+
+    def output_columns(self, sql: str, database_type: str) -> Optional[List[str]]:
+        """Get the output column names of a query as found by parsing it, or None if they cannot be told."""
+        plan = self.get_plan(sql, database_type)
+        return plan.columns if plan is not None else None
+
+    def get_plan(self, sql: str, database_type: str) -> Optional[RewritePlan]:
+        """Get the cached plan of a statement, or None if it is not a single statement sqlglot can parse."""
+        dialect = DIALECTS.get((database_type or "").lower())
+        if dialect is None:
+            return None
+
+        key = (dialect, sql)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._analyze(sql, dialect) or False
+            self._plans.set(key, plan)
+        return plan or None
+
+    @staticmethod
+    def _analyze(sql: str, dialect: str) -> Optional[RewritePlan]:
+        try:
+            tokens = Dialect.get_or_raise(dialect).tokenize(sql)
+            statements = [
+                statement
+                for statement in sqlglot.parse(sql, read=dialect)
+                if statement is not None and not isinstance(statement, exp.Semicolon)
+            ]
+        except SqlglotError as e:
+            logger.debug(f"Could not parse SQL for rewriting ({dialect}): {e}")
+            return None
+
+        while tokens and tokens[-1].token_type == TokenType.SEMICOLON:
+            tokens.pop()
+        if len(statements) != 1 or not tokens or any(token.token_type == TokenType.SEMICOLON for token in tokens):
+            return None
+
+        statement = statements[0]
+        end = tokens[-1].end + 1
+        if not isinstance(statement, exp.Query):
+            return RewritePlan(False, end)
+
+        bounded = any(statement.args.get(arg) is not None for arg in ("limit", "offset"))
+        order_start = SQLRewriter._outer_order_start(tokens) if statement.args.get("order") is not None else None
+        return RewritePlan(True, end, order_start, bounded, SQLRewriter._output_columns(statement, dialect))
+
+    @staticmethod
+    def _output_columns(statement: exp.Query, dialect: str) -> Optional[List[str]]:
+        # Unaliased expressions are named by each database in its own way
+        selects = statement.selects
+        if not selects or any(select.is_star or not isinstance(select, (exp.Alias, exp.Column)) for select in selects):
+            return None
+        # Names as the database reports them, e.g. unquoted identifiers folded to lower case on PostgreSQL
+        return [select.output_name for select in normalize_identifiers(statement.copy(), dialect=dialect).selects]
+
+    @staticmethod
+    def _outer_order_start(tokens: List[Token]) -> Optional[int]:
+        """Position of the last ORDER BY outside parentheses - window and subquery orderings are nested."""
+        depth, start = 0, None
+        for token in tokens:
+            if token.token_type == TokenType.L_PAREN:
+                depth += 1
+            elif token.token_type == TokenType.R_PAREN:
+                depth -= 1
+            elif token.token_type == TokenType.ORDER_BY and depth == 0:
+                start = token.start
+        return start
+
+    @staticmethod
+    def _strip(sql: str) -> str:
+        # The closing parenthesis goes on a new line, in case the SQL ends with a -- comment
+        return sql.strip().rstrip(";").rstrip()
+
+
+# Global SQL rewriter instance
+sql_rewriter = SQLRewriter(max_entries=settings.sql_rewrite_cache_max_entries)
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ..core.exceptions import TagNotFoundError
 from ..models.schemas import TagCreate, TagResponse, TagUpdate
 from ..repositories.tag_repository import TagRepository
+from .change_bus import change_bus
 
 
 class TagService:
@@ -36,6 +37,12 @@ class TagService:
         
         return normalized_name
 
+    @staticmethod
+    def _to_response(tag, tool_count: int) -> TagResponse:
+        response = TagResponse.model_validate(tag)
+        response.tool_count = tool_count
+        return response
+
     def _validate_color(self, color: Optional[str]) -> Optional[str]:
         """Validate hex color code format.
         
@@ -70,6 +77,7 @@ class TagService:
                 description=tag.description,
                 color=validated_color,
             )
+            await change_bus.publish(self.repository.db, "tag", "created", db_tag.id)
             return TagResponse.model_validate(db_tag)
         except ValueError:
             raise
@@ -79,8 +87,8 @@ class TagService:
     async def list_tags(self) -> List[TagResponse]:
         """List all tags."""
         try:
-            tags = await self.repository.get_all()
-            return [TagResponse.model_validate(tag) for tag in tags]
+            tags = await self.repository.get_all_with_counts()
+            return [self._to_response(tag, tool_count) for tag, tool_count in tags]
         except Exception as e:
             raise Exception(f"Failed to list tags: {str(e)}")
 
@@ -89,7 +97,7 @@ class TagService:
         try:
             tag = await self.repository.get_by_id(tag_id)
             if tag:
-                return TagResponse.model_validate(tag)
+                return self._to_response(tag, await self.repository.get_tool_count(tag_id))
             return None
         except TagNotFoundError:
             raise
@@ -114,9 +122,15 @@ class TagService:
             if tag_update.color is not None:
                 update_data["color"] = self._validate_color(tag_update.color)
 
+            renamed = "name" in update_data and update_data["name"] != current_tag.name
             updated_tag = await self.repository.update_tag(tag_id, **update_data)
             if updated_tag:
-                return TagResponse.model_validate(updated_tag)
+                await change_bus.publish(self.repository.db, "tag", "updated", tag_id)
+                tool_count = await self.repository.get_tool_count(tag_id)
+                if renamed and tool_count:
+                    # The tags of the tools using the tag changed as well
+                    await change_bus.publish(self.repository.db, "tool", "refresh")
+                return self._to_response(updated_tag, tool_count)
             raise TagNotFoundError(tag_id)
         except (TagNotFoundError, ValueError):
             raise
@@ -126,7 +140,13 @@ class TagService:
     async def delete_tag(self, tag_id: int) -> bool:
         """Delete a tag by ID."""
         try:
-            return await self.repository.delete_tag(tag_id)
+            tool_count = await self.repository.get_tool_count(tag_id)
+            deleted = await self.repository.delete_tag(tag_id)
+            if deleted:
+                await change_bus.publish(self.repository.db, "tag", "deleted", tag_id)
+                if tool_count:
+                    await change_bus.publish(self.repository.db, "tool", "refresh")
+            return deleted
         except TagNotFoundError:
             raise
         except Exception as e:
@@ -0,0 +1,84 @@
+import logging
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Policy entry granting a role every tool
+ALL_TOOLS = "*"
+
+
+def get_roles(claims: Dict[str, Any]) -> List[str]:
+    """Get the roles of a caller from JWT claims (a list, or a comma separated string)."""
+    roles = claims.get("roles") or []
+    if isinstance(roles, str):
+        roles = roles.split(",")
+    return [str(role).strip() for role in roles if str(role).strip()]
+
+
+class ToolAccessIndex:
+    """
+    Tool visibility by role, precomputed from the access policy and the tags of the registered tools.
+
+    The policy maps a role to the tool tags it may use ("*" for every tool). A caller can use a tool
+    when any of their roles allows one of its tags. Without a policy every caller can use every tool,
+    and tools the index does not know about (built-in tools such as ping) are always allowed.
+    """
+
+    def __init__(self, policy: Optional[Dict[str, Sequence[str]]] = None):
+        self.policy = {role: frozenset(tags) for role, tags in (policy or {}).items()}
+        self._lock = threading.Lock()
+        self._tools: FrozenSet[str] = frozenset()
+        self._by_role: Dict[str, FrozenSet[str]] = {}
+        # Allowed tools by role combination, filled on demand
+        self._by_roles: Dict[FrozenSet[str], FrozenSet[str]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.policy)
+
+    def rebuild(self, tool_tags: Dict[str, Iterable[str]]) -> None:
+        """Recompute the index from the tags of every registered tool, by tool name."""
+        tool_tags = {name: frozenset(tags or ()) for name, tags in tool_tags.items()}
+        by_role = {}
+        for role, allowed_tags in self.policy.items():
+            if ALL_TOOLS in allowed_tags:
+                by_role[role] = frozenset(tool_tags)
+            else:
+                by_role[role] = frozenset(name for name, tags in tool_tags.items() if tags & allowed_tags)
+
+        with self._lock:
+            self._tools = frozenset(tool_tags)
+            self._by_role = by_role
+            self._by_roles = {}
+        logger.debug(f"Rebuilt tool access index for {len(tool_tags)} tools and {len(by_role)} roles")
+
+    def allowed_tools(self, roles: Iterable[str]) -> FrozenSet[str]:
+        """Get the indexed tools the roles may use."""
+        key = frozenset(roles)
+        with self._lock:
+            allowed = self._by_roles.get(key)
+            if allowed is None:
+                allowed = frozenset().union(*(self._by_role.get(role, frozenset()) for role in key))
+                self._by_roles[key] = allowed
+            return allowed
+
+    def is_allowed(self, roles: Iterable[str], tool_name: str) -> bool:
+        """Check whether the roles may see and call a tool."""
+        if not self.enabled or tool_name not in self._tools:
+            return True
+        return tool_name in self.allowed_tools(roles)
+
+    def filter(self, roles: Iterable[str], tools: List[Any]) -> List[Any]:
+        """Keep the tools (objects with a name) the roles may see."""
+        if not self.enabled:
+            return tools
+        allowed = self.allowed_tools(roles)
+        indexed = self._tools
+        return [tool for tool in tools if tool.name in allowed or tool.name not in indexed]
+
+
+# Global tool access index instance
+tool_access_index = ToolAccessIndex(settings.mcp_tool_access_policy)
@@ -1,30 +1,93 @@
+import asyncio
+import logging
 import re
 import time
 import traceback
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.cache import TTLCache
+from ..core.config import settings
 from ..core.exceptions import (
     DatasourceNotFoundError,
+    ParameterValidationError,
     ToolExecutionError,
     ToolNotFoundError,
 )
 from ..database_connections import DatabaseConnectionManager
+from ..datasources import CONNECTION_REGISTRY, DatabaseConnection, QueryPlan
 from ..models.schemas import (
     PaginationRequest,
     PaginationResponse,
+    QueryPlanResponse,
+    ResultProjection,
+    SlowQueryEntry,
+    ToolExecutionOptions,
     ToolExecutionResponse,
+    ToolStatsResponse,
 )
 from ..repositories.datasource_repository import DatasourceRepository
 from ..repositories.tool_repository import ToolRepository
-from .jinja_template_service import JinjaTemplateService
+from .change_bus import change_bus
+from .jinja_template_service import JinjaTemplateService, TemplateAnalysis
+from .parameter_validation import validate_tool_parameters
+from .query_profiler import PhaseTimer, query_profiler
+from .request_coalescer import request_coalescer
+from .result_cache import result_cache
+from .result_limits import ResultLimits, fetch_with_limits, spill_store
+from .result_refresher import result_refresher
+from .sql_analysis import is_read_only_sql, sql_shape, table_dependencies
+from .sql_rewriter import sql_rewriter
+
+logger = logging.getLogger(__name__)
+
+# Query plans cached per datasource revision and SQL shape
+plan_cache = TTLCache(max_entries=settings.plan_cache_max_entries, ttl_seconds=settings.plan_cache_ttl_seconds)
+
+# Output columns of queries that could not be told by parsing, probed per datasource revision and SQL shape
+column_cache = TTLCache(max_entries=settings.plan_cache_max_entries, ttl_seconds=settings.plan_cache_ttl_seconds)
+
+# Whether a datasource has cache-enabled tools, by datasource ID, until any tool or the datasource changes
+cached_datasources = TTLCache()
+
+
+async def _on_datasource_change(event) -> None:
+    """Evict cached state of a datasource changed by any worker."""
+    plan_cache.evict(lambda key: key[0] == event.entity_id)
+    column_cache.evict(lambda key: key[0] == event.entity_id)
+    result_cache.evict_datasource(event.entity_id)
+    cached_datasources.pop(event.entity_id)
+    for connection_class in CONNECTION_REGISTRY.values():
+        await connection_class.release_datasource(event.entity_id)
+
+
+async def _on_tool_change(event) -> None:
+    """Forget the profile and cached results of a tool changed or deleted by any worker."""
+    # The event does not tell which datasources the tool belonged to before and after the change
+    cached_datasources.clear()
+    if event.action in ("updated", "deleted"):
+        result_cache.evict_tool(event.entity_id)
+    if event.action == "deleted":
+        query_profiler.reset(event.entity_id)
+        result_refresher.reset(event.entity_id)
+
+
+async def _on_tables_written(event) -> None:
+    """Evict cached results that read tables another worker wrote."""
+    result_cache.invalidate_tables(event.entity_id, (event.payload or {}).get("tables"))
+
+
+change_bus.subscribe("datasource", _on_datasource_change)
+change_bus.subscribe("tool", _on_tool_change)
+change_bus.subscribe("tables", _on_tables_written)
 
 
 class ToolExecutionService:
     """Service for tool execution operations."""
 
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.tool_repository = ToolRepository(db)
         self.datasource_repository = DatasourceRepository(db)
         self.connection_manager = DatabaseConnectionManager()
@@ -35,8 +98,16 @@ class ToolExecutionService:
         tool_id: int,
         parameters: Optional[Dict[str, Any]] = None,
         pagination: Optional[PaginationRequest] = None,
+        projection: Optional[ResultProjection] = None,
+        refresh: bool = False,
+        owner: Optional[str] = None,
     ) -> ToolExecutionResponse:
-        """Execute a named tool with parameters and pagination."""
+        """
+        Execute a named tool with parameters and pagination, and the requested columns, filters and ordering.
+
+        With refresh, a cached result is not served but replaced by the result of this execution.
+        A spilled result can be downloaded by the owner it was returned to.
+        """
         try:
             # Get the tool with its datasource
             tool = await self.tool_repository.get_with_datasource(tool_id)
@@ -48,19 +119,200 @@ class ToolExecutionService:
             if not datasource:
                 raise DatasourceNotFoundError(tool.datasource_id)
 
-            return await self._execute_query(datasource, tool.sql, parameters or {}, pagination)
-        except (ToolNotFoundError, DatasourceNotFoundError):
+            # Defaults, coercion and validation rules are applied before any database work
+            parameters = validate_tool_parameters(tool, parameters)
+            options = ToolExecutionOptions.model_validate(tool.execution_options or {})
+            analysis = TemplateAnalysis.for_tool(tool, datasource.database_type)
+
+            def execute() -> Awaitable[ToolExecutionResponse]:
+                return self._execute_query(
+                    datasource, tool.sql, parameters, pagination, options, tool.id, analysis, projection, owner
+                )
+
+            if not analysis.read_only:
+                result = await execute()
+                if result.success:
+                    await self._invalidate_results(datasource.id, analysis.tables["writes"])
+                return result
+
+            # Calls to read-only tools that only differ in parameters the SQL never reads get the same key
+            key = request_coalescer.make_key(
+                tool.id, f"{tool.updated_at}:{tool.sql}", analysis.used_parameters(parameters), pagination, projection
+            )
+            cache_key = result_cache.make_key(datasource.id, tool.id, analysis.tables["reads"], key)
+
+            async def load() -> ToolExecutionResponse:
+                generation = result_cache.generation(datasource.id)
+                # Identical concurrent calls to read-only tools share a single database execution
+                if options.coalesce_requests:
+                    result = await request_coalescer.run(tool.id, key, execute)
+                else:
+                    result = await execute()
+                if options.cache_ttl_seconds:
+                    result_cache.set(cache_key, result, options.cache_ttl_seconds, generation)
+                return result
+
+            # Results stay cached until their TTL passes or a write evicts them
+            entry = result_cache.get_entry(cache_key) if options.cache_ttl_seconds and not refresh else None
+            if entry is None:
+                result = await load()
+            else:
+                # Past the refresh age the cached result is still served, while a background refresh replaces it.
+                # load() only uses the datasource connection, not this request's session, so it can outlive the
+                # request
+                result, age = entry
+                if options.refresh_after_seconds is not None and age >= options.refresh_after_seconds:
+                    result_refresher.serve_stale(tool.id, cache_key, age - options.refresh_after_seconds, load)
+
+            # Coalesced and cached results are shared, and so is the spilled result behind them
+            if result.result_handle and owner is not None:
+                await asyncio.to_thread(spill_store.grant, result.result_handle, owner)
+            return result
+        except (ToolNotFoundError, DatasourceNotFoundError, ParameterValidationError):
             raise
         except Exception as e:
             print(e)
             raise ToolExecutionError(tool_id, str(e))
 
+    async def stream_named_tool(
+        self, tool_id: int, parameters: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Execute a named tool and yield its complete result batch by batch, without result size limits."""
+        tool = await self.tool_repository.get_with_datasource(tool_id)
+        if not tool:
+            raise ToolNotFoundError(tool_id)
+
+        datasource = await self.datasource_repository.get_by_id(tool.datasource_id)
+        if not datasource:
+            raise DatasourceNotFoundError(tool.datasource_id)
+
+        parameters = validate_tool_parameters(tool, parameters)
+        options = ToolExecutionOptions.model_validate(tool.execution_options or {})
+        analysis = TemplateAnalysis.for_tool(tool, datasource.database_type)
+
+        try:
+            processed_sql, bind_parameters = self._render_sql(tool.sql, parameters, options, analysis)
+            connection = await self.connection_manager.get_connection(datasource)
+            if options.max_cost is not None:
+                await self._check_query_cost(datasource, connection, processed_sql, options.max_cost, bind_parameters)
+
+            if analysis.read_only:
+                batches = connection.stream(processed_sql, bind_parameters, batch_size=settings.result_fetch_batch_size)
+                try:
+                    async for batch in batches:
+                        yield batch
+                finally:
+                    await batches.aclose()
+            else:
+                # Statements that may modify data run to completion before any rows are returned
+                wrapper = await connection.execute(processed_sql, bind_parameters)
+                rows = await wrapper.fetchall()
+                await self._invalidate_results(datasource.id, analysis.tables["writes"])
+                yield rows
+        except ToolExecutionError:
+            raise
+        except Exception as e:
+            raise ToolExecutionError(tool_id, str(e))
+
+    async def export_named_tool(
+        self, tool_id: int, parameters: Optional[Dict[str, Any]] = None, delimiter: str = ","
+    ) -> AsyncIterator[bytes]:
+        """Execute a read-only named tool and yield its complete result as CSV bytes, without result size limits."""
+        tool = await self.tool_repository.get_with_datasource(tool_id)
+        if not tool:
+            raise ToolNotFoundError(tool_id)
+
+        datasource = await self.datasource_repository.get_by_id(tool.datasource_id)
+        if not datasource:
+            raise DatasourceNotFoundError(tool.datasource_id)
+
+        parameters = validate_tool_parameters(tool, parameters)
+        options = ToolExecutionOptions.model_validate(tool.execution_options or {})
+        analysis = TemplateAnalysis.for_tool(tool, datasource.database_type)
+        if not analysis.read_only:
+            raise ToolExecutionError(tool_id, "Only read-only tools can be exported")
+
+        try:
+            processed_sql, bind_parameters = self._render_sql(tool.sql, parameters, options, analysis)
+            connection = await self.connection_manager.get_connection(datasource)
+            if options.max_cost is not None:
+                await self._check_query_cost(datasource, connection, processed_sql, options.max_cost, bind_parameters)
+
+            # PostgreSQL sends the CSV itself through COPY; other databases stream rows that are written here
+            chunks = connection.export_csv(
+                processed_sql, bind_parameters, delimiter=delimiter, batch_size=settings.result_fetch_batch_size
+            )
+            try:
+                async for chunk in chunks:
+                    yield chunk
+            finally:
+                await chunks.aclose()
+        except ToolExecutionError:
+            raise
+        except Exception as e:
+            raise ToolExecutionError(tool_id, str(e))
+
+    async def explain_named_tool(self, tool_id: int, parameters: Optional[Dict[str, Any]] = None) -> QueryPlanResponse:
+        """Render a named tool with parameters and get its query plan without executing it."""
+        try:
+            tool = await self.tool_repository.get_with_datasource(tool_id)
+            if not tool:
+                raise ToolNotFoundError(tool_id)
+
+            datasource = await self.datasource_repository.get_by_id(tool.datasource_id)
+            if not datasource:
+                raise DatasourceNotFoundError(tool.datasource_id)
+
+            parameters = validate_tool_parameters(tool, parameters)
+            options = ToolExecutionOptions.model_validate(tool.execution_options or {})
+            processed_sql, bind_parameters = self._render_sql(
+                tool.sql, parameters, options, TemplateAnalysis.for_tool(tool, datasource.database_type)
+            )
+            connection = await self.connection_manager.get_connection(datasource)
+            plan, cached = await self._get_query_plan(datasource, connection, processed_sql, bind_parameters)
+
+            return QueryPlanResponse(
+                sql=processed_sql,
+                database_type=datasource.database_type,
+                format=plan.format,
+                plan=plan.plan,
+                estimated_cost=plan.estimated_cost,
+                cached=cached,
+            )
+        except (ToolNotFoundError, DatasourceNotFoundError, ParameterValidationError):
+            raise
+        except Exception as e:
+            raise ToolExecutionError(tool_id, str(e))
+
+    async def get_tool_stats(self, tool_id: int, slow_query_limit: int = 10) -> ToolStatsResponse:
+        """Get the latency profile, coalescing counters and recent slow queries of a tool."""
+        tool = await self.tool_repository.get_by_id(tool_id)
+        if not tool:
+            raise ToolNotFoundError(tool_id)
+
+        return ToolStatsResponse(
+            tool_id=tool_id,
+            latency=query_profiler.get_profile(tool_id),
+            coalescing=request_coalescer.get_stats(tool_id),
+            result_cache=result_refresher.get_stats(tool_id),
+            slow_queries=query_profiler.get_slow_queries(tool_id, slow_query_limit),
+        )
+
+    def get_slow_queries(self, tool_id: Optional[int] = None, limit: int = 50) -> List[SlowQueryEntry]:
+        """Get the most recent slow executions across tools, newest first."""
+        return query_profiler.get_slow_queries(tool_id, limit)
+
+    def get_result_file(self, handle: str, owner: str) -> Optional[str]:
+        """Get the path of a spilled result, or None if the handle is unknown, expired or not the owner's."""
+        return spill_store.get_path(handle, owner)
+
     async def execute_raw_query(
         self,
         datasource_id: int,
         sql: str,
         parameters: Optional[Dict[str, Any]] = None,
         pagination: Optional[PaginationRequest] = None,
+        owner: Optional[str] = None,
     ) -> ToolExecutionResponse:
         """Execute a raw SQL query with parameters and pagination."""
         try:
@@ -69,7 +321,12 @@ class ToolExecutionService:
             if not datasource:
                 raise DatasourceNotFoundError(datasource_id)
 
-            return await self._execute_query(datasource, sql, parameters or {}, pagination)
+            result = await self._execute_query(datasource, sql, parameters or {}, pagination, owner=owner)
+            if result.success and not is_read_only_sql(sql):
+                await self._invalidate_results(
+                    datasource.id, table_dependencies(sql, datasource.database_type)["writes"]
+                )
+            return result
         except DatasourceNotFoundError:
             raise
         except Exception as e:
@@ -81,16 +338,41 @@ class ToolExecutionService:
         sql: str,
         parameters: Dict[str, Any],
         pagination: Optional[PaginationRequest] = None,
+        options: Optional[ToolExecutionOptions] = None,
+        tool_id: Optional[int] = None,
+        analysis: Optional[TemplateAnalysis] = None,
+        projection: Optional[ResultProjection] = None,
+        owner: Optional[str] = None,
     ) -> ToolExecutionResponse:
         """Execute a query with parameters and pagination."""
         start_time = time.time()
+        timer = PhaseTimer()
+        processed_sql = None
+        options = options or ToolExecutionOptions()
+        limits = ResultLimits.for_tool(options)
+        # Only reads are fetched incrementally; writes always run to completion before truncating
+        stream = analysis.read_only if analysis else is_read_only_sql(sql)
 
         try:
             # Process SQL with Jinja templates if needed
-            processed_sql = self.template_service.process_sql_template(sql, parameters)
+            processed_sql, bind_parameters = self._render_sql(sql, parameters, options, analysis)
+            timer.mark("render")
 
             # Get database connection
             connection = await self.connection_manager.get_connection(datasource)
+            timer.mark("connect")
+
+            # Requested columns, filters and ordering are applied by the database, around the tool's query
+            if projection is not None and not projection.is_empty:
+                processed_sql, bind_parameters = await self._apply_projection(
+                    datasource, connection, processed_sql, bind_parameters, projection, tool_id
+                )
+                timer.mark("project")
+
+            # Reject queries the planner expects to be too expensive before running them
+            if options.max_cost is not None:
+                await self._check_query_cost(datasource, connection, processed_sql, options.max_cost, bind_parameters)
+                timer.mark("plan")
 
             # Execute query with pagination
             if pagination:
@@ -98,25 +380,20 @@ class ToolExecutionService:
                 offset = (pagination.page - 1) * pagination.page_size
                 limit = pagination.page_size
 
-                processed_sql_with_pagination = processed_sql
-
-                # For PostgreSQL and MySQL, we can use LIMIT/OFFSET
-                if datasource.database_type in ["postgresql", "mysql"]:
-                    processed_sql_with_pagination += f" LIMIT {limit} OFFSET {offset}"
-
-                print("processed_sql_with_pagination", processed_sql_with_pagination)
-
-                # Execute the paginated query
-                result_wrapper = await connection.execute(processed_sql_with_pagination)
-                result_data = await result_wrapper.fetchall()
-
-                # Get total count for pagination info
-                count_sql = f"SELECT COUNT(*) as total FROM ({processed_sql}) as count_query"
-                print(count_sql)
-
-                count_result_wrapper = await connection.execute(count_sql)
-                count_result_data = await count_result_wrapper.fetchall()
-                total_items = count_result_data[0]["total"] if count_result_data else 0
+                # The page and the total are computed by the database, with SQL rewritten for its dialect
+                paginated_sql = sql_rewriter.paginate(processed_sql, datasource.database_type, limit, offset)
+                result = await fetch_with_limits(connection, paginated_sql, limits, stream, bind_parameters, owner)
+                timer.mark("query")
+
+                count_sql = sql_rewriter.count(processed_sql, datasource.database_type)
+                if count_sql is None:
+                    # Statements that are not queries return their rows in full
+                    total_items = len(result.rows)
+                else:
+                    count_result_wrapper = await connection.execute(count_sql, bind_parameters)
+                    count_result_data = await count_result_wrapper.fetchall()
+                    total_items = count_result_data[0]["total"] if count_result_data else 0
+                timer.mark("count")
 
                 # Calculate pagination info
                 total_pages = (total_items + pagination.page_size - 1) // pagination.page_size
@@ -130,14 +407,15 @@ class ToolExecutionService:
                 )
             else:
                 # Execute without pagination
-                result_wrapper = await connection.execute(processed_sql)
-                result_data = await result_wrapper.fetchall()
+                result = await fetch_with_limits(connection, processed_sql, limits, stream, bind_parameters, owner)
                 pagination_response = None
+                timer.mark("query")
 
             execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
 
-            # result_data is now a list of dictionaries from all database connections
-            data = result_data or []
+            # result.rows is a list of dictionaries from all database connections
+            data = result.rows
+            query_profiler.record(tool_id, execution_time, processed_sql, parameters, timer.timings, data)
 
             return ToolExecutionResponse(
                 success=True,
@@ -146,12 +424,20 @@ class ToolExecutionService:
                 row_count=len(data),
                 execution_time_ms=execution_time,
                 pagination=pagination_response,
+                truncated=result.truncated,
+                truncation_reason=result.truncation_reason,
+                result_handle=result.result_handle,
+                result_row_count=result.result_row_count,
             )
 
+        except ParameterValidationError:
+            raise
         except Exception as e:
             print(e)
             print(traceback.format_exc())
             execution_time = (time.time() - start_time) * 1000
+            timer.mark("failed")
+            query_profiler.record(tool_id, execution_time, processed_sql, parameters, timer.timings, error=str(e))
             return ToolExecutionResponse(
                 success=False,
                 data=[],
@@ -162,6 +448,122 @@ class ToolExecutionService:
                 error=str(e),
             )
 
+    def _render_sql(
+        self,
+        sql: str,
+        parameters: Dict[str, Any],
+        options: ToolExecutionOptions,
+        analysis: Optional[TemplateAnalysis] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Render SQL with values inlined as literals, or as bind parameters when the tool asks for them."""
+        is_template = analysis.is_template if analysis else None
+        bind = options.bind_parameters if options.bind_parameters is not None else settings.template_bind_parameters
+        if bind:
+            return self.template_service.render_bound_sql(sql, parameters, is_template)
+        return self.template_service.process_sql_template(sql, parameters, is_template), {}
+
+    async def _invalidate_results(self, datasource_id: int, tables: Optional[List[str]]) -> None:
+        """
+        Evict cached results that read tables a successful write changed, here and in other workers.
+
+        Other workers are told through the change bus, which commits an event. Datasources without
+        cache-enabled tools have no cached results in any worker, so nothing is published for them;
+        whether a datasource has such tools is looked up once and kept until a tool changes.
+        """
+        result_cache.invalidate_tables(datasource_id, tables)
+        has_cached_tools = cached_datasources.get(datasource_id)
+        if has_cached_tools is None:
+            tools = await self.tool_repository.get_by_datasource(datasource_id)
+            has_cached_tools = any((tool.execution_options or {}).get("cache_ttl_seconds") for tool in tools)
+            cached_datasources.set(datasource_id, has_cached_tools)
+        if has_cached_tools:
+            await change_bus.publish(self.db, "tables", "written", datasource_id, {"tables": tables})
+
+    async def _apply_projection(
+        self,
+        datasource,
+        connection: DatabaseConnection,
+        processed_sql: str,
+        bind_parameters: Dict[str, Any],
+        projection: ResultProjection,
+        tool_id: Optional[int] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Wrap rendered SQL in a query selecting, filtering and sorting its result by the requested columns."""
+        known_columns = await self._get_output_columns(datasource, connection, processed_sql, bind_parameters)
+        try:
+            projected_sql, filter_parameters = sql_rewriter.project(
+                processed_sql, datasource.database_type, projection, known_columns
+            )
+        except ValueError as e:
+            raise ParameterValidationError(tool_id, str(e))
+        return projected_sql, {**bind_parameters, **filter_parameters}
+
+    async def _get_output_columns(
+        self,
+        datasource,
+        connection: DatabaseConnection,
+        processed_sql: str,
+        bind_parameters: Optional[Dict[str, Any]] = None,
+    ) -> Optional[List[str]]:
+        """Get the output columns of rendered SQL, or None if they cannot be told (a probe returned no rows)."""
+        columns = sql_rewriter.output_columns(processed_sql, datasource.database_type)
+        if columns is not None:
+            return columns
+
+        key = (datasource.id, str(datasource.updated_at), sql_shape(processed_sql))
+        columns = column_cache.get(key)
+        if columns is not None:
+            return columns
+
+        # SELECT * and unnamed expressions: ask the database, which names the columns of the first row
+        probe = await connection.execute(
+            sql_rewriter.paginate(processed_sql, datasource.database_type, 1, 0), bind_parameters
+        )
+        rows = await probe.fetchall()
+        columns = list(probe.keys or (rows[0].keys() if rows else [])) or None
+        if columns is not None:
+            column_cache.set(key, columns)
+        return columns
+
+    async def _get_query_plan(
+        self,
+        datasource,
+        connection: DatabaseConnection,
+        processed_sql: str,
+        bind_parameters: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[QueryPlan, bool]:
+        """Get the plan for rendered SQL, reusing a cached plan for the same SQL shape."""
+        key = (datasource.id, str(datasource.updated_at), sql_shape(processed_sql))
+
+        plan = plan_cache.get(key)
+        if plan is not None:
+            return plan, True
+
+        plan = await connection.explain(processed_sql, bind_parameters)
+        plan_cache.set(key, plan)
+        return plan, False
+
+    async def _check_query_cost(
+        self,
+        datasource,
+        connection: DatabaseConnection,
+        processed_sql: str,
+        max_cost: float,
+        bind_parameters: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Raise if the estimated cost of the rendered SQL exceeds max_cost."""
+        plan, _ = await self._get_query_plan(datasource, connection, processed_sql, bind_parameters)
+
+        if plan.estimated_cost is None:
+            logger.warning(f"No cost estimate available for datasource {datasource.id}, skipping cost limit")
+            return
+
+        if plan.estimated_cost > max_cost:
+            raise ToolExecutionError(
+                None,
+                f"Estimated query cost {plan.estimated_cost:.2f} exceeds the tool's limit of {max_cost:g}",
+            )
+
     def _apply_pagination(self, sql: str, pagination: PaginationRequest) -> str:
         """Apply pagination to SQL query."""
         offset = (pagination.page - 1) * pagination.page_size
@@ -0,0 +1,304 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.exceptions import DMCPError, JobLimitError, JobNotFoundError, ToolNotFoundError
+from ..database import AsyncSessionLocal
+from ..models.schemas import PaginationRequest, PaginationResponse, ToolJobResponse, ToolJobResultPage
+from ..repositories.tool_repository import ToolRepository
+from .parameter_validation import validate_tool_parameters
+from .tool_execution_service import ToolExecutionService
+
+logger = logging.getLogger(__name__)
+
+# The byte offset of every INDEX_INTERVAL-th row is kept, so a page is read without scanning the whole file
+INDEX_INTERVAL = 1000
+
+ACTIVE_STATUSES = ("queued", "running")
+
+_JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobResultFile:
+    """
+    Compact NDJSON result of a job: one JSON array of values per row, in column order.
+
+    Rows are written by the job while pages are read by pollers, so only rows that were flushed
+    are counted as readable.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.columns: List[str] = []
+        self.row_count = 0
+        self.byte_count = 0
+        self.truncated = False
+        self._offsets: List[int] = []
+        self._file = open(path, "wb")
+
+    def write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        row_count = self.row_count
+        for row in rows:
+            if not self.columns:
+                self.columns = list(row.keys())
+
+            line = (json.dumps([row.get(column) for column in self.columns], default=str) + "\n").encode()
+            if self.byte_count + len(line) > self.max_bytes:
+                self.truncated = True
+                break
+
+            if row_count % INDEX_INTERVAL == 0:
+                self._offsets.append(self.byte_count)
+            self._file.write(line)
+            self.byte_count += len(line)
+            row_count += 1
+
+        self._file.flush()
+        self.row_count = row_count
+
+    def read_rows(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Read up to limit rows starting at row offset."""
+        count = min(limit, self.row_count - offset)
+        if count <= 0:
+            return []
+
+        rows = []
+        with open(self.path, "rb") as file:
+            file.seek(self._offsets[offset // INDEX_INTERVAL])
+            for _ in range(offset % INDEX_INTERVAL):
+                file.readline()
+            for _ in range(count):
+                rows.append(dict(zip(self.columns, json.loads(file.readline()))))
+        return rows
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ToolJob:
+    """A tool execution running in the background."""
+
+    def __init__(self, tool_id: int, owner: str, parameters: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.tool_id = tool_id
+        self.owner = owner
+        self.parameters = parameters
+        self.status = "queued"
+        self.created_at = _now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+        self.result: Optional[JobResultFile] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE_STATUSES
+
+    def to_response(self, ttl_seconds: float) -> ToolJobResponse:
+        return ToolJobResponse(
+            job_id=self.id,
+            tool_id=self.tool_id,
+            status=self.status,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            expires_at=self.finished_at + timedelta(seconds=ttl_seconds) if self.finished_at else None,
+            columns=self.result.columns if self.result else [],
+            row_count=self.result.row_count if self.result else 0,
+            truncated=self.result.truncated if self.result else False,
+            error=self.error,
+        )
+
+
+class ToolJobManager:
+    """
+    Background execution of long-running tools.
+
+    Submitted jobs wait for one of max_workers slots, then stream the complete tool result through
+    ToolExecutionService into a spool file that clients read page by page while the job runs and
+    after it finishes. Each user can have max_jobs_per_user jobs queued or running; finished jobs and
+    their results are removed ttl_seconds after they finish.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_workers: int = 4,
+        max_jobs_per_user: int = 5,
+        ttl_seconds: float = 3600.0,
+        max_result_bytes: int = 1 << 30,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "dmcp-jobs")
+        self.max_workers = max_workers
+        self.max_jobs_per_user = max_jobs_per_user
+        self.ttl_seconds = ttl_seconds
+        self.max_result_bytes = max_result_bytes
+        self.session_factory = session_factory
+        self._jobs: Dict[str, ToolJob] = {}
+        self._slots = None
+
+    async def submit(
+        self, db: AsyncSession, tool_id: int, parameters: Optional[Dict[str, Any]], owner: str
+    ) -> ToolJobResponse:
+        """Validate a tool call and queue it as a job."""
+        self.cleanup_expired()
+
+        tool = await ToolRepository(db).get_by_id(tool_id)
+        if not tool:
+            raise ToolNotFoundError(tool_id)
+        parameters = validate_tool_parameters(tool, parameters)
+
+        if sum(1 for job in self._jobs.values() if job.owner == owner and job.active) >= self.max_jobs_per_user:
+            raise JobLimitError(self.max_jobs_per_user)
+
+        job = ToolJob(tool_id, owner, parameters)
+        self._jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job))
+        logger.info(f"Queued job {job.id} for tool {tool_id}")
+        return job.to_response(self.ttl_seconds)
+
+    def get(self, job_id: str, owner: str) -> ToolJobResponse:
+        """Get the status of a job."""
+        return self._get_job(job_id, owner).to_response(self.ttl_seconds)
+
+    def list_jobs(self, owner: str) -> List[ToolJobResponse]:
+        """List the jobs of a user, newest first."""
+        self.cleanup_expired()
+        jobs = sorted((job for job in self._jobs.values() if job.owner == owner), key=lambda job: job.created_at)
+        return [job.to_response(self.ttl_seconds) for job in reversed(jobs)]
+
+    async def get_results(self, job_id: str, owner: str, pagination: PaginationRequest) -> ToolJobResultPage:
+        """Read a page of the rows a job has stored so far."""
+        job = self._get_job(job_id, owner)
+        result = job.result
+        offset = (pagination.page - 1) * pagination.page_size
+        rows = await asyncio.to_thread(result.read_rows, offset, pagination.page_size) if result else []
+        total_items = result.row_count if result else 0
+        total_pages = (total_items + pagination.page_size - 1) // pagination.page_size
+
+        return ToolJobResultPage(
+            job_id=job.id,
+            columns=result.columns if result else [],
+            data=rows,
+            pagination=PaginationResponse(
+                page=pagination.page,
+                page_size=pagination.page_size,
+                total_pages=total_pages,
+                total_items=total_items,
+                has_next=pagination.page < total_pages,
+                has_prev=pagination.page > 1,
+            ),
+        )
+
+    async def cancel(self, job_id: str, owner: str) -> ToolJobResponse:
+        """Cancel a queued or running job, or delete a finished one, removing its result."""
+        job = self._get_job(job_id, owner)
+        if job.active and job.task is not None:
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+            job.status = "cancelled"
+            job.finished_at = job.finished_at or _now()
+
+        response = job.to_response(self.ttl_seconds)
+        await asyncio.to_thread(self._remove, job)
+        return response
+
+    def cleanup_expired(self) -> int:
+        """Remove jobs that finished more than ttl_seconds ago, and their results."""
+        cutoff = _now() - timedelta(seconds=self.ttl_seconds)
+        expired = [job for job in self._jobs.values() if job.finished_at and job.finished_at < cutoff]
+        for job in expired:
+            self._remove(job)
+        return len(expired)
+
+    async def shutdown(self) -> None:
+        """Cancel every queued or running job."""
+        tasks = [job.task for job in self._jobs.values() if job.active and job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job: ToolJob) -> None:
+        async with self._get_slots():
+            job.status = "running"
+            job.started_at = _now()
+            start_time = time.time()
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                job.result = await asyncio.to_thread(
+                    JobResultFile, os.path.join(self.directory, f"{job.id}.ndjson"), self.max_result_bytes
+                )
+
+                # Jobs outlive the request that submitted them, so they use their own session
+                async with self.session_factory() as db:
+                    batches = ToolExecutionService(db).stream_named_tool(job.tool_id, job.parameters)
+                    try:
+                        async for batch in batches:
+                            await asyncio.to_thread(job.result.write_rows, batch)
+                            if job.result.truncated:
+                                logger.warning(f"Job {job.id} result stopped at the {self.max_result_bytes} byte limit")
+                                break
+                    finally:
+                        await batches.aclose()
+                job.status = "succeeded"
+            except asyncio.CancelledError:
+                job.status = "cancelled"
+                raise
+            except Exception as e:
+                job.status = "failed"
+                job.error = e.message if isinstance(e, DMCPError) else str(e)
+            finally:
+                job.finished_at = _now()
+                if job.result is not None:
+                    await asyncio.to_thread(job.result.close)
+                logger.info(f"Job {job.id} {job.status} after {(time.time() - start_time) * 1000:.0f} ms")
+
+    def _get_job(self, job_id: str, owner: str) -> ToolJob:
+        """Get a job of the user - other users' jobs are reported as missing."""
+        self.cleanup_expired()
+        job = self._jobs.get(job_id) if _JOB_ID_RE.match(job_id or "") else None
+        if job is None or job.owner != owner:
+            raise JobNotFoundError(job_id)
+        return job
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        """Get the worker slots of the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots[0] is not loop:
+            self._slots = (loop, asyncio.Semaphore(self.max_workers))
+        return self._slots[1]
+
+    def _remove(self, job: ToolJob) -> None:
+        self._jobs.pop(job.id, None)
+        if job.result is not None:
+            try:
+                os.remove(job.result.path)
+            except OSError:
+                pass
+
+
+# Global tool job manager instance
+tool_jobs = ToolJobManager(
+    directory=settings.job_spool_directory,
+    max_workers=settings.job_max_workers,
+    max_jobs_per_user=settings.job_max_per_user,
+    ttl_seconds=settings.job_ttl_seconds,
+    max_result_bytes=settings.job_max_result_bytes,
+)
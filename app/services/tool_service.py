@@ -1,14 +1,31 @@
+import hashlib
+import json
 import re
+from datetime import datetime, timezone
 from typing import List, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..core.exceptions import DatasourceNotFoundError, ToolNotFoundError
-from ..models.schemas import ToolCreate, ToolResponse, ToolUpdate
+from ..core.cron import CronSchedule
+from ..core.exceptions import DatasourceNotFoundError, ToolExecutionError, ToolNotFoundError
+from ..models.schemas import (
+    PaginationRequest,
+    PaginationResponse,
+    ToolCreate,
+    ToolExecutionOptions,
+    ToolListFilters,
+    ToolListResponse,
+    ToolResponse,
+    ToolUpdate,
+)
+from ..datasources import CONNECTION_REGISTRY
 from ..repositories.datasource_repository import DatasourceRepository
 from ..repositories.tool_repository import ToolRepository
 from ..models.schemas import ToolCreate, ToolUpdate, ToolResponse
 from ..core.exceptions import ToolNotFoundError, DatasourceNotFoundError
+from .change_bus import change_bus
+from .jinja_template_service import JinjaTemplateService, TemplateAnalysis
+from .parameter_validation import check_parameter_definitions
 
 
 class ToolService:
@@ -49,6 +66,64 @@ class ToolService:
             
         return normalized_tags
 
+    def _analyze_sql(self, sql: str, database_type: str) -> TemplateAnalysis:
+        """Analyze the tool SQL once at save time; executions read the stored result.
+
+        Raises:
+            ValueError: If the template does not compile or fails the security check
+        """
+        try:
+            return JinjaTemplateService().analyze_template(sql, database_type=database_type)
+        except ToolExecutionError as e:
+            raise ValueError(e.details["error"])
+
+    def _validate_execution_options(
+        self,
+        options: Optional[ToolExecutionOptions],
+        analysis: TemplateAnalysis,
+        datasource,
+        parameters: Optional[List[dict]] = None,
+    ) -> dict:
+        """Validate execution options against the tool SQL, datasource and parameters.
+
+        Args:
+            options: Execution options to validate
+            analysis: Analysis of the tool's SQL
+            datasource: The datasource the tool runs against
+            parameters: Parameter definitions of the tool, as stored
+
+        Returns:
+            Execution options as a dictionary for JSON storage
+
+        Raises:
+            ValueError: If an option is not allowed for this tool
+        """
+        options = options or ToolExecutionOptions()
+
+        if options.coalesce_requests and not analysis.read_only:
+            raise ValueError("Request coalescing is only allowed for read-only tools")
+        if options.cache_ttl_seconds is not None and not analysis.read_only:
+            raise ValueError("Result caching is only allowed for read-only tools")
+        if options.refresh_after_seconds is not None:
+            if options.cache_ttl_seconds is None:
+                raise ValueError("refresh_after_seconds requires cache_ttl_seconds")
+            if options.refresh_after_seconds >= options.cache_ttl_seconds:
+                raise ValueError("refresh_after_seconds must be smaller than cache_ttl_seconds")
+        if options.prewarm_schedule is not None:
+            if options.cache_ttl_seconds is None:
+                raise ValueError("prewarm_schedule requires cache_ttl_seconds")
+            CronSchedule(options.prewarm_schedule).next_after(datetime.now(timezone.utc))
+            # Pre-warming refreshes the call without parameters, which needs a value for every parameter
+            required = [p["name"] for p in parameters or [] if p.get("required") and p.get("default") is None]
+            if required:
+                raise ValueError(f"prewarm_schedule requires defaults for parameters: {', '.join(required)}")
+
+        connection_class = CONNECTION_REGISTRY.get(datasource.database_type.lower())
+        if options.max_cost is not None and not getattr(connection_class, "supports_cost_estimate", False):
+            raise ValueError(f"A cost limit is not supported for {datasource.database_type} datasources")
+
+        return options.model_dump()
+
     async def create_tool(self, tool: ToolCreate) -> ToolResponse:
         """Create a new named tool."""
         try:
@@ -68,6 +143,7 @@ class ToolService:
             tool.type = normalized_type
             
             # Convert ParameterDefinition objects to dictionaries for JSON storage
+            check_parameter_definitions(tool.parameters or [])
             parameters_dict = []
             if tool.parameters:
                 for param in tool.parameters:
@@ -77,6 +153,11 @@ class ToolService:
             # Validate and normalize tags
             tags = self._validate_and_normalize_tags(tool.tags)
 
+            analysis = self._analyze_sql(tool.sql, datasource.database_type)
+            execution_options = self._validate_execution_options(
+                tool.execution_options, analysis, datasource, parameters_dict
+            )
+
             db_tool = await self.repository.create_tool(
                 name=tool.name,
                 description=tool.description,
@@ -85,21 +166,67 @@ class ToolService:
                 datasource_id=tool.datasource_id,
                 parameters=parameters_dict,
                 tags=tags,
+                execution_options=execution_options,
+                **analysis.to_columns(),
             )
+            await change_bus.publish(self.repository.db, "tool", "created", db_tool.id)
             return ToolResponse.model_validate(db_tool)
         except (DatasourceNotFoundError, ValueError):
             raise
         except Exception as e:
             raise Exception(f"Failed to create tool: {str(e)}")
 
-    async def list_tools(self) -> List[ToolResponse]:
-        """List all named tools."""
+    async def list_tools(self, filters: Optional[ToolListFilters] = None) -> List[ToolResponse]:
+        """List all named tools matching the filters."""
         try:
-            tools = await self.repository.get_all_with_datasource()
+            tools = await self.repository.search(filters)
             return [ToolResponse.model_validate(tool) for tool in tools]
         except Exception as e:
             raise Exception(f"Failed to list tools: {str(e)}")
 
+    async def list_tools_page(
+        self, pagination: PaginationRequest, filters: Optional[ToolListFilters] = None
+    ) -> ToolListResponse:
+        """List one page of the named tools matching the filters."""
+        try:
+            total_items, _ = await self.repository.get_list_version(filters)
+            offset = (pagination.page - 1) * pagination.page_size
+            tools = await self.repository.search(filters, offset=offset, limit=pagination.page_size)
+            total_pages = (total_items + pagination.page_size - 1) // pagination.page_size
+            return ToolListResponse(
+                items=[ToolResponse.model_validate(tool) for tool in tools],
+                pagination=PaginationResponse(
+                    page=pagination.page,
+                    page_size=pagination.page_size,
+                    total_pages=total_pages,
+                    total_items=total_items,
+                    has_next=pagination.page < total_pages,
+                    has_prev=pagination.page > 1,
+                ),
+            )
+        except Exception as e:
+            raise Exception(f"Failed to list tools: {str(e)}")
+
+    async def get_list_etag(
+        self, filters: Optional[ToolListFilters] = None, pagination: Optional[PaginationRequest] = None
+    ) -> str:
+        """
+        Get an ETag for a tool list, without loading the tools.
+
+        It changes whenever a matching tool is created, updated or deleted.
+        """
+        count, last_updated = await self.repository.get_list_version(filters)
+        version = json.dumps(
+            [
+                count,
+                last_updated.isoformat() if last_updated else None,
+                filters.model_dump() if filters else None,
+                pagination.model_dump() if pagination else None,
+            ],
+            sort_keys=True,
+        )
+        return f'W/"{hashlib.sha256(version.encode()).hexdigest()[:32]}"'
+
     async def get_tool(self, tool_id: int) -> Optional[ToolResponse]:
         """Get a specific named tool by ID."""
         try:
@@ -150,6 +277,7 @@ class ToolService:
 
             # Convert ParameterDefinition objects to dictionaries for JSON storage
             if tool_update.parameters is not None:
+                check_parameter_definitions(tool_update.parameters)
                 parameters_dict = []
                 for param in tool_update.parameters:
                     param_dict = param.model_dump()
@@ -164,8 +292,20 @@ class ToolService:
             else:
                 update_data['tags'] = current_tool.tags
 
+            # The (possibly updated) SQL is re-analyzed, and execution options re-validated against it
+            analysis = self._analyze_sql(update_data["sql"], datasource.database_type)
+            update_data.update(analysis.to_columns())
+            if tool_update.execution_options is not None:
+                execution_options = tool_update.execution_options
+            else:
+                execution_options = ToolExecutionOptions.model_validate(current_tool.execution_options or {})
+            update_data["execution_options"] = self._validate_execution_options(
+                execution_options, analysis, datasource, update_data["parameters"]
+            )
+
             updated_tool = await self.repository.update_tool(tool_id, **update_data)
             if updated_tool:
+                await change_bus.publish(self.repository.db, "tool", "updated", tool_id)
                 return ToolResponse.model_validate(updated_tool)
             raise ToolNotFoundError(tool_id)
         except (ToolNotFoundError, DatasourceNotFoundError, ValueError):
@@ -176,7 +316,10 @@ class ToolService:
     async def delete_tool(self, tool_id: int) -> bool:
         """Delete a named tool by ID."""
         try:
-            return await self.repository.delete_tool(tool_id)
+            deleted = await self.repository.delete_tool(tool_id)
+            if deleted:
+                await change_bus.publish(self.repository.db, "tool", "deleted", tool_id)
+            return deleted
         except ToolNotFoundError:
             raise
         except Exception as e:
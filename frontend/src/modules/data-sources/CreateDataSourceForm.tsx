@@ -391,6 +391,15 @@ const CreateDataSourceForm = ({
           username: "",
           ...includePasswordField(""),
         };
+      case "duckdb":
+        return {
+          ...baseData,
+          database: formData.database,
+          host: "",
+          port: 0,
+          username: "",
+          ...includePasswordField(""),
+        };
       case "postgresql":
       case "mysql":
         return {
@@ -562,6 +571,7 @@ const CreateDataSourceForm = ({
                       <option value="mysql">MySQL</option>
                       <option value="sqlite">SQLite</option>
                       <option value="databricks">Databricks</option>
+                      <option value="duckdb">DuckDB (read-only file)</option>
                     </select>
                   </div>
                 </div>
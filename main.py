@@ -1,6 +1,9 @@
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.responses import FileResponse
 from fastmcp import FastMCP
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.applications import Starlette
 from starlette.middleware.cors import CORSMiddleware
 from starlette.responses import JSONResponse, RedirectResponse
@@ -8,11 +11,17 @@ from starlette.routing import Mount
 
 from app.core.auth_middleware import BearerTokenMiddleware
 from app.core.config import settings
+from app.database import get_db
+from app.datasources import CONNECTION_REGISTRY
 from app.mcp.middleware.auth import AuthMiddleware
 from app.mcp.middleware.logging import LoggingMiddleware
-from app.mcp.middleware.tools import CustomizeToolsList
+from app.mcp.middleware.tools import ToolAccessMiddleware
 from app.mcp_server import MCPServer
 from app.routes import auth, datasources, health, tags, tools, users
+from app.services.change_bus import change_bus
+from app.services.result_prewarmer import result_prewarmer
+from app.services.result_refresher import result_refresher
+from app.services.tool_jobs import tool_jobs
 
 mcp = FastMCP("DMCP")
 server = MCPServer(mcp)
@@ -21,14 +30,33 @@ server = MCPServer(mcp)
 # Add middlewares
 mcp.add_middleware(LoggingMiddleware())
 mcp.add_middleware(AuthMiddleware())
-mcp.add_middleware(CustomizeToolsList())
+mcp.add_middleware(ToolAccessMiddleware())
 
 # Build MCP ASGI app and mount it under FastAPI (stateless for compatibility with tidd)
 mcp_app = mcp.http_app(path="/mcp/", stateless_http=True)
 
 starlette = Starlette(routes=[Mount(settings.mcp_path, app=mcp_app)], lifespan=mcp_app.lifespan)
+
 # mcp_app.mount("/ui", StaticFiles(directory="public", html=True), name="static")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the MCP app lifespan and keep this worker in sync with changes made by other workers."""
+    async with mcp_app.lifespan(app):
+        await change_bus.start()
+        await result_prewarmer.start()
+        try:
+            yield
+        finally:
+            await change_bus.stop()
+            await result_prewarmer.stop()
+            await result_refresher.shutdown()
+            await tool_jobs.shutdown()
+            for connection_class in CONNECTION_REGISTRY.values():
+                await connection_class.release_all()
+
+
 app = FastAPI(
     title="DMCP - Database Backend Server",
     description="A FastAPI server for managing database connections and executing queries",
@@ -36,7 +64,7 @@ app = FastAPI(
     docs_url=f"{settings.mcp_path}/docs",
     redoc_url=f"{settings.mcp_path}/redoc",
     openapi_url=f"{settings.mcp_path}/openapi.json",
-    lifespan=mcp_app.lifespan,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -49,8 +77,9 @@ app.add_middleware(
 
 
 @app.get("/dmcp/tools/refresh")
-async def test(request: Request):
-    server._register_database_tools()
+async def test(db: AsyncSession = Depends(get_db)):
+    # Re-register tools in every worker, not just the one handling this request
+    await change_bus.publish(db, "tool", "refresh")
     return JSONResponse({"status": "healthy", "message": "DMCP server is running"})
 
 
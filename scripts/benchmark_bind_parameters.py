@@ -0,0 +1,144 @@
+"""
+Compare literal and bind-parameter rendering of a templated tool query.
+
+Calls with distinct parameter values are rendered by JinjaTemplateService in both modes and run
+through the datasource connection. For each mode the script reports throughput, the number of
+distinct statement texts sent, and the statement cache hit rate of a single connection - the
+drivers cache prepared statements in an LRU keyed by SQL text (sqlite3: 128 entries, asyncpg: 100),
+so a literal rendering only hits the cache when a value repeats.
+
+SQLite runs against a generated database. Pass --postgres-dsn to also run against a PostgreSQL
+(or PostgreSQL-compatible) server, where a table with the same data is created temporarily.
+
+Usage: python scripts/benchmark_bind_parameters.py [--calls 5000] [--distinct 1000] [--postgres-dsn DSN]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-that-is-at-least-32-characters")
+
+from app.datasources import PostgreSQLConnection, SQLiteConnection  # noqa: E402
+from app.models.database import Datasource  # noqa: E402
+from app.services.jinja_template_service import JinjaTemplateService  # noqa: E402
+
+TEMPLATE = (
+    "SELECT region, COUNT(*) AS n, SUM(price) AS total FROM bench_orders "
+    "WHERE customer_id = {{ customer_id }}{% if min_price %} AND price >= {{ min_price }}{% endif %} "
+    "GROUP BY region"
+)
+ROWS = 50000
+
+
+def hit_rate(statements, cache_size: int) -> float:
+    """Hit rate of an LRU statement cache of cache_size entries keyed by SQL text."""
+    cache, hits = OrderedDict(), 0
+    for sql in statements:
+        if sql in cache:
+            hits += 1
+            cache.move_to_end(sql)
+        else:
+            cache[sql] = True
+            if len(cache) > cache_size:
+                cache.popitem(last=False)
+    return hits / len(statements)
+
+
+async def run(connection, calls, bind: bool):
+    templates = JinjaTemplateService()
+    statements = []
+    start = time.perf_counter()
+    for parameters in calls:
+        if bind:
+            sql, bind_parameters = templates.render_bound_sql(TEMPLATE, parameters)
+        else:
+            sql, bind_parameters = templates.process_sql_template(TEMPLATE, parameters), {}
+        await connection.execute(sql, bind_parameters)
+        statements.append(sql)
+    return len(calls) / (time.perf_counter() - start), statements
+
+
+async def benchmark(name, connection, calls, cache_size: int):
+    for bind in (False, True):
+        throughput, statements = await run(connection, calls, bind)
+        print(
+            f"{name:<10}  mode={'bound' if bind else 'literal':<7}  calls/s={throughput:>8.1f}  "
+            f"distinct_sql={len(set(statements)):>5}  statement_cache_hit_rate={hit_rate(statements, cache_size):.1%}"
+        )
+
+
+def create_sqlite(path: str) -> None:
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE bench_orders (id INTEGER PRIMARY KEY, customer_id INTEGER, region TEXT, price REAL)")
+    db.execute("CREATE INDEX bench_orders_customer ON bench_orders (customer_id)")
+    db.executemany(
+        "INSERT INTO bench_orders (customer_id, region, price) VALUES (?, ?, ?)",
+        ((i % 5000, ("eu", "us", "apac")[i % 3], (i % 100) * 1.5) for i in range(ROWS)),
+    )
+    db.commit()
+    db.close()
+
+
+async def run_sqlite(calls) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "orders.db")
+        create_sqlite(path)
+        datasource = Datasource(
+            id=1, name="bench", database_type="sqlite", database=path, additional_params={"read_connections": 1}
+        )
+        connection = await SQLiteConnection.create(datasource)
+        try:
+            await benchmark("sqlite", connection, calls, cache_size=128)
+        finally:
+            await SQLiteConnection.release_all()
+
+
+async def run_postgres(dsn: str, calls) -> None:
+    datasource = Datasource(
+        id=1, name="bench", database_type="postgresql", connection_string=dsn, additional_params={"pool_size": 1}
+    )
+    connection = await PostgreSQLConnection.create(datasource)
+    try:
+        await connection.execute(
+            "CREATE TABLE IF NOT EXISTS bench_orders (id SERIAL PRIMARY KEY, customer_id INT, region TEXT, price REAL)"
+        )
+        await connection.execute("CREATE INDEX IF NOT EXISTS bench_orders_customer ON bench_orders (customer_id)")
+        await connection.execute(
+            "INSERT INTO bench_orders (customer_id, region, price) "
+            "SELECT i % 5000, (ARRAY['eu', 'us', 'apac'])[i % 3 + 1], (i % 100) * 1.5 "
+            f"FROM generate_series(1, {ROWS}) i"
+        )
+        await benchmark("postgresql", connection, calls, cache_size=100)
+    finally:
+        await connection.execute("DROP TABLE IF EXISTS bench_orders")
+        await PostgreSQLConnection.release_all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--distinct", type=int, default=1000, help="Number of distinct customer ids called")
+    parser.add_argument("--postgres-dsn", help="Also benchmark this PostgreSQL server")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    calls = [
+        {"customer_id": rng.randrange(args.distinct), "min_price": rng.choice([None, 10, 50])}
+        for _ in range(args.calls)
+    ]
+
+    asyncio.run(run_sqlite(calls))
+    if args.postgres_dsn:
+        asyncio.run(run_postgres(args.postgres_dsn, calls))
+
+
+if __name__ == "__main__":
+    main()
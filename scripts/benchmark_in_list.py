@@ -0,0 +1,127 @@
+"""
+Compare literal and array-bound IN lists of growing size.
+
+A templated tool filters on a list parameter with the sql_in filter. Rendered as literals, every
+element is written into the statement text; rendered as bind parameters, the list is sent as one
+value that the datasource expands server-side (json_each on SQLite, = ANY($1) on PostgreSQL). For
+each list size the script reports the statement size, the number of driver parameters and the
+average time to render, convert and run the query.
+
+SQLite runs against a generated database. Pass --postgres-dsn to also run against a PostgreSQL
+(or PostgreSQL-compatible) server, where a table with the same data is created temporarily.
+
+Usage: python scripts/benchmark_in_list.py [--sizes 10,100,1000,10000,100000] [--repeat 5] [--postgres-dsn DSN]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-that-is-at-least-32-characters")
+
+from app.datasources import PostgreSQLConnection, SQLiteConnection  # noqa: E402
+from app.models.database import Datasource  # noqa: E402
+from app.services.jinja_template_service import JinjaTemplateService  # noqa: E402
+
+TEMPLATE = "SELECT COUNT(*) AS n, SUM(price) AS total FROM bench_orders WHERE customer_id IN {{ customers | sql_in }}"
+ROWS = 200000
+
+
+async def run(connection, ids, bind: bool, repeat: int):
+    templates = JinjaTemplateService()
+    elapsed = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if bind:
+            sql, bind_parameters = templates.render_bound_sql(TEMPLATE, {"customers": ids})
+        else:
+            sql, bind_parameters = templates.process_sql_template(TEMPLATE, {"customers": ids}), {}
+        await connection.execute(sql, bind_parameters)
+        elapsed += time.perf_counter() - start
+
+    driver_sql, driver_values = connection._convert_parameters(sql, bind_parameters)
+    return elapsed / repeat, len(driver_sql), len(driver_values)
+
+
+async def benchmark(name, connection, sizes, repeat: int):
+    rng = random.Random(42)
+    for size in sizes:
+        ids = rng.sample(range(ROWS), size)
+        for bind in (False, True):
+            try:
+                seconds, sql_bytes, values = await run(connection, ids, bind, repeat)
+            except Exception as e:
+                print(f"{name:<10}  size={size:>6}  mode={'bound' if bind else 'literal':<7}  failed: {e}")
+                continue
+            print(
+                f"{name:<10}  size={size:>6}  mode={'bound' if bind else 'literal':<7}  ms={seconds * 1000:>9.2f}  "
+                f"sql_bytes={sql_bytes:>8}  driver_values={values}"
+            )
+
+
+def create_sqlite(path: str) -> None:
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE bench_orders (id INTEGER PRIMARY KEY, customer_id INTEGER, price REAL)")
+    db.execute("CREATE INDEX bench_orders_customer ON bench_orders (customer_id)")
+    db.executemany(
+        "INSERT INTO bench_orders (customer_id, price) VALUES (?, ?)", ((i, (i % 100) * 1.5) for i in range(ROWS))
+    )
+    db.commit()
+    db.close()
+
+
+async def run_sqlite(sizes, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "orders.db")
+        create_sqlite(path)
+        datasource = Datasource(
+            id=1, name="bench", database_type="sqlite", database=path, additional_params={"read_connections": 1}
+        )
+        connection = await SQLiteConnection.create(datasource)
+        try:
+            await benchmark("sqlite", connection, sizes, repeat)
+        finally:
+            await SQLiteConnection.release_all()
+
+
+async def run_postgres(dsn: str, sizes, repeat: int) -> None:
+    datasource = Datasource(
+        id=1, name="bench", database_type="postgresql", connection_string=dsn, additional_params={"pool_size": 1}
+    )
+    connection = await PostgreSQLConnection.create(datasource)
+    try:
+        await connection.execute(
+            "CREATE TABLE IF NOT EXISTS bench_orders (id SERIAL PRIMARY KEY, customer_id INT, price REAL)"
+        )
+        await connection.execute("CREATE INDEX IF NOT EXISTS bench_orders_customer ON bench_orders (customer_id)")
+        await connection.execute(
+            "INSERT INTO bench_orders (customer_id, price) "
+            f"SELECT i, (i % 100) * 1.5 FROM generate_series(0, {ROWS - 1}) i"
+        )
+        await benchmark("postgresql", connection, sizes, repeat)
+    finally:
+        await connection.execute("DROP TABLE IF EXISTS bench_orders")
+        await PostgreSQLConnection.release_all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000", help="Comma-separated list sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per size and mode")
+    parser.add_argument("--postgres-dsn", help="Also benchmark this PostgreSQL server")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    asyncio.run(run_sqlite(sizes, args.repeat))
+    if args.postgres_dsn:
+        asyncio.run(run_postgres(args.postgres_dsn, sizes, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
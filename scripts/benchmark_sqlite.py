@@ -0,0 +1,108 @@
+"""
+Compare concurrent SQLite reads with and without the SQLite tuning profile.
+
+Readers run a small aggregate query in a loop while a writer keeps inserting rows, the way tool calls
+and API writes share the metadata database or a SQLite datasource.
+
+Usage: python scripts/benchmark_sqlite.py [--readers 8] [--seconds 5] [--rows 50000]
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import aiosqlite
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-that-is-at-least-32-characters")
+
+from app.core.sqlite import sqlite_pragmas  # noqa: E402
+
+
+def create_database(path: str, rows: int) -> None:
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, region TEXT, price REAL)")
+    db.executemany(
+        "INSERT INTO items (region, price) VALUES (?, ?)",
+        ((("eu", "us", "apac")[i % 3], i * 0.5) for i in range(rows)),
+    )
+    db.commit()
+    db.close()
+
+
+async def connect(path: str, tuned: bool) -> aiosqlite.Connection:
+    connection = await aiosqlite.connect(path)
+    if tuned:
+        for pragma in sqlite_pragmas():
+            await connection.execute(pragma)
+    return connection
+
+
+async def run(path: str, tuned: bool, readers: int, seconds: float) -> dict:
+    stats = {"reads": 0, "writes": 0, "locked": 0, "latencies": []}
+    deadline = time.perf_counter() + seconds
+
+    async def reader():
+        connection = await connect(path, tuned)
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    cursor = await connection.execute("SELECT region, COUNT(*), AVG(price) FROM items GROUP BY region")
+                    await cursor.fetchall()
+                    await cursor.close()
+                    stats["reads"] += 1
+                    stats["latencies"].append(time.perf_counter() - started)
+                except sqlite3.OperationalError:
+                    stats["locked"] += 1
+        finally:
+            await connection.close()
+
+    async def writer():
+        connection = await connect(path, tuned)
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    await connection.execute("INSERT INTO items (region, price) VALUES ('eu', 1.0)")
+                    await connection.commit()
+                    stats["writes"] += 1
+                except sqlite3.OperationalError:
+                    stats["locked"] += 1
+                    await connection.rollback()
+        finally:
+            await connection.close()
+
+    await asyncio.gather(writer(), *(reader() for _ in range(readers)))
+    return stats
+
+
+def report(name: str, stats: dict, seconds: float) -> None:
+    latencies = sorted(stats["latencies"]) or [0.0]
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(
+        f"{name:<8} reads/s={stats['reads'] / seconds:>9.1f}  writes/s={stats['writes'] / seconds:>8.1f}  "
+        f"p50={p50:>7.2f}ms  p99={p99:>7.2f}ms  locked={stats['locked']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, tuned in (("default", False), ("tuned", True)):
+            path = os.path.join(directory, f"{name}.db")
+            create_database(path, args.rows)
+            report(name, asyncio.run(run(path, tuned, args.readers, args.seconds)), args.seconds)
+
+
+if __name__ == "__main__":
+    main()
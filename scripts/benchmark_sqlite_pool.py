@@ -0,0 +1,88 @@
+"""
+Measure SQLite datasource read throughput as the number of read connections grows.
+
+Concurrent clients run an aggregate query through SQLiteConnection, the way parallel tool calls
+share a SQLite datasource, against pools with 1, 2, 4 and 8 read connections.
+
+Usage: python scripts/benchmark_sqlite_pool.py [--clients 16] [--seconds 5] [--rows 200000]
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-that-is-at-least-32-characters")
+
+from app.datasources import SQLiteConnection  # noqa: E402
+from app.models.database import Datasource  # noqa: E402
+
+QUERY = "SELECT region, COUNT(*) AS n, AVG(price) AS avg_price FROM items WHERE price > :min_price GROUP BY region"
+
+
+def create_database(path: str, rows: int) -> None:
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, region TEXT, price REAL)")
+    db.executemany(
+        "INSERT INTO items (region, price) VALUES (?, ?)",
+        ((("eu", "us", "apac")[i % 3], i * 0.5) for i in range(rows)),
+    )
+    db.commit()
+    db.close()
+
+
+async def run(path: str, read_connections: int, clients: int, seconds: float) -> float:
+    datasource = Datasource(
+        id=read_connections,
+        name=f"bench-{read_connections}",
+        database_type="sqlite",
+        database=path,
+        additional_params={"read_connections": read_connections},
+    )
+    connection = await SQLiteConnection.create(datasource)
+    await connection.execute("SELECT 1")
+
+    reads = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client():
+        nonlocal reads
+        while time.perf_counter() < deadline:
+            await connection.execute(QUERY, {"min_price": 10})
+            reads += 1
+
+    try:
+        await asyncio.gather(*(client() for _ in range(clients)))
+    finally:
+        await SQLiteConnection.release_datasource(datasource.id)
+    return reads / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "items.db")
+        create_database(path, args.rows)
+
+        # SQLite releases the GIL while a query runs, so reads scale with pool size up to the CPU count
+        print(f"cpus={os.cpu_count()}  clients={args.clients}  rows={args.rows}")
+        baseline = None
+        for read_connections in (1, 2, 4, 8):
+            throughput = asyncio.run(run(path, read_connections, args.clients, args.seconds))
+            baseline = baseline or throughput
+            print(
+                f"read_connections={read_connections}  reads/s={throughput:>8.1f}  speedup={throughput / baseline:.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
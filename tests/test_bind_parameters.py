@@ -0,0 +1,154 @@
+"""Tests for rendering template values as bind parameters and converting them per database."""
+
+import aiosqlite
+import pytest
+
+from app.core.exceptions import ToolExecutionError
+from app.datasources import MySQLConnection, PostgreSQLConnection, SQLiteConnection
+from app.models.schemas import ToolExecutionOptions
+from app.services.jinja_template_service import JinjaTemplateService
+from app.services.tool_execution_service import ToolExecutionService
+
+TEMPLATE = (
+    "SELECT name FROM items WHERE region = '{{ region }}' AND id IN {{ ids | sql_in }}"
+    "{% if min_price %} AND price >= {{ min_price }}{% endif %} ORDER BY {{ sort | sql_identifier }}"
+)
+
+
+class TestBoundRendering:
+    """Test cases for JinjaTemplateService.render_bound_sql."""
+
+    def test_values_become_placeholders(self):
+        sql, parameters = JinjaTemplateService().render_bound_sql(
+            TEMPLATE, {"region": "eu", "ids": [1, 2], "min_price": 10, "sort": "name"}
+        )
+
+        assert sql == (
+            "SELECT name FROM items WHERE region = :bind_1 AND id IN :bind_2 AND price >= :bind_3 ORDER BY name"
+        )
+        assert parameters == {"bind_1": "eu", "bind_2": [1, 2], "bind_3": 10}
+
+    def test_sql_text_is_stable_across_values(self):
+        service = JinjaTemplateService()
+        first, _ = service.render_bound_sql(TEMPLATE, {"region": "eu", "ids": [1], "min_price": 5, "sort": "id"})
+        second, _ = service.render_bound_sql(TEMPLATE, {"region": "us", "ids": [7], "min_price": 9, "sort": "id"})
+        without_filter, _ = service.render_bound_sql(TEMPLATE, {"region": "us", "ids": [7], "sort": "id"})
+
+        assert first == second
+        assert "price" not in without_filter
+
+    def test_values_inside_longer_literals_are_escaped_inline(self):
+        sql, parameters = JinjaTemplateService().render_bound_sql(
+            "SELECT * FROM people WHERE name LIKE '%{{ name }}%'", {"name": "o'brien"}
+        )
+
+        assert sql == "SELECT * FROM people WHERE name LIKE '%o''brien%'"
+        assert parameters == {}
+
+    def test_identifiers_are_validated(self):
+        with pytest.raises(ToolExecutionError, match="Invalid SQL identifier"):
+            JinjaTemplateService().render_bound_sql(TEMPLATE, {"region": "eu", "ids": [1], "sort": "id; DROP TABLE x"})
+
+    def test_tool_option_overrides_the_default_mode(self):
+        service = ToolExecutionService.__new__(ToolExecutionService)
+        service.template_service = JinjaTemplateService()
+
+        literal_sql, literal_parameters = service._render_sql(
+            "SELECT {{ n }}", {"n": 1}, ToolExecutionOptions(bind_parameters=False)
+        )
+        bound_sql, bound_parameters = service._render_sql(
+            "SELECT {{ n }}", {"n": 1}, ToolExecutionOptions(bind_parameters=True)
+        )
+
+        assert (literal_sql, literal_parameters) == ("SELECT 1", {})
+        assert (bound_sql, bound_parameters) == ("SELECT :bind_1", {"bind_1": 1})
+
+
+class TestParameterConversion:
+    """Test cases for converting :name placeholders to each driver's style."""
+
+    def test_postgresql_numbers_values_in_statement_order(self):
+        sql, values = PostgreSQLConnection(None)._convert_parameters(
+            "SELECT :b::text, ':a', :a, :b, :a10", {"a": 1, "b": "x", "a10": 10}
+        )
+
+        assert sql == "SELECT $1::text, ':a', $2, $1, $3"
+        assert values == ["x", 1, 10]
+
+    def test_mysql_doubles_literal_percent_signs(self):
+        sql, values = MySQLConnection(None)._convert_parameters(
+            "SELECT * FROM t WHERE a LIKE 'x%' AND b = :b AND c = :b", {"b": 2}
+        )
+
+        assert sql == "SELECT * FROM t WHERE a LIKE 'x%%' AND b = %s AND c = %s"
+        assert values == [2, 2]
+
+    def test_in_lists_are_bound_as_one_array_value(self):
+        sql, values = PostgreSQLConnection(None)._convert_parameters(
+            "SELECT * FROM t WHERE a IN :ids AND b NOT IN :ids AND c = :c", {"ids": [1, 2], "c": 3}
+        )
+
+        assert sql == "SELECT * FROM t WHERE a = ANY($1) AND b <> ALL($1) AND c = $2"
+        assert values == [[1, 2], 3]
+
+    def test_sqlite_reads_in_lists_with_json_each(self):
+        sql, values = SQLiteConnection(None)._convert_parameters("SELECT * FROM t WHERE a IN :ids", {"ids": ["x", 1]})
+
+        assert sql == "SELECT * FROM t WHERE a IN (SELECT value FROM json_each(?))"
+        assert values == ['["x", 1]']
+
+    def test_mysql_binds_numeric_lists_and_expands_string_lists(self):
+        sql, values = MySQLConnection(None)._convert_parameters(
+            "SELECT * FROM t WHERE a IN :ids AND b IN :names AND c IN :none",
+            {"ids": [1, 2], "names": ["x"], "none": []},
+        )
+
+        assert sql == (
+            "SELECT * FROM t WHERE a IN (SELECT value FROM JSON_TABLE(%s, '$[*]' COLUMNS (value BIGINT PATH '$'))"
+            " AS in_list) AND b IN (%s) AND c IN (SELECT NULL FROM (SELECT 1) AS empty_list WHERE 1 = 0)"
+        )
+        assert values == ["[1, 2]", "x"]
+
+    def test_unknown_names_are_left_alone(self):
+        sql, values = MySQLConnection(None)._convert_parameters("SELECT '10:30', :other LIKE 'a%'", {"b": 1})
+
+        assert (sql, values) == ("SELECT '10:30', :other LIKE 'a%'", [])
+
+    def test_comments_are_skipped(self):
+        sql, values = PostgreSQLConnection(None)._convert_parameters(
+            "SELECT * FROM t -- don't filter :b\nWHERE a = :a /* isn't :b */ AND b = ':b'", {"a": 1, "b": 2}
+        )
+
+        assert sql == "SELECT * FROM t -- don't filter :b\nWHERE a = $1 /* isn't :b */ AND b = ':b'"
+        assert values == [1]
+
+    @pytest.mark.asyncio
+    async def test_bound_sql_runs_on_sqlite(self, tmp_path):
+        sql, parameters = JinjaTemplateService().render_bound_sql(
+            TEMPLATE, {"region": "eu", "ids": [1, 2, 3], "min_price": 2, "sort": "name"}
+        )
+
+        async with aiosqlite.connect(tmp_path / "items.db") as db:
+            await db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, region TEXT, price REAL)")
+            await db.executemany(
+                "INSERT INTO items VALUES (?, ?, ?, ?)",
+                [(1, "tea", "eu", 1.0), (2, "cake", "eu", 3.0), (3, "bread", "eu", 2.5), (4, "jam", "us", 9.0)],
+            )
+            result = await SQLiteConnection(db).execute(sql, parameters)
+
+        assert [row["name"] for row in result.data] == ["bread", "cake"]
+
+    @pytest.mark.asyncio
+    async def test_large_in_list_runs_on_sqlite(self, tmp_path):
+        # More values than SQLite allows ? placeholders in one statement
+        sql, parameters = JinjaTemplateService().render_bound_sql(
+            "SELECT COUNT(*) AS n FROM items WHERE id IN {{ ids | sql_in }} AND id NOT IN {{ skip | sql_in }}",
+            {"ids": list(range(50000)), "skip": []},
+        )
+
+        async with aiosqlite.connect(tmp_path / "items.db") as db:
+            await db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+            await db.executemany("INSERT INTO items VALUES (?)", [(i,) for i in range(0, 100000, 2)])
+            result = await SQLiteConnection(db).execute(sql, parameters)
+
+        assert result.data == [{"n": 25000}]
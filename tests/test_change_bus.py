@@ -0,0 +1,107 @@
+"""Tests for propagating changes between worker processes through the change event log."""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.database import ChangeEvent
+from app.services import change_bus as change_bus_module
+from app.services.change_bus import ChangeBus
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'meta.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(ChangeEvent.__table__.create)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+def _recorder(received):
+    async def handler(event):
+        received.append((event.entity_type, event.entity_id, event.action))
+
+    return handler
+
+
+class TestChangeBus:
+    """Test cases for the cross-worker change bus."""
+
+    @pytest.mark.asyncio
+    async def test_changes_reach_other_workers(self, session_factory):
+        worker_a, worker_b = ChangeBus(session_factory), ChangeBus(session_factory)
+        received_a, received_b = [], []
+        worker_a.subscribe("tool", _recorder(received_a))
+        worker_b.subscribe("*", _recorder(received_b))
+        await worker_b.poll()
+
+        async with session_factory() as db:
+            await worker_a.publish(db, "tool", "updated", 7)
+
+        assert received_a == [("tool", 7, "updated")]
+        assert received_b == []
+        assert await worker_b.poll() == 1
+        assert received_b == [("tool", 7, "updated")]
+        assert await worker_b.poll() == 0
+
+    @pytest.mark.asyncio
+    async def test_history_is_not_replayed_on_start(self, session_factory):
+        async with session_factory() as db:
+            await ChangeBus(session_factory).publish(db, "datasource", "deleted", 1)
+
+        received = []
+        worker = ChangeBus(session_factory)
+        worker.subscribe("datasource", _recorder(received))
+        await worker.start()
+        await worker.stop()
+
+        assert received == []
+
+    @pytest.mark.asyncio
+    async def test_failing_handler_does_not_block_others(self, session_factory):
+        received = []
+
+        async def failing(event):
+            raise RuntimeError("boom")
+
+        worker = ChangeBus(session_factory)
+        worker.subscribe("tag", failing)
+        worker.subscribe("tag", _recorder(received))
+
+        async with session_factory() as db:
+            await worker.publish(db, "tag", "created", 3)
+
+        assert received == [("tag", 3, "created")]
+
+    @pytest.mark.asyncio
+    async def test_events_committed_out_of_order_are_not_skipped(self, session_factory, monkeypatch):
+        received = []
+        worker = ChangeBus(session_factory)
+        worker.subscribe("tool", _recorder(received))
+        await worker.poll()
+
+        async with session_factory() as db:
+            db.add(ChangeEvent(id=2, entity_type="tool", entity_id=2, action="updated"))
+            await db.commit()
+        await worker.poll()
+
+        # ID 1 commits after ID 2 was seen
+        async with session_factory() as db:
+            db.add(ChangeEvent(id=1, entity_type="tool", entity_id=1, action="updated"))
+            await db.commit()
+        await worker.poll()
+
+        assert received == [("tool", 2, "updated"), ("tool", 1, "updated")]
+        assert worker._watermark == 2
+
+        # A gap that never fills stops holding the position back after the grace period
+        async with session_factory() as db:
+            db.add(ChangeEvent(id=4, entity_type="tool", entity_id=4, action="updated"))
+            await db.commit()
+        monkeypatch.setattr(change_bus_module, "GAP_GRACE_SECONDS", 0)
+        await worker.poll()
+        await worker.poll()
+
+        assert worker._watermark == 4
+        assert len(received) == 3
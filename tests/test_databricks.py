@@ -3,6 +3,10 @@
 Test Databricks datasource functionality.
 """
 
+import asyncio
+
+import pytest
+
 from app.models.schemas import DatabaseType
 
 
@@ -74,3 +78,165 @@ class TestDatabricksDatasource:
         assert hasattr(DatabricksConnection, "_convert_parameters")
         assert hasattr(DatabricksConnection, "close")
         assert hasattr(DatabricksConnection, "create")
+
+
+class FakeDatabricksCursor:
+    """Minimal stand-in for a databricks.sql cursor with async execution support."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.description = None
+        self._rows = []
+        self._pending_polls = 0
+
+    def execute(self, sql, parameters=None):
+        self.connection.executed.append(("sync", sql, parameters))
+        self._load(sql)
+
+    def execute_async(self, sql, parameters=None):
+        self.connection.executed.append(("async", sql, parameters))
+        self._pending_polls = 2
+        self._load(sql)
+
+    def is_query_pending(self):
+        self.connection.polls += 1
+        self._pending_polls -= 1
+        return self._pending_polls >= 0
+
+    def get_async_execution_result(self):
+        return self
+
+    def _load(self, sql):
+        self.description = [("id",), ("name",)]
+        self._rows = [(i, f"row-{i}") for i in range(5)]
+
+    def fetchmany(self, size):
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+    def cancel(self):
+        pass
+
+    def close(self):
+        self.connection.closed_cursors += 1
+
+
+class FakeDatabricksClient:
+    """Fake databricks.sql connection that records how it is used."""
+
+    instances = []
+
+    def __init__(self, **params):
+        self.params = params
+        self.open = True
+        self.executed = []
+        self.polls = 0
+        self.cursors_created = 0
+        self.closed_cursors = 0
+        FakeDatabricksClient.instances.append(self)
+
+    def cursor(self):
+        self.cursors_created += 1
+        return FakeDatabricksCursor(self)
+
+    def close(self):
+        self.open = False
+
+
+class TestDatabricksExecution:
+    """Test the pooled Databricks execution path against a fake client."""
+
+    @pytest.fixture(autouse=True)
+    def fake_client(self, monkeypatch):
+        from app.datasources import databricks
+
+        FakeDatabricksClient.instances = []
+        monkeypatch.setattr(databricks, "connect", FakeDatabricksClient)
+        monkeypatch.setattr(databricks, "ARROW_AVAILABLE", False)
+        monkeypatch.setattr(databricks, "_pools", {})
+
+    def _datasource(self, datasource_id=1, **additional_params):
+        from app.models.database import Datasource
+
+        return Datasource(
+            id=datasource_id,
+            name="fake-databricks",
+            database_type="databricks",
+            host="adb-123.azuredatabricks.net",
+            database="default",
+            additional_params={"http_path": "/sql/1.0/warehouses/abc", "poll_interval": 0.001, **additional_params},
+        )
+
+    @pytest.mark.asyncio
+    async def test_query_uses_async_polling_and_reuses_cursor(self):
+        from app.datasources.databricks import DatabricksConnection
+
+        connection = await DatabricksConnection.create(self._datasource(fetch_batch_size=2))
+        first = await (await connection.execute("SELECT id, name FROM t")).fetchall()
+        second = await (await connection.execute("SELECT id, name FROM t")).fetchall()
+
+        client = FakeDatabricksClient.instances[0]
+        assert len(FakeDatabricksClient.instances) == 1
+        assert first == second
+        assert first[0] == {"id": 0, "name": "row-0"}
+        assert len(first) == 5
+        assert [mode for mode, _, _ in client.executed] == ["async", "async"]
+        assert client.polls >= 2
+        assert client.cursors_created == 1
+        # Pool options are not forwarded to databricks.sql.connect
+        assert "poll_interval" not in client.params
+        assert "fetch_batch_size" not in client.params
+
+    @pytest.mark.asyncio
+    async def test_connections_share_a_bounded_pool(self):
+        from app.datasources.databricks import DatabricksConnection
+
+        datasource = self._datasource(max_workers=2, max_connections=1)
+        first = await DatabricksConnection.create(datasource)
+        second = await DatabricksConnection.create(datasource)
+
+        assert first.connection is second.connection
+        assert first.connection.executor._max_workers == 2
+
+        results = await asyncio.gather(*(first.execute("SELECT 1") for _ in range(4)))
+        assert [len(await result.fetchall()) for result in results] == [5, 5, 5, 5]
+        assert len(FakeDatabricksClient.instances) == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_batches_and_drops_abandoned_cursor(self):
+        from app.datasources.databricks import DatabricksConnection
+
+        connection = await DatabricksConnection.create(self._datasource(async_polling=False))
+        stream = connection.stream("SELECT id, name FROM t", batch_size=2)
+        first_batch = await stream.__anext__()
+        await stream.aclose()
+
+        client = FakeDatabricksClient.instances[0]
+        assert first_batch == [{"id": 0, "name": "row-0"}, {"id": 1, "name": "row-1"}]
+        assert client.executed[0][0] == "sync"
+
+        # The half-read cursor is discarded, so the next query gets a fresh one
+        await connection.execute("SELECT 1")
+        assert client.cursors_created == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("value, mode", [("false", "sync"), ("0", "sync"), ("No", "sync"), ("true", "async")])
+    async def test_async_polling_accepts_string_booleans(self, value, mode):
+        from app.datasources.databricks import DatabricksConnection
+
+        connection = await DatabricksConnection.create(self._datasource(async_polling=value))
+        await connection.execute("SELECT 1")
+
+        assert FakeDatabricksClient.instances[0].executed[0][0] == mode
+
+    @pytest.mark.asyncio
+    async def test_unsaved_datasource_gets_private_pool(self):
+        from app.datasources import databricks
+        from app.datasources.databricks import DatabricksConnection
+
+        connection = await DatabricksConnection.create(self._datasource(datasource_id=None))
+        assert connection.owns_pool
+        assert databricks._pools == {}
+
+        await connection.close()
+        assert FakeDatabricksClient.instances[0].open is False
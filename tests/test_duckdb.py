@@ -0,0 +1,103 @@
+"""Tests for read-only DuckDB file datasources."""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from app.datasources import CONNECTION_REGISTRY, DuckDBConnection
+from app.datasources import duckdb as duckdb_datasource
+from app.models.database import Datasource
+
+duckdb = pytest.importorskip("duckdb")
+
+
+def _datasource(path, datasource_id=1, **additional_params):
+    return Datasource(
+        id=datasource_id,
+        name="reference",
+        database_type="duckdb",
+        database=str(path),
+        additional_params=additional_params,
+    )
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "reference.duckdb"
+    db = duckdb.connect(str(path))
+    db.execute(
+        "CREATE TABLE sales AS SELECT i AS id, ['eu', 'us'][i % 2 + 1] AS region, i * 1.5 AS amount FROM range(1000) t(i)"
+    )
+    db.close()
+    return path
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def release_databases():
+    yield
+    await DuckDBConnection.release_all()
+
+
+class TestDuckDBConnection:
+    """Test cases for querying DuckDB files."""
+
+    def test_registered(self):
+        assert CONNECTION_REGISTRY["duckdb"] is DuckDBConnection
+
+    @pytest.mark.asyncio
+    async def test_query_with_parameters(self, database):
+        connection = await DuckDBConnection.create(_datasource(database))
+
+        result = await connection.execute(
+            "SELECT region, COUNT(*) AS n FROM sales WHERE amount >= :min_amount GROUP BY region ORDER BY region",
+            {"min_amount": 750},
+        )
+
+        assert result.keys == ["region", "n"]
+        assert result.data == [{"region": "eu", "n": 250}, {"region": "us", "n": 250}]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_and_streaming(self, database):
+        connection = await DuckDBConnection.create(_datasource(database, max_workers=4))
+
+        results = await asyncio.gather(
+            *(connection.execute("SELECT SUM(amount) AS total FROM sales") for _ in range(8))
+        )
+        batches = [batch async for batch in connection.stream("SELECT id FROM sales ORDER BY id", batch_size=400)]
+
+        assert all(result.data == [{"total": 749250.0}] for result in results)
+        assert sum(len(batch) for batch in batches) == 1000
+        assert batches[0][0] == {"id": 0}
+
+    @pytest.mark.asyncio
+    async def test_database_is_read_only_without_file_access(self, database, tmp_path):
+        connection = await DuckDBConnection.create(_datasource(database))
+
+        with pytest.raises(duckdb.Error, match="read-only"):
+            await connection.execute("DELETE FROM sales")
+        with pytest.raises(duckdb.Error):
+            await connection.execute(f"COPY sales TO '{tmp_path / 'out.csv'}'")
+        with pytest.raises(duckdb.Error):
+            await connection.execute("SET enable_external_access = true")
+
+    @pytest.mark.asyncio
+    async def test_explain(self, database):
+        connection = await DuckDBConnection.create(_datasource(database))
+
+        plan = await connection.explain("SELECT region FROM sales WHERE id > :id", {"id": 10})
+
+        assert plan.format == "text"
+        assert "SEQ_SCAN" in plan.plan.upper().replace(" ", "_")
+
+    @pytest.mark.asyncio
+    async def test_database_is_shared_until_the_datasource_changes(self, database):
+        first = await DuckDBConnection.create(_datasource(database))
+        second = await DuckDBConnection.create(_datasource(database))
+        assert first.connection is second.connection
+
+        changed = await DuckDBConnection.create(_datasource(database, threads=2))
+        assert changed.connection is not first.connection
+
+        await DuckDBConnection.release_datasource(1)
+        assert 1 not in duckdb_datasource._databases
@@ -0,0 +1,145 @@
+"""Tests for compiled per-tool parameter validation and coercion."""
+
+import inspect
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.core.exceptions import ParameterValidationError
+from app.models.schemas import ParameterDefinition
+from app.services.jinja_template_service import JinjaTemplateService
+from app.services.parameter_validation import (
+    ParameterValidator,
+    check_parameter_definitions,
+    get_parameter_validator,
+    signature_parameter,
+    validate_tool_parameters,
+)
+
+
+def _definitions(*parameters):
+    return [ParameterDefinition.model_validate(parameter) for parameter in parameters]
+
+
+class TestParameterValidator:
+    """Test cases for defaults, coercion and validation rules."""
+
+    def test_defaults_and_coercion(self):
+        validator = ParameterValidator(
+            _definitions(
+                {"name": "limit", "type": "integer", "default": 10},
+                {"name": "since", "type": "date", "required": True},
+                {"name": "ids", "type": "array", "validation": {"items": "integer"}},
+                {"name": "active", "type": "boolean"},
+            )
+        )
+
+        result = validator.validate({"since": "2024-01-31", "ids": "1, 2,3", "active": None})
+
+        assert result == {"limit": 10, "since": date(2024, 1, 31), "ids": [1, 2, 3]}
+        assert validator.validate({"since": "2024-01-31", "ids": "[4, 5]"})["ids"] == [4, 5]
+
+    def test_omitted_optional_parameters_stay_undefined_in_templates(self):
+        validator = ParameterValidator(_definitions({"name": "status", "type": "string"}))
+        sql = "SELECT * FROM orders{% if status %} WHERE status = '{{ status }}'{% endif %} ORDER BY '{{ status }}'"
+
+        parameters = validator.validate({})
+
+        assert parameters == {}
+        assert JinjaTemplateService().process_sql_template(sql, parameters) == "SELECT * FROM orders ORDER BY ''"
+
+    def test_undefined_parameters_pass_through(self):
+        validator = ParameterValidator(_definitions({"name": "status", "type": "string"}))
+
+        assert validator.validate({"status": "open", "extra": 1}) == {"status": "open", "extra": 1}
+
+    def test_validation_rules(self):
+        validator = ParameterValidator(
+            _definitions(
+                {"name": "limit", "type": "integer", "validation": {"min": 1, "max": 100}},
+                {"name": "code", "type": "string", "validation": {"pattern": "^[A-Z]{3}$"}},
+                {"name": "status", "type": "string", "validation": {"enum": ["open", "closed"]}},
+            )
+        )
+
+        assert validator.validate({"limit": "100", "code": "ABC", "status": "open"})["limit"] == 100
+        with pytest.raises(ValueError) as exc_info:
+            validator.validate({"limit": 0, "code": "abc", "status": "pending"})
+
+        message = str(exc_info.value)
+        assert "limit:" in message
+        assert "code:" in message
+        assert "status: Value error, must be one of ['open', 'closed']" in message
+
+    def test_missing_required_parameter(self):
+        validator = ParameterValidator(_definitions({"name": "user-id", "type": "integer", "required": True}))
+
+        with pytest.raises(ValueError, match="user-id: Field required"):
+            validator.validate({})
+
+
+class TestToolParameters:
+    """Test cases for validators compiled per tool revision."""
+
+    def test_validator_is_compiled_once_per_revision(self):
+        tool = SimpleNamespace(id=901, updated_at="v1", parameters=[{"name": "n", "type": "integer"}])
+
+        validator = get_parameter_validator(tool)
+        assert get_parameter_validator(tool) is validator
+
+        tool.updated_at = "v2"
+        assert get_parameter_validator(tool) is not validator
+
+    def test_invalid_parameters_raise_parameter_validation_error(self):
+        tool = SimpleNamespace(id=902, updated_at="v1", parameters=[{"name": "n", "type": "integer"}])
+
+        with pytest.raises(ParameterValidationError) as exc_info:
+            validate_tool_parameters(tool, {"n": "abc"})
+
+        assert exc_info.value.status_code == 422
+        assert exc_info.value.details["tool_id"] == 902
+
+    def test_definitions_are_checked_when_saved(self):
+        check_parameter_definitions(_definitions({"name": "n", "type": "integer", "required": True, "default": None}))
+
+        with pytest.raises(ValueError, match="Duplicate parameter names"):
+            check_parameter_definitions(_definitions({"name": "n", "type": "string"}, {"name": "n", "type": "string"}))
+        with pytest.raises(ValueError, match="Unknown validation rules"):
+            check_parameter_definitions(_definitions({"name": "n", "type": "string", "validation": {"regex": "x"}}))
+        with pytest.raises(ValueError, match="Invalid parameter default: n:"):
+            check_parameter_definitions(
+                _definitions({"name": "n", "type": "integer", "default": 500, "validation": {"max": 100}})
+            )
+
+
+class TestToolSignatures:
+    """Test cases for MCP tool input schemas generated from parameter definitions."""
+
+    def test_input_schema_is_typed(self):
+        definitions = _definitions(
+            {"name": "limit", "type": "integer", "default": 10, "validation": {"max": 100}},
+            {"name": "status", "type": "string", "required": True, "validation": {"enum": ["open"]}},
+            {"name": "since", "type": "date", "description": "Start date"},
+        )
+        parameters = [signature_parameter(definition.name, definition) for definition in definitions]
+
+        def tool_function(**kwargs):
+            return kwargs
+
+        tool_function.__signature__ = inspect.Signature(parameters)
+        tool_function.__annotations__ = {parameter.name: parameter.annotation for parameter in parameters}
+        adapter = TypeAdapter(tool_function)
+        schema = adapter.json_schema()
+
+        assert schema["required"] == ["status"]
+        assert schema["properties"]["status"]["enum"] == ["open"]
+        assert schema["properties"]["limit"]["default"] == 10
+        assert {"type": "integer", "maximum": 100} in schema["properties"]["limit"]["anyOf"]
+        assert schema["properties"]["since"]["description"] == "Start date"
+        assert adapter.validate_python({"status": "open", "since": "2024-01-31"}) == {
+            "limit": 10,
+            "status": "open",
+            "since": date(2024, 1, 31),
+        }
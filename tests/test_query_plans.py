@@ -0,0 +1,126 @@
+"""Tests for query plans, the plan cache and per-tool cost limits."""
+
+import json
+import time
+from types import SimpleNamespace
+
+import aiosqlite
+import pytest
+
+from app.core.cache import TTLCache
+from app.core.exceptions import ToolExecutionError
+from app.datasources import PostgreSQLConnection, QueryPlan, SQLiteConnection
+from app.services import tool_execution_service
+from app.services.sql_analysis import sql_shape
+from app.services.tool_execution_service import ToolExecutionService
+
+
+class FakeAsyncpgConnection:
+    """Minimal asyncpg connection returning a canned EXPLAIN (FORMAT JSON) result."""
+
+    def __init__(self, total_cost):
+        self.total_cost = total_cost
+        self.statements = []
+
+    async def fetchval(self, sql, *args):
+        self.statements.append(sql)
+        return json.dumps([{"Plan": {"Node Type": "Seq Scan", "Total Cost": self.total_cost}}])
+
+
+def _datasource(datasource_id=1):
+    return SimpleNamespace(id=datasource_id, updated_at="2025-01-01 00:00:00", database_type="postgresql")
+
+
+class TestTTLCache:
+    """Test cases for the shared TTL/LRU cache."""
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_entries_expire(self):
+        cache = TTLCache(ttl_seconds=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_evict_by_predicate(self):
+        cache = TTLCache()
+        cache.set((1, "x"), 1)
+        cache.set((1, "y"), 2)
+        cache.set((2, "x"), 3)
+
+        assert cache.evict(lambda key: key[0] == 1) == 2
+        assert cache.get((2, "x")) == 3
+
+
+class TestSQLShape:
+    """Test cases for SQL shape normalization."""
+
+    def test_literals_are_normalized(self):
+        assert sql_shape("SELECT * FROM t WHERE a = 'eu' AND b > 10") == sql_shape(
+            "SELECT *  FROM t WHERE a = 'us' AND b > 2.5"
+        )
+
+    def test_in_lists_of_any_length_match(self):
+        assert sql_shape("SELECT * FROM t WHERE id IN (1, 2, 3)") == "SELECT * FROM t WHERE id IN (?)"
+
+    def test_limits_and_identifiers_are_kept(self):
+        assert sql_shape("SELECT * FROM t1 LIMIT 10") != sql_shape("SELECT * FROM t1 LIMIT 100000")
+        assert sql_shape("SELECT c2 FROM t1 WHERE id = $1;") == "SELECT c2 FROM t1 WHERE id = $1"
+
+
+class TestQueryPlans:
+    """Test cases for dialect EXPLAIN support and the cost gate."""
+
+    @pytest.mark.asyncio
+    async def test_postgresql_plan_reports_total_cost(self):
+        connection = PostgreSQLConnection(FakeAsyncpgConnection(1234.5))
+        plan = await connection.explain("SELECT * FROM items;")
+
+        assert plan.format == "json"
+        assert plan.estimated_cost == 1234.5
+        assert connection.connection.statements == ["EXPLAIN (FORMAT JSON) SELECT * FROM items"]
+
+    @pytest.mark.asyncio
+    async def test_sqlite_plan_lists_steps(self, tmp_path):
+        async with aiosqlite.connect(tmp_path / "plans.db") as db:
+            await db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, region TEXT)")
+            connection = SQLiteConnection(db)
+            plan = await connection.explain("SELECT * FROM items WHERE region = :region", {"region": "eu"})
+
+        assert plan.format == "rows"
+        assert plan.estimated_cost is None
+        assert "SCAN items" in plan.plan[0]["detail"]
+
+    @pytest.mark.asyncio
+    async def test_plans_are_cached_per_shape(self, monkeypatch):
+        monkeypatch.setattr(tool_execution_service, "plan_cache", TTLCache())
+        service = ToolExecutionService.__new__(ToolExecutionService)
+        connection = PostgreSQLConnection(FakeAsyncpgConnection(10.0))
+
+        _, cached = await service._get_query_plan(_datasource(), connection, "SELECT * FROM t WHERE a = 'eu'")
+        plan, cached_again = await service._get_query_plan(_datasource(), connection, "SELECT * FROM t WHERE a = 'us'")
+
+        assert (cached, cached_again) == (False, True)
+        assert isinstance(plan, QueryPlan)
+        assert len(connection.connection.statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_cost_limit_rejects_expensive_queries(self, monkeypatch):
+        monkeypatch.setattr(tool_execution_service, "plan_cache", TTLCache())
+        service = ToolExecutionService.__new__(ToolExecutionService)
+        connection = PostgreSQLConnection(FakeAsyncpgConnection(5000.0))
+
+        await service._check_query_cost(_datasource(), connection, "SELECT * FROM t", max_cost=10000)
+        with pytest.raises(ToolExecutionError, match="exceeds the tool's limit of 100"):
+            await service._check_query_cost(_datasource(), connection, "SELECT * FROM t", max_cost=100)
@@ -0,0 +1,85 @@
+"""Tests for the per-tool latency profiles and the slow query log."""
+
+import time
+
+import pytest
+
+from app.services.query_profiler import LatencyHistogram, PhaseTimer, QueryProfiler
+
+
+class TestLatencyHistogram:
+    """Test cases for the log-bucketed histogram."""
+
+    def test_percentiles_within_relative_error(self):
+        histogram = LatencyHistogram(precision=0.02)
+        for value in range(1, 1001):
+            histogram.record(float(value))
+
+        assert histogram.count == 1000
+        assert histogram.percentile(0.5) == pytest.approx(500, rel=0.03)
+        assert histogram.percentile(0.99) == pytest.approx(990, rel=0.03)
+        assert histogram.percentile(1.0) == pytest.approx(1000, rel=0.03)
+
+    def test_empty_histogram_has_no_percentiles(self):
+        assert LatencyHistogram().percentile(0.5) is None
+
+    def test_merge_combines_samples(self):
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(1.0)
+        second.record(100.0)
+        first.merge(second)
+
+        assert first.count == 2
+        assert (first.min_ms, first.max_ms) == (1.0, 100.0)
+
+
+class TestQueryProfiler:
+    """Test cases for the profiler store."""
+
+    def test_profile_tracks_executions_and_errors(self):
+        profiler = QueryProfiler(slow_query_threshold_ms=1000)
+        for value in (10.0, 20.0, 30.0):
+            profiler.record(1, value)
+        profiler.record(1, 5.0, error="boom")
+
+        profile = profiler.get_profile(1)
+        assert (profile.executions, profile.errors, profile.sample_count) == (4, 1, 4)
+        assert profile.max_ms == 30.0
+        assert profiler.get_profile(2).executions == 0
+
+    def test_only_slow_executions_are_logged(self):
+        profiler = QueryProfiler(slow_query_threshold_ms=100, slow_query_log_size=2)
+        profiler.record(1, 50.0, "SELECT 1", {"a": 1}, data=[{"x": 1}])
+        for value in (150.0, 200.0, 250.0):
+            profiler.record(1, value, "SELECT 2", {"a": 1}, {"query": value}, [{"x": 1}, {"x": 2}])
+
+        entries = profiler.get_slow_queries()
+        assert [entry.execution_time_ms for entry in entries] == [250.0, 200.0]
+        assert entries[0].row_count == 2
+        assert entries[0].result_bytes > 0
+        assert entries[0].parameter_fingerprint == QueryProfiler.fingerprint_parameters({"a": 1})
+        assert profiler.get_slow_queries(tool_id=2) == []
+
+    def test_raw_queries_only_appear_in_slow_log(self):
+        profiler = QueryProfiler(slow_query_threshold_ms=0)
+        profiler.record(None, 5.0, "SELECT 1")
+
+        assert profiler.get_slow_queries()[0].tool_id is None
+        assert profiler._profiles == {}
+
+    def test_old_windows_are_dropped(self):
+        profiler = QueryProfiler(window_seconds=0.01)
+        profiler.record(1, 10.0)
+        time.sleep(0.03)
+
+        profile = profiler.get_profile(1)
+        assert profile.sample_count == 0
+        assert profile.executions == 1
+
+    def test_phase_timer_records_each_phase(self):
+        timer = PhaseTimer()
+        timer.mark("render")
+        timer.mark("query")
+
+        assert list(timer.timings) == ["render", "query"]
+        assert all(value >= 0 for value in timer.timings.values())
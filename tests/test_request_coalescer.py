@@ -0,0 +1,139 @@
+"""Tests for request coalescing of identical concurrent tool calls."""
+
+import asyncio
+
+import pytest
+
+from app.models.schemas import PaginationRequest, ToolExecutionResponse
+from app.services.request_coalescer import RequestCoalescer
+from app.services.sql_analysis import classify_statement, is_read_only_sql
+
+
+def _response(rows):
+    return ToolExecutionResponse(
+        success=True,
+        data=rows,
+        columns=list(rows[0].keys()) if rows else [],
+        row_count=len(rows),
+        execution_time_ms=1.0,
+        pagination=None,
+    )
+
+
+class TestRequestCoalescer:
+    """Test cases for the single-flight layer."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_share_one_execution(self):
+        coalescer = RequestCoalescer()
+        release = asyncio.Event()
+        executions = 0
+
+        async def execute():
+            nonlocal executions
+            executions += 1
+            await release.wait()
+            return _response([{"id": 1}])
+
+        key = coalescer.make_key(1, "v1", {"region": "eu"})
+        calls = [asyncio.create_task(coalescer.run(1, key, execute)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(*calls)
+
+        assert executions == 1
+        assert all(result.data == [{"id": 1}] for result in results)
+        assert sum(result.coalesced for result in results) == 4
+        assert coalescer.get_stats(1) == {"executions": 1, "coalesced": 4}
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_are_not_coalesced(self):
+        coalescer = RequestCoalescer()
+
+        async def execute():
+            return _response([])
+
+        key = coalescer.make_key(1, "v1", {})
+        await coalescer.run(1, key, execute)
+        result = await coalescer.run(1, key, execute)
+
+        assert result.coalesced is False
+        assert coalescer.get_stats(1) == {"executions": 2, "coalesced": 0}
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared_with_waiters(self):
+        coalescer = RequestCoalescer()
+        release = asyncio.Event()
+
+        async def execute():
+            await release.wait()
+            raise RuntimeError("boom")
+
+        key = coalescer.make_key(1, "v1", {})
+        calls = [asyncio.create_task(coalescer.run(1, key, execute)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(*calls, return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_affect_others(self):
+        coalescer = RequestCoalescer()
+        release = asyncio.Event()
+
+        async def execute():
+            await release.wait()
+            return _response([{"id": 1}])
+
+        key = coalescer.make_key(1, "v1", {})
+        leader = asyncio.create_task(coalescer.run(1, key, execute))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(coalescer.run(1, key, execute))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        release.set()
+
+        assert (await leader).data == [{"id": 1}]
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    def test_key_depends_on_parameters_version_and_pagination(self):
+        key = RequestCoalescer.make_key(1, "v1", {"a": 1, "b": 2})
+
+        assert key == RequestCoalescer.make_key(1, "v1", {"b": 2, "a": 1})
+        assert key != RequestCoalescer.make_key(1, "v2", {"a": 1, "b": 2})
+        assert key != RequestCoalescer.make_key(1, "v1", {"a": 1, "b": 3})
+        assert key != RequestCoalescer.make_key(1, "v1", {"a": 1, "b": 2}, PaginationRequest(page=2))
+
+
+class TestStatementClassification:
+    """Test cases for read/write classification of tool SQL."""
+
+    @pytest.mark.parametrize(
+        "sql",
+        [
+            "SELECT * FROM users",
+            "  select id from t where name = 'delete me';",
+            "WITH recent AS (SELECT * FROM orders) SELECT * FROM recent",
+            "SELECT * FROM t {% if region %}WHERE region = {{ region | sql_quote }}{% endif %}",
+            "-- update counts\nSELECT count(*) FROM t",
+        ],
+    )
+    def test_read_statements(self, sql):
+        assert is_read_only_sql(sql)
+
+    @pytest.mark.parametrize(
+        "sql",
+        [
+            "UPDATE users SET name = 'x'",
+            "DELETE FROM t",
+            "WITH gone AS (DELETE FROM t RETURNING *) SELECT * FROM gone",
+            "SELECT * INTO backup FROM t",
+            "SELECT 1; DROP TABLE t",
+            "SELECT * FROM t FOR UPDATE",
+            "",
+        ],
+    )
+    def test_write_statements(self, sql):
+        assert classify_statement(sql) == "write"
@@ -0,0 +1,186 @@
+"""Tests for the result cache and its invalidation by the tables write tools change."""
+
+import sqlite3
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.datasources import SQLiteConnection
+from app.models.database import Base, Datasource
+from app.models.schemas import ToolCreate, ToolExecutionResponse
+from app.repositories.change_event_repository import ChangeEventRepository
+from app.services.change_bus import change_bus
+from app.services.result_cache import ResultCache, result_cache
+from app.services.sql_analysis import table_dependencies
+from app.services.tool_execution_service import ToolExecutionService, cached_datasources
+from app.services.tool_service import ToolService
+
+
+def _result(rows):
+    return ToolExecutionResponse(
+        success=True, data=rows, columns=["n"], row_count=len(rows), execution_time_ms=1.0, pagination=None
+    )
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    data_path = tmp_path / "shop.db"
+    data = sqlite3.connect(data_path)
+    data.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, status TEXT)")
+    data.execute("CREATE TABLE audit (id INTEGER PRIMARY KEY, note TEXT)")
+    data.executemany("INSERT INTO orders (status) VALUES (?)", [("open",), ("paid",)])
+    data.commit()
+    data.close()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'meta.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        session.add(Datasource(name="shop", database_type="sqlite", database=str(data_path)))
+        await session.commit()
+        yield session
+    result_cache.clear()
+    cached_datasources.clear()
+    await SQLiteConnection.release_all()
+    await engine.dispose()
+
+
+class TestTableDependencies:
+    """Test cases for reading the tables SQL reads and writes."""
+
+    @pytest.mark.parametrize(
+        "sql, expected",
+        [
+            (
+                "WITH open AS (SELECT * FROM public.Orders WHERE status = '{{ s }}') "
+                "SELECT * FROM open JOIN customers c ON c.id = open.customer_id",
+                {"reads": ["customers", "orders"], "writes": []},
+            ),
+            ("INSERT INTO audit (note) SELECT status FROM orders", {"reads": ["orders"], "writes": ["audit"]}),
+            ("UPDATE orders SET status = {{ s }} WHERE id IN {{ ids | sql_in }}", {"reads": [], "writes": ["orders"]}),
+            ("TRUNCATE TABLE orders", {"reads": [], "writes": ["orders"]}),
+        ],
+    )
+    def test_tables_are_found_in_sql_and_templates(self, sql, expected):
+        assert table_dependencies(sql, "postgresql") == expected
+
+    @pytest.mark.parametrize("sql", ["SELECT * FROM {{ table }}", "CALL refresh_orders()", "VACUUM"])
+    def test_tables_a_statement_does_not_name_are_unknown(self, sql):
+        assert table_dependencies(sql, "postgresql") == {"reads": None, "writes": None}
+
+
+class TestResultCache:
+    """Test cases for ResultCache invalidation."""
+
+    def test_writes_evict_only_results_that_read_the_written_tables(self):
+        cache = ResultCache()
+        orders = cache.make_key(1, 10, ["orders"], "a")
+        audit = cache.make_key(1, 11, ["audit"], "a")
+        unknown = cache.make_key(1, 12, None, "a")
+        other_datasource = cache.make_key(2, 13, ["orders"], "a")
+        for key in (orders, audit, unknown, other_datasource):
+            cache.set(key, _result([{"n": 1}]), 60, cache.generation(key[0]))
+
+        assert cache.invalidate_tables(1, ["orders"]) == 2
+        assert cache.get(orders) is None and cache.get(unknown) is None
+        assert cache.get(audit).cached and cache.get(other_datasource).cached
+
+        assert cache.invalidate_tables(1, None) == 1
+        assert cache.get(audit) is None
+
+    def test_result_read_before_a_write_is_not_stored_after_it(self):
+        cache = ResultCache()
+        key = cache.make_key(1, 10, ["orders"], "a")
+        generation = cache.generation(1)
+
+        cache.invalidate_tables(1, ["audit"])
+
+        assert not cache.set(key, _result([{"n": 1}]), 60, generation)
+        assert cache.set(key, _result([{"n": 1}]), 60, cache.generation(1))
+
+
+class TestCachedExecution:
+    """Test cases for cached tool executions."""
+
+    @pytest.mark.asyncio
+    async def test_write_tools_evict_the_results_of_tools_reading_their_tables(self, db):
+        tools = ToolService(db)
+        count = await tools.create_tool(
+            ToolCreate(
+                name="open_orders",
+                sql="SELECT COUNT(*) AS n FROM orders WHERE status = 'open'",
+                datasource_id=1,
+                execution_options={"cache_ttl_seconds": 3600},
+            )
+        )
+        insert_order = await tools.create_tool(
+            ToolCreate(name="add_order", sql="INSERT INTO orders (status) VALUES ('open')", datasource_id=1)
+        )
+        insert_audit = await tools.create_tool(
+            ToolCreate(name="add_audit", sql="INSERT INTO audit (note) VALUES ('x')", datasource_id=1)
+        )
+        assert count.table_dependencies == {"reads": ["orders"], "writes": []}
+        service = ToolExecutionService(db)
+
+        first = await service.execute_named_tool(count.id)
+        assert (first.data, first.cached) == ([{"n": 1}], False)
+
+        await service.execute_named_tool(insert_audit.id)
+        cached = await service.execute_named_tool(count.id)
+        assert (cached.data, cached.cached) == ([{"n": 1}], True)
+
+        await service.execute_named_tool(insert_order.id)
+        fresh = await service.execute_named_tool(count.id)
+        assert (fresh.data, fresh.cached) == ([{"n": 2}], False)
+
+    @pytest.mark.asyncio
+    async def test_writes_are_only_published_when_they_succeed_on_a_datasource_with_cached_tools(self, db, monkeypatch):
+        # Events are read back from the test database, so tool changes reach this worker's handlers
+        monkeypatch.setattr(change_bus, "session_factory", async_sessionmaker(db.bind, expire_on_commit=False))
+        monkeypatch.setattr(change_bus, "_watermark", None)
+        monkeypatch.setattr(change_bus, "_seen", set())
+        tools = ToolService(db)
+        insert_order = await tools.create_tool(
+            ToolCreate(name="add_order", sql="INSERT INTO orders (status) VALUES ('open')", datasource_id=1)
+        )
+        broken_insert = await tools.create_tool(
+            ToolCreate(name="add_broken", sql="INSERT INTO orders (missing) VALUES (1)", datasource_id=1)
+        )
+        service = ToolExecutionService(db)
+
+        async def published():
+            events = await ChangeEventRepository(db).get_since(0)
+            return len([event for event in events if event.entity_type == "tables"])
+
+        await service.execute_named_tool(insert_order.id)
+        assert await published() == 0
+        assert cached_datasources.get(1) is False
+
+        await tools.create_tool(
+            ToolCreate(
+                name="all_orders",
+                sql="SELECT * FROM orders",
+                datasource_id=1,
+                execution_options={"cache_ttl_seconds": 60},
+            )
+        )
+        assert cached_datasources.get(1) is None
+        assert not (await service.execute_named_tool(broken_insert.id)).success
+        assert await published() == 0
+
+        await service.execute_named_tool(insert_order.id)
+        assert await published() == 1
+
+    @pytest.mark.asyncio
+    async def test_caching_is_only_allowed_for_read_only_tools(self, db):
+        with pytest.raises(ValueError, match="only allowed for read-only tools"):
+            await ToolService(db).create_tool(
+                ToolCreate(
+                    name="cached_write",
+                    sql="DELETE FROM orders",
+                    datasource_id=1,
+                    execution_options={"cache_ttl_seconds": 60},
+                )
+            )
@@ -0,0 +1,129 @@
+"""Tests for exporting complete tool results as CSV."""
+
+import asyncio
+import sqlite3
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.exceptions import ToolExecutionError
+from app.datasources import PostgreSQLConnection, SQLiteConnection
+from app.models.database import Base, Datasource
+from app.models.schemas import ToolCreate
+from app.services.tool_execution_service import ToolExecutionService
+from app.services.tool_service import ToolService
+
+
+class CopyConnection:
+    """asyncpg connection stand-in whose COPY sends a fixed list of chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.queries = []
+        self.sent = 0
+
+    async def copy_from_query(self, query, *args, output, **options):
+        self.queries.append((query, args, options))
+        for chunk in self.chunks:
+            await output(chunk)
+            self.sent += 1
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    data_path = tmp_path / "shop.db"
+    data = sqlite3.connect(data_path)
+    data.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, status TEXT, note TEXT)")
+    data.executemany(
+        "INSERT INTO orders (status, note) VALUES (?, ?)",
+        [("open", "fragile, handle with care"), ("paid", None), ("open", "ok")],
+    )
+    data.commit()
+    data.close()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'meta.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        session.add(Datasource(name="shop", database_type="sqlite", database=str(data_path)))
+        await session.commit()
+        yield session
+    await SQLiteConnection.release_all()
+    await engine.dispose()
+
+
+async def _export(service, tool_id, parameters=None, delimiter=","):
+    return b"".join([chunk async for chunk in service.export_named_tool(tool_id, parameters, delimiter)])
+
+
+class TestStreamingExport:
+    """Test cases for the CSV export of databases without a native bulk export."""
+
+    @pytest.mark.asyncio
+    async def test_result_is_exported_with_a_header_and_quoted_values(self, db):
+        tool = await ToolService(db).create_tool(
+            ToolCreate(
+                name="orders",
+                sql="SELECT id, status, note FROM orders WHERE status IN {{ statuses | sql_in }} ORDER BY id",
+                datasource_id=1,
+                parameters=[{"name": "statuses", "type": "array", "required": True}],
+            )
+        )
+        # ToolResponse.model_validate converts the parameters of the stored tool in place
+        db.expunge_all()
+        service = ToolExecutionService(db)
+
+        csv_export = await _export(service, tool.id, {"statuses": ["open", "paid"]})
+        tsv_export = await _export(service, tool.id, {"statuses": ["open"]}, delimiter="\t")
+
+        assert csv_export.decode() == 'id,status,note\n1,open,"fragile, handle with care"\n2,paid,\n3,open,ok\n'
+        assert tsv_export.decode() == "id\tstatus\tnote\n1\topen\tfragile, handle with care\n3\topen\tok\n"
+
+    @pytest.mark.asyncio
+    async def test_result_without_rows_still_has_a_header(self, db):
+        tool = await ToolService(db).create_tool(
+            ToolCreate(name="no_orders", sql="SELECT id, status FROM orders WHERE id < 0", datasource_id=1)
+        )
+
+        assert await _export(ToolExecutionService(db), tool.id) == b"id,status\n"
+
+    @pytest.mark.asyncio
+    async def test_write_tools_cannot_be_exported(self, db):
+        tool = await ToolService(db).create_tool(
+            ToolCreate(name="close_orders", sql="UPDATE orders SET status = 'closed'", datasource_id=1)
+        )
+
+        with pytest.raises(ToolExecutionError, match="Only read-only tools"):
+            await _export(ToolExecutionService(db), tool.id)
+
+
+class TestCopyExport:
+    """Test cases for the PostgreSQL COPY export."""
+
+    @pytest.mark.asyncio
+    async def test_copy_output_is_passed_through(self):
+        copy = CopyConnection([b"id,status\n", b"1,open\n"])
+        connection = PostgreSQLConnection(copy)
+
+        chunks = [
+            chunk async for chunk in connection.export_csv("SELECT id, status FROM orders WHERE id > :id;", {"id": 0})
+        ]
+
+        assert chunks == [b"id,status\n", b"1,open\n"]
+        assert copy.queries == [
+            ("SELECT id, status FROM orders WHERE id > $1", (0,), {"format": "csv", "header": True, "delimiter": ","})
+        ]
+
+    @pytest.mark.asyncio
+    async def test_copy_is_cancelled_when_the_consumer_stops(self):
+        copy = CopyConnection([b"row\n"] * 1000)
+        chunks = PostgreSQLConnection(copy).export_csv("SELECT 1")
+
+        assert await anext(chunks) == b"row\n"
+        await chunks.aclose()
+        await asyncio.sleep(0)
+
+        # COPY stops once the buffer between it and the consumer is full
+        assert copy.sent < 100
@@ -0,0 +1,117 @@
+"""Tests for result row/byte limits and spilling truncated results to files."""
+
+import json
+import os
+import time
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+
+from app.datasources import SQLiteConnection
+from app.services import result_limits
+from app.services.result_limits import ResultLimits, ResultSpillStore, fetch_with_limits
+
+
+@pytest_asyncio.fixture
+async def connection(tmp_path):
+    db = await aiosqlite.connect(tmp_path / "items.db")
+    await db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    await db.executemany("INSERT INTO items (name) VALUES (?)", [(f"item{i}",) for i in range(100)])
+    await db.commit()
+    yield SQLiteConnection(db)
+    await db.close()
+
+
+@pytest.fixture
+def spill_store(tmp_path, monkeypatch):
+    store = ResultSpillStore(directory=str(tmp_path / "spill"), ttl_seconds=60)
+    monkeypatch.setattr(result_limits, "spill_store", store)
+    return store
+
+
+class TestResultLimits:
+    """Test cases for limits enforced while fetching."""
+
+    @pytest.mark.asyncio
+    async def test_row_limit_stops_fetching_early(self, connection, monkeypatch):
+        fetched = []
+        stream = connection.stream
+
+        async def counting_stream(sql, parameters=None, batch_size=1000):
+            async for batch in stream(sql, parameters, batch_size):
+                fetched.append(len(batch))
+                yield batch
+
+        monkeypatch.setattr(connection, "stream", counting_stream)
+        result = await fetch_with_limits(connection, "SELECT * FROM items", ResultLimits(max_rows=10))
+
+        assert len(result.rows) == 10
+        assert result.truncation_reason == "max_rows"
+        assert sum(fetched) == 11
+
+    @pytest.mark.asyncio
+    async def test_byte_limit(self, connection):
+        row_bytes = len(json.dumps({"id": 1, "name": "item0"}))
+        result = await fetch_with_limits(connection, "SELECT * FROM items", ResultLimits(max_bytes=row_bytes * 3))
+
+        assert len(result.rows) == 3
+        assert result.truncation_reason == "max_bytes"
+
+    @pytest.mark.asyncio
+    async def test_results_under_the_limits_are_complete(self, connection):
+        result = await fetch_with_limits(connection, "SELECT * FROM items", ResultLimits(max_rows=100))
+
+        assert len(result.rows) == 100
+        assert not result.truncated
+
+    @pytest.mark.asyncio
+    async def test_truncated_result_is_spilled(self, connection, spill_store):
+        result = await fetch_with_limits(connection, "SELECT * FROM items", ResultLimits(max_rows=5, spill=True))
+
+        assert len(result.rows) == 5
+        assert result.result_row_count == 100
+        with open(spill_store.get_path(result.result_handle)) as spilled:
+            rows = [json.loads(line) for line in spilled]
+        assert [row["id"] for row in rows] == list(range(1, 101))
+
+    @pytest.mark.asyncio
+    async def test_unstreamed_statements_are_truncated_after_running(self, connection):
+        result = await fetch_with_limits(connection, "SELECT * FROM items", ResultLimits(max_rows=4), stream=False)
+
+        assert len(result.rows) == 4
+        assert result.truncated
+
+
+class TestResultSpillStore:
+    """Test cases for spilled result handles."""
+
+    def test_invalid_handles_are_rejected(self, spill_store):
+        assert spill_store.get_path("../../etc/passwd") is None
+        assert spill_store.get_path("0" * 32) is None
+
+    @pytest.mark.asyncio
+    async def test_spilled_results_are_only_found_for_their_owners(self, connection, spill_store):
+        result = await fetch_with_limits(
+            connection, "SELECT * FROM items", ResultLimits(max_rows=5, spill=True), owner="alice"
+        )
+
+        assert spill_store.get_path(result.result_handle, "alice") is not None
+        assert spill_store.get_path(result.result_handle, "bob") is None
+
+        # Callers that were served the same coalesced or cached result are granted access
+        spill_store.grant(result.result_handle, "bob")
+        assert spill_store.get_path(result.result_handle, "bob") is not None
+
+    def test_expired_files_are_removed(self, spill_store):
+        spill = spill_store.create("alice")
+        spill.write_rows([{"id": 1}])
+        spill.close()
+        owners_path = spill_store._owners_path(spill.handle)
+        for path in (spill.path, owners_path):
+            os.utime(path, (time.time() - 120, time.time() - 120))
+
+        assert spill_store.get_path(spill.handle) is None
+        assert spill_store.cleanup_expired(force=True) == 1
+        assert not os.path.exists(spill.path)
+        assert not os.path.exists(owners_path)
@@ -0,0 +1,159 @@
+"""Tests for column projection and filter/sort pushdown on tool results."""
+
+import sqlite3
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.exceptions import ParameterValidationError
+from app.datasources import SQLiteConnection
+from app.mcp_server import MCPServer
+from app.models.database import Base, Datasource
+from app.models.schemas import PaginationRequest, ResultProjection
+from app.repositories.tool_repository import ToolRepository
+from app.services.sql_rewriter import SQLRewriter
+from app.services.tool_execution_service import ToolExecutionService, column_cache
+
+
+@pytest.fixture
+def rewriter():
+    return SQLRewriter()
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    data_path = tmp_path / "orders.db"
+    data = sqlite3.connect(data_path)
+    data.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, region TEXT, status TEXT, total REAL, note TEXT)")
+    data.executemany(
+        "INSERT INTO orders (region, status, total, note) VALUES (?, ?, ?, ?)",
+        [
+            (("eu", "us")[i % 2], ("open", "paid", "void")[i % 3], i * 10.0, None if i % 4 else "rush")
+            for i in range(12)
+        ],
+    )
+    data.commit()
+    data.close()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'meta.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        session.add(Datasource(name="orders", database_type="sqlite", database=str(data_path)))
+        await session.commit()
+        yield session
+    column_cache.clear()
+    await SQLiteConnection.release_all()
+    await engine.dispose()
+
+
+class TestSQLRewriterProjection:
+    """Test cases for SQLRewriter.project and SQLRewriter.output_columns."""
+
+    def test_query_is_wrapped_with_quoted_columns_and_bound_filters(self, rewriter):
+        projection = ResultProjection(
+            columns=["status", "total"],
+            filters=[
+                {"column": "total", "op": "gte", "value": 50},
+                {"column": "status", "op": "not_in", "value": ["void"]},
+                {"column": "note", "op": "is_null"},
+            ],
+            order_by=[{"column": "total", "direction": "desc"}],
+        )
+
+        sql, bind_parameters = rewriter.project(
+            "SELECT * FROM orders WHERE region = :bind_1;", "postgresql", projection
+        )
+
+        assert sql == (
+            'SELECT "status", "total" FROM (SELECT * FROM orders WHERE region = :bind_1) AS projected_query '
+            'WHERE "total" >= :result_filter_0 AND "status" NOT IN :result_filter_1 AND "note" IS NULL '
+            'ORDER BY "total" DESC'
+        )
+        assert bind_parameters == {"result_filter_0": 50, "result_filter_1": ["void"]}
+
+    def test_identifiers_are_quoted_for_the_dialect(self, rewriter):
+        projection = ResultProjection(columns=["odd`name"])
+
+        assert rewriter.project("SELECT 1 AS `odd``name`", "mysql", projection)[0] == (
+            "SELECT `odd``name` FROM (SELECT 1 AS `odd``name`) AS projected_query"
+        )
+
+    def test_output_columns_are_named_as_the_database_reports_them(self, rewriter):
+        assert rewriter.output_columns('SELECT Region, o.Total AS "Sum" FROM orders o', "postgresql") == [
+            "region",
+            "Sum",
+        ]
+        assert rewriter.output_columns("SELECT COUNT(*) FROM orders", "postgresql") is None
+        assert rewriter.output_columns("SELECT o.* FROM orders o", "postgresql") is None
+
+    def test_columns_are_validated_against_the_known_columns(self, rewriter):
+        projection = ResultProjection(columns=["REGION"], order_by=[{"column": "secret"}])
+
+        with pytest.raises(ValueError, match="Unknown result column 'secret', expected one of: region, total"):
+            rewriter.project("SELECT region, total FROM orders", "postgresql", projection, ["region", "total"])
+
+    @pytest.mark.parametrize(
+        "condition, message",
+        [
+            ({"column": "a", "op": "in", "value": 1}, "needs a list of values"),
+            ({"column": "a", "op": "eq"}, "needs a single value"),
+            ({"column": "a", "op": "like", "value": ["x"]}, "needs a single value"),
+        ],
+    )
+    def test_filter_values_must_fit_their_operator(self, rewriter, condition, message):
+        with pytest.raises(ValueError, match=message):
+            rewriter.project("SELECT a FROM t", "sqlite", ResultProjection(filters=[condition]))
+
+    def test_statements_that_are_not_queries_cannot_be_projected(self, rewriter):
+        with pytest.raises(ValueError, match="only be applied to queries"):
+            rewriter.project("DELETE FROM t", "sqlite", ResultProjection(columns=["a"]))
+
+
+class TestProjectedExecution:
+    """Test cases for tool executions with requested columns, filters and ordering."""
+
+    @pytest.mark.asyncio
+    async def test_database_returns_only_the_requested_rows_and_columns(self, db):
+        tool = await ToolRepository(db).create_tool(
+            name="orders", sql="SELECT * FROM orders WHERE region = 'eu'", datasource_id=1
+        )
+        projection = ResultProjection(
+            columns=["id", "total"],
+            filters=[{"column": "status", "op": "in", "value": ["open", "paid"]}],
+            order_by=[{"column": "total", "direction": "desc"}],
+        )
+
+        result = await ToolExecutionService(db).execute_named_tool(
+            tool.id, {}, PaginationRequest(page=1, page_size=3), projection
+        )
+
+        assert result.success, result.error
+        assert result.columns == ["id", "total"]
+        assert [row["total"] for row in result.data] == [100.0, 60.0, 40.0]
+        assert result.pagination.total_items == 4
+        assert len(column_cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_columns_are_rejected(self, db):
+        tool = await ToolRepository(db).create_tool(
+            name="totals", sql="SELECT region, total FROM orders", datasource_id=1
+        )
+
+        with pytest.raises(ParameterValidationError, match="Unknown result column 'status'"):
+            await ToolExecutionService(db).execute_named_tool(
+                tool.id, {}, projection=ResultProjection(filters=[{"column": "status", "value": "open"}])
+            )
+
+
+class TestToolArguments:
+    """Test cases for the result arguments of MCP tool functions."""
+
+    def test_result_arguments_follow_the_tool_parameters_without_shadowing_them(self):
+        tool_function = MCPServer.__new__(MCPServer)._create_tool_function(
+            {"id": 1, "name": "orders", "parameters": [{"name": "columns", "type": "string"}]}
+        )
+
+        assert list(tool_function.__signature__.parameters) == ["columns", "filters", "order_by"]
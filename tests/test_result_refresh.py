@@ -0,0 +1,211 @@
+"""Tests for stale-while-revalidate refreshes and scheduled pre-warming of cached tool results."""
+
+import asyncio
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.cron import CronSchedule
+from app.datasources import SQLiteConnection
+from app.models.database import Base, Datasource
+from app.models.schemas import ToolCreate, ToolExecutionResponse
+from app.services.result_cache import result_cache
+from app.services.result_prewarmer import ResultPrewarmer
+from app.services.result_refresher import ResultRefresher, result_refresher
+from app.services.tool_execution_service import ToolExecutionService
+from app.services.tool_service import ToolService
+
+
+def _result():
+    return ToolExecutionResponse(success=True, data=[], columns=[], row_count=0, execution_time_ms=1.0, pagination=None)
+
+
+@pytest_asyncio.fixture
+async def sessions(tmp_path):
+    data_path = tmp_path / "shop.db"
+    data = sqlite3.connect(data_path)
+    data.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, status TEXT)")
+    data.execute("INSERT INTO orders (status) VALUES ('open')")
+    data.commit()
+    data.close()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'meta.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add(Datasource(name="shop", database_type="sqlite", database=str(data_path)))
+        await session.commit()
+    yield session_factory
+    await result_refresher.wait()
+    # Tool IDs start over in every database
+    result_refresher.reset(1)
+    result_cache.clear()
+    await SQLiteConnection.release_all()
+    await engine.dispose()
+
+
+def _add_order(tmp_path):
+    data = sqlite3.connect(tmp_path / "shop.db")
+    data.execute("INSERT INTO orders (status) VALUES ('open')")
+    data.commit()
+    data.close()
+
+
+async def _create_count_tool(session_factory, **options):
+    async with session_factory() as db:
+        return await ToolService(db).create_tool(
+            ToolCreate(
+                name="open_orders",
+                sql="SELECT COUNT(*) AS n FROM orders",
+                datasource_id=1,
+                execution_options={"cache_ttl_seconds": 3600, **options},
+            )
+        )
+
+
+class TestCronSchedule:
+    """Test cases for cron expressions."""
+
+    @pytest.mark.parametrize(
+        "expression, after, expected",
+        [
+            ("*/15 * * * *", datetime(2024, 1, 1, 10, 7), datetime(2024, 1, 1, 10, 15)),
+            ("0 6 * * 1-5", datetime(2024, 1, 5, 7, 0), datetime(2024, 1, 8, 6, 0)),
+            ("30 2 1 * *", datetime(2024, 1, 31, 12, 0), datetime(2024, 2, 1, 2, 30)),
+            ("0 0 13 * 5", datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 5, 0, 0)),
+            ("0 0 29 2 *", datetime(2024, 3, 1, 0, 0), datetime(2028, 2, 29, 0, 0)),
+        ],
+    )
+    def test_next_run_is_the_first_matching_minute(self, expression, after, expected):
+        assert CronSchedule(expression).next_after(after) == expected
+
+    @pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "*/0 * * * *", "5-1 * * * *", "a * * * *"])
+    def test_invalid_expressions_are_rejected(self, expression):
+        with pytest.raises(ValueError, match="Cron expression|Invalid cron"):
+            CronSchedule(expression)
+
+    def test_expressions_that_never_match_are_rejected(self):
+        with pytest.raises(ValueError, match="never matches"):
+            CronSchedule("0 0 30 2 *").next_after(datetime(2024, 1, 1))
+
+
+class TestResultRefresher:
+    """Test cases for the bounded background refresher."""
+
+    @pytest.mark.asyncio
+    async def test_a_result_is_refreshed_once_however_often_it_is_served_stale(self):
+        refresher = ResultRefresher(max_concurrency=1)
+        release = asyncio.Event()
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await release.wait()
+            return _result()
+
+        assert refresher.serve_stale(1, "key", 2.0, load)
+        assert not refresher.serve_stale(1, "key", 4.0, load)
+        release.set()
+        await refresher.wait()
+
+        stats = refresher.get_stats(1)
+        assert len(calls) == 1
+        assert (stats["stale_served"], stats["refreshes"], stats["skipped_refreshes"]) == (2, 1, 1)
+        assert (stats["mean_staleness_seconds"], stats["max_staleness_seconds"]) == (3.0, 4.0)
+
+    @pytest.mark.asyncio
+    async def test_refreshes_beyond_the_pending_limit_are_skipped(self):
+        refresher = ResultRefresher(max_concurrency=1, max_pending=2)
+
+        async def fail():
+            raise RuntimeError("database is down")
+
+        submitted = [refresher.submit(1, key, fail) for key in ("a", "b", "c")]
+        await refresher.wait()
+
+        assert submitted == [True, True, False]
+        assert refresher.get_stats(1)["refresh_failures"] == 2
+
+
+class TestStaleWhileRevalidate:
+    """Test cases for serving stale results while they are refreshed."""
+
+    @pytest.mark.asyncio
+    async def test_stale_result_is_served_and_refreshed_in_the_background(self, sessions, tmp_path):
+        tool = await _create_count_tool(sessions, refresh_after_seconds=0.05)
+        async with sessions() as db:
+            service = ToolExecutionService(db)
+            assert (await service.execute_named_tool(tool.id)).data == [{"n": 1}]
+
+            _add_order(tmp_path)
+            fresh = await service.execute_named_tool(tool.id)
+            assert (fresh.data, fresh.cached) == ([{"n": 1}], True)
+
+            await asyncio.sleep(0.1)
+            stale = await service.execute_named_tool(tool.id)
+            assert (stale.data, stale.cached) == ([{"n": 1}], True)
+            await result_refresher.wait()
+
+            refreshed = await service.execute_named_tool(tool.id)
+            assert (refreshed.data, refreshed.cached) == ([{"n": 2}], True)
+
+            stats = (await service.get_tool_stats(tool.id)).result_cache
+            assert (stats["stale_served"], stats["refreshes"]) == (1, 1)
+            assert stats["max_staleness_seconds"] >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_refresh_age_must_be_below_the_cache_ttl(self, sessions):
+        with pytest.raises(ValueError, match="smaller than cache_ttl_seconds"):
+            await _create_count_tool(sessions, refresh_after_seconds=3600)
+
+
+class TestResultPrewarmer:
+    """Test cases for scheduled pre-warming."""
+
+    @pytest.mark.asyncio
+    async def test_scheduled_tools_are_prewarmed_at_start(self, sessions, tmp_path):
+        tool = await _create_count_tool(sessions, prewarm_schedule="0 * * * *")
+        prewarmer = ResultPrewarmer(session_factory=sessions)
+        await prewarmer.start()
+        try:
+            await result_refresher.wait()
+            assert prewarmer.get_next_run(tool.id) > datetime.now(timezone.utc)
+
+            _add_order(tmp_path)
+            async with sessions() as db:
+                cached = await ToolExecutionService(db).execute_named_tool(tool.id)
+            assert (cached.data, cached.cached) == ([{"n": 1}], True)
+            assert result_refresher.get_stats(tool.id)["prewarms"] == 1
+        finally:
+            await prewarmer.stop()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "options, parameters, error",
+        [
+            ({"prewarm_schedule": "0 25 * * *"}, [], "Invalid cron hour"),
+            ({"prewarm_schedule": "0 * * * *", "cache_ttl_seconds": None}, [], "requires cache_ttl_seconds"),
+            (
+                {"prewarm_schedule": "0 * * * *"},
+                [{"name": "status", "type": "string", "required": True}],
+                "requires defaults for parameters: status",
+            ),
+        ],
+    )
+    async def test_invalid_schedules_are_rejected(self, sessions, options, parameters, error):
+        async with sessions() as db:
+            with pytest.raises(ValueError, match=error):
+                await ToolService(db).create_tool(
+                    ToolCreate(
+                        name="scheduled",
+                        sql="SELECT COUNT(*) AS n FROM orders",
+                        datasource_id=1,
+                        parameters=parameters,
+                        execution_options={"cache_ttl_seconds": 3600, **options},
+                    )
+                )
@@ -0,0 +1,168 @@
+"""Tests for connection pools shared between datasources with the same connection target."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import asyncpg
+import pytest
+
+from app.datasources import PostgreSQLConnection
+from app.datasources import postgresql as postgresql_datasource
+from app.datasources.shared_pools import SharedPoolRegistry, connection_fingerprint
+from app.models.database import Datasource
+
+
+class FakePool:
+    def __init__(self):
+        self.closed = False
+
+
+class FakeRegistryPools:
+    """Open/close callables that count how many pools were opened and closed."""
+
+    def __init__(self):
+        self.opened = []
+        self.closed = []
+
+    async def open(self):
+        await asyncio.sleep(0)
+        pool = FakePool()
+        self.opened.append(pool)
+        return pool
+
+    async def close(self, pool):
+        pool.closed = True
+        self.closed.append(pool)
+
+
+class FakeAsyncpgPool(asyncpg.Pool):
+    """An asyncpg pool that hands out a recording connection instead of connecting to a server."""
+
+    def __init__(self, **connect_args):
+        self.connect_args = connect_args
+        self.statements = []
+
+    @asynccontextmanager
+    async def _acquire(self):
+        yield self
+
+    def acquire(self, *, timeout=None):
+        return self._acquire()
+
+    async def execute(self, sql, *args):
+        self.statements.append((sql, *args))
+
+    async def fetch(self, sql, *args):
+        self.statements.append((sql, *args))
+        return []
+
+    async def close(self):
+        self.statements.append("close")
+
+
+def _datasource(datasource_id, **overrides):
+    values = dict(
+        name=f"warehouse-{datasource_id}",
+        database_type="postgresql",
+        host="db.internal",
+        port=5432,
+        database="warehouse",
+        username="reader",
+        additional_params={},
+    )
+    values.update(overrides)
+    return Datasource(id=datasource_id, **values)
+
+
+class TestSharedPoolRegistry:
+    """Test cases for sharing and releasing pools by connection fingerprint."""
+
+    def test_fingerprint_ignores_unset_values(self):
+        assert connection_fingerprint(host="db", port=5432, ssl=None) == connection_fingerprint(host="db", port=5432)
+        assert connection_fingerprint(host="db", user="a") != connection_fingerprint(host="db", user="b")
+        assert "secret" not in connection_fingerprint(host="db", password="secret")
+
+    @pytest.mark.asyncio
+    async def test_datasources_with_the_same_target_share_a_pool(self):
+        registry, pools = SharedPoolRegistry("test"), FakeRegistryPools()
+
+        first, second = await asyncio.gather(
+            registry.get(1, "target", pools.open, pools.close),
+            registry.get(2, "target", pools.open, pools.close),
+        )
+        other = await registry.get(3, "other-target", pools.open, pools.close)
+
+        assert first is second
+        assert other is not first
+        assert len(pools.opened) == 2
+
+    @pytest.mark.asyncio
+    async def test_pool_is_closed_when_the_last_datasource_is_released(self):
+        registry, pools = SharedPoolRegistry("test"), FakeRegistryPools()
+        pool = await registry.get(1, "target", pools.open, pools.close)
+        await registry.get(2, "target", pools.open, pools.close)
+
+        await registry.release_datasource(1)
+        assert not pool.closed
+        await registry.release_datasource(2)
+        assert pool.closed
+
+    @pytest.mark.asyncio
+    async def test_changed_datasource_moves_to_a_new_pool(self):
+        registry, pools = SharedPoolRegistry("test"), FakeRegistryPools()
+        old = await registry.get(1, "target", pools.open, pools.close)
+
+        new = await registry.get(1, "changed-target", pools.open, pools.close)
+
+        assert new is not old
+        assert old.closed
+
+    @pytest.mark.asyncio
+    async def test_failed_open_is_not_cached(self):
+        registry, pools = SharedPoolRegistry("test"), FakeRegistryPools()
+
+        async def refuse():
+            raise ConnectionRefusedError("server is down")
+
+        with pytest.raises(ConnectionRefusedError):
+            await registry.get(1, "target", refuse, pools.close)
+
+        assert await registry.get(1, "target", pools.open, pools.close) is pools.opened[0]
+
+    @pytest.mark.asyncio
+    async def test_release_all_closes_every_pool(self):
+        registry, pools = SharedPoolRegistry("test"), FakeRegistryPools()
+        await registry.get(1, "target", pools.open, pools.close)
+        await registry.get(2, "other-target", pools.open, pools.close)
+
+        await registry.release_all()
+
+        assert len(pools.closed) == 2
+
+
+class TestPostgreSQLSharedPools:
+    """Test cases for PostgreSQL datasources sharing pools with per-datasource search paths."""
+
+    @pytest.mark.asyncio
+    async def test_search_path_is_applied_on_checkout_of_a_shared_pool(self, monkeypatch):
+        async def create_pool(**connect_args):
+            return FakeAsyncpgPool(**connect_args)
+
+        monkeypatch.setattr(postgresql_datasource.asyncpg, "create_pool", create_pool)
+        try:
+            sales = await PostgreSQLConnection.create(_datasource(1, additional_params={"search_path": "sales"}))
+            finance = await PostgreSQLConnection.create(_datasource(2, additional_params={"schema": "finance"}))
+            await finance.execute("SELECT * FROM invoices")
+
+            assert sales.connection is finance.connection
+            assert "search_path" not in sales.connection.connect_args
+            assert sales.connection.statements == [
+                ("SELECT set_config('search_path', $1, false)", "finance"),
+                ("SELECT * FROM invoices",),
+            ]
+
+            sized = await PostgreSQLConnection.create(_datasource(3, additional_params={"pool_size": 2}))
+            assert sized.connection is not sales.connection
+            assert sized.connection.connect_args["max_size"] == 2 + 5
+        finally:
+            await PostgreSQLConnection.release_all()
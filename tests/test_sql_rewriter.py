@@ -0,0 +1,104 @@
+"""Tests for dialect-aware pagination and count rewrites."""
+
+import sqlite3
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.datasources import SQLiteConnection
+from app.models.database import Base, Datasource
+from app.models.schemas import PaginationRequest
+from app.repositories.tool_repository import ToolRepository
+from app.services.sql_rewriter import SQLRewriter
+from app.services.tool_execution_service import ToolExecutionService
+
+
+@pytest.fixture
+def rewriter():
+    return SQLRewriter()
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    data_path = tmp_path / "items.db"
+    data = sqlite3.connect(data_path)
+    data.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    data.executemany("INSERT INTO items (name) VALUES (?)", [(f"item-{i:02d}",) for i in range(25)])
+    data.commit()
+    data.close()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'meta.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        session.add(Datasource(name="items", database_type="sqlite", database=str(data_path)))
+        await session.commit()
+        yield session
+    await SQLiteConnection.release_all()
+    await engine.dispose()
+
+
+class TestSQLRewriter:
+    """Test cases for SQLRewriter.paginate and SQLRewriter.count."""
+
+    def test_limit_is_appended_after_trailing_semicolons_and_comments(self, rewriter):
+        sql = "SELECT name FROM items WHERE region = :bind_1 ORDER BY name; -- newest first"
+
+        assert rewriter.paginate(sql, "sqlite", 10, 20) == (
+            "SELECT name FROM items WHERE region = :bind_1 ORDER BY name LIMIT 10 OFFSET 20"
+        )
+
+    @pytest.mark.parametrize(
+        "sql, database_type",
+        [
+            ("SELECT a FROM t ORDER BY a LIMIT 100", "postgresql"),
+            ("SELECT a FROM t ORDER BY a FETCH FIRST 100 ROWS ONLY", "postgresql"),
+            ("SELECT a FROM t LIMIT 5, 100", "mysql"),
+        ],
+    )
+    def test_queries_with_their_own_limit_are_paged_as_a_subquery(self, rewriter, sql, database_type):
+        assert rewriter.paginate(sql, database_type, 10, 0) == f"SELECT * FROM ({sql}) AS page_query LIMIT 10 OFFSET 0"
+        assert rewriter.count(sql, database_type) == f"SELECT COUNT(*) AS total FROM ({sql}) AS count_query"
+
+    def test_count_drops_only_the_outer_order_by(self, rewriter):
+        sql = "SELECT a, row_number() OVER (ORDER BY b) AS n FROM t UNION ALL SELECT c, 1 FROM u ORDER BY 1"
+
+        assert rewriter.count(sql, "duckdb") == (
+            "SELECT COUNT(*) AS total FROM "
+            "(SELECT a, row_number() OVER (ORDER BY b) AS n FROM t UNION ALL SELECT c, 1 FROM u) AS count_query"
+        )
+
+    def test_statements_that_are_not_queries_are_left_alone(self, rewriter):
+        sql = "UPDATE t SET a = 1"
+
+        assert rewriter.paginate(sql, "postgresql", 10, 0) == sql
+        assert rewriter.count(sql, "postgresql") is None
+
+    def test_unparseable_sql_is_wrapped(self, rewriter):
+        sql = "SELECT TOP 5 a FROM t -- vendor syntax"
+
+        assert rewriter.paginate(sql, "databricks", 10, 0) == f"SELECT * FROM ({sql}\n) AS page_query LIMIT 10 OFFSET 0"
+
+    def test_plan_is_cached_per_statement(self, rewriter):
+        first = rewriter.get_plan("SELECT a FROM t ORDER BY a", "sqlite")
+
+        assert rewriter.get_plan("SELECT a FROM t ORDER BY a", "sqlite") is first
+        assert rewriter.get_plan("SELECT a FROM t ORDER BY a", "mysql") is not first
+
+
+class TestPaginatedExecution:
+    """Test cases for paginated tool execution on a datasource that used to return every row."""
+
+    @pytest.mark.asyncio
+    async def test_sqlite_returns_only_the_requested_page(self, db):
+        tool = await ToolRepository(db).create_tool(
+            name="items", sql="SELECT id, name FROM items ORDER BY name DESC;", datasource_id=1
+        )
+
+        result = await ToolExecutionService(db).execute_named_tool(tool.id, {}, PaginationRequest(page=3, page_size=10))
+
+        assert result.success, result.error
+        assert [row["name"] for row in result.data] == [f"item-{i:02d}" for i in range(4, -1, -1)]
+        assert (result.pagination.total_items, result.pagination.total_pages) == (25, 3)
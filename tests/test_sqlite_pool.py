@@ -0,0 +1,99 @@
+"""Tests for the SQLite datasource pool with parallel readers and a single writer."""
+
+import asyncio
+import sqlite3
+
+import pytest
+import pytest_asyncio
+
+from app.datasources import SQLiteConnection
+from app.datasources import sqlite as sqlite_datasource
+from app.models.database import Datasource
+
+
+def _datasource(path, datasource_id=1, **additional_params):
+    return Datasource(
+        id=datasource_id,
+        name="reference-data",
+        database_type="sqlite",
+        database=str(path),
+        additional_params=additional_params,
+    )
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "reference.db"
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE countries (code TEXT PRIMARY KEY, name TEXT)")
+    db.executemany("INSERT INTO countries VALUES (?, ?)", [("de", "Germany"), ("fr", "France")])
+    db.commit()
+    db.close()
+    return path
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def release_pools():
+    yield
+    await SQLiteConnection.release_all()
+
+
+class TestSQLiteConnectionPool:
+    """Test cases for routing statements between read connections and the writer."""
+
+    @pytest.mark.asyncio
+    async def test_reads_run_in_parallel_on_read_connections(self, database):
+        connection = await SQLiteConnection.create(_datasource(database, read_connections=3))
+        pool = connection.connection
+
+        # The first statement opens the writer, which switches the database to WAL
+        await connection.execute("SELECT 1")
+        results = await asyncio.gather(
+            *(connection.execute("SELECT name FROM countries ORDER BY code") for _ in range(6))
+        )
+
+        assert all([row["name"] for row in result.data] == ["Germany", "France"] for result in results)
+        assert pool.readers._size == 3
+        assert pool.writer._size == 1
+
+    @pytest.mark.asyncio
+    async def test_writes_are_committed_and_visible_to_readers(self, database):
+        connection = await SQLiteConnection.create(_datasource(database))
+        await connection.execute("SELECT 1")
+
+        await connection.execute("INSERT INTO countries VALUES (:code, :name)", {"code": "it", "name": "Italy"})
+        result = await connection.execute("SELECT COUNT(*) AS n FROM countries")
+
+        assert result.data == [{"n": 3}]
+        db = sqlite3.connect(database)
+        assert db.execute("SELECT name FROM countries WHERE code = 'it'").fetchone() == ("Italy",)
+        db.close()
+
+    @pytest.mark.asyncio
+    async def test_read_connections_are_read_only(self, database):
+        connection = await SQLiteConnection.create(_datasource(database))
+        await connection.execute("SELECT 1")
+
+        async with connection.connection.checkout(read_only=True) as reader:
+            with pytest.raises(sqlite3.OperationalError, match="readonly"):
+                await reader.execute("DELETE FROM countries")
+
+    @pytest.mark.asyncio
+    async def test_pool_is_shared_until_the_datasource_changes(self, database):
+        first = await SQLiteConnection.create(_datasource(database))
+        second = await SQLiteConnection.create(_datasource(database))
+        assert first.connection is second.connection
+
+        changed = await SQLiteConnection.create(_datasource(database, read_connections=2))
+        assert changed.connection is not first.connection
+
+        await SQLiteConnection.release_datasource(1)
+        assert 1 not in sqlite_datasource._pools
+
+    @pytest.mark.asyncio
+    async def test_unsaved_datasource_gets_a_private_pool(self, database):
+        connection = await SQLiteConnection.create(_datasource(database, datasource_id=None))
+
+        assert (await connection.execute("SELECT COUNT(*) AS n FROM countries")).data == [{"n": 2}]
+        await connection.close()
+        assert connection.connection.writer._closed
@@ -0,0 +1,67 @@
+"""Tests for the SQLite engine profile of the metadata database and SQLite datasources."""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+
+from app.core.sqlite import sqlite_pragmas
+from app.database import engine_options, use_sqlite_profile
+from app.datasources import SQLiteConnection
+from app.models.database import Datasource
+
+
+class TestSQLiteProfile:
+    """Test cases for SQLite connection tuning."""
+
+    def test_engine_options(self):
+        assert engine_options("sqlite+aiosqlite:///./data/dmcp.db")["poolclass"] is AsyncAdaptedQueuePool
+        assert "pool_pre_ping" not in engine_options("sqlite+aiosqlite:///./data/dmcp.db")
+        assert engine_options("sqlite+aiosqlite://")["poolclass"] is StaticPool
+        assert engine_options("postgresql+asyncpg://user@localhost/dmcp")["pool_pre_ping"] is True
+
+    def test_invalid_pragma_values_are_rejected(self):
+        assert "PRAGMA cache_size = -2048" in sqlite_pragmas({"cache_size_kib": 2048})
+
+        with pytest.raises(ValueError, match="journal_mode"):
+            sqlite_pragmas({"journal_mode": "wal; DROP TABLE tools"})
+        with pytest.raises(ValueError):
+            sqlite_pragmas({"mmap_size": "1; DROP TABLE tools"})
+
+    @pytest.mark.asyncio
+    async def test_metadata_engine_connections_are_tuned(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'meta.db'}")
+        use_sqlite_profile(engine.sync_engine)
+        try:
+            async with engine.connect() as connection:
+                pragmas = {
+                    name: (await connection.execute(text(f"PRAGMA {name}"))).scalar()
+                    for name in ("journal_mode", "synchronous", "busy_timeout")
+                }
+        finally:
+            await engine.dispose()
+
+        # synchronous NORMAL is 1
+        assert pragmas == {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000}
+
+    @pytest.mark.asyncio
+    async def test_datasource_connections_are_tuned(self, tmp_path):
+        datasource = Datasource(
+            id=1,
+            name="local",
+            database_type="sqlite",
+            database=str(tmp_path / "data.db"),
+            additional_params={"busy_timeout_ms": 250, "synchronous": "full"},
+        )
+
+        connection = await SQLiteConnection.create(datasource)
+        try:
+            # PRAGMA statements run on the pool's writer connection
+            pragmas = {
+                name: next(iter((await (await connection.execute(f"PRAGMA {name}")).fetchone()).values()))
+                for name in ("journal_mode", "busy_timeout", "synchronous")
+            }
+        finally:
+            await SQLiteConnection.release_datasource(datasource.id)
+
+        assert pragmas == {"journal_mode": "wal", "busy_timeout": 250, "synchronous": 2}
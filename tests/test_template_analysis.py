@@ -0,0 +1,158 @@
+"""Tests for template analysis at save time and the sandboxed template environments."""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.exceptions import ToolExecutionError
+from app.models.database import Base, Datasource
+from app.models.schemas import ToolCreate, ToolUpdate
+from app.repositories.tool_repository import ToolRepository
+from app.services.jinja_template_service import JinjaTemplateService, TemplateAnalysis, template_cache
+from app.services.tool_service import ToolService
+
+TEMPLATE = (
+    "{% set table = 'orders' %}SELECT * FROM {{ table }} WHERE region = '{{ region }}'"
+    "{% for status in statuses %} AND status <> {{ status | sql_quote }}{% endfor %}"
+    "{% if ids %} AND id IN {{ ids | sql_in }}{% endif %} ORDER BY {{ sort | default('id') | sql_identifier }}"
+)
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'meta.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        session.add(Datasource(name="orders", database_type="sqlite", database=str(tmp_path / "orders.db")))
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+class TestAnalyzeTemplate:
+    """Test cases for JinjaTemplateService.analyze_template."""
+
+    def test_variables_exclude_names_the_template_assigns(self):
+        analysis = JinjaTemplateService().analyze_template(TEMPLATE)
+
+        assert analysis.is_template
+        assert analysis.variables == ["ids", "region", "sort", "statuses"]
+        assert analysis.statement_kind == "read"
+
+    def test_placeholders_record_variables_and_filters(self):
+        analysis = JinjaTemplateService().analyze_template(TEMPLATE)
+
+        assert analysis.placeholders == [
+            {"variables": ["table"], "filters": []},
+            {"variables": ["region"], "filters": []},
+            {"variables": ["status"], "filters": ["sql_quote"]},
+            {"variables": ["ids"], "filters": ["sql_in"]},
+            {"variables": ["sort"], "filters": ["default", "sql_identifier"]},
+        ]
+
+    def test_plain_sql_is_not_a_template(self):
+        analysis = JinjaTemplateService().analyze_template("DELETE FROM orders WHERE created_at < '{2020}'")
+
+        assert (analysis.is_template, analysis.variables, analysis.statement_kind) == (False, [], "write")
+
+    def test_used_parameters_drop_values_the_sql_never_reads(self):
+        analysis = JinjaTemplateService().analyze_template(TEMPLATE)
+
+        assert analysis.used_parameters({"region": "eu", "ids": [1], "unused": 5}) == {"region": "eu", "ids": [1]}
+
+
+class TestTemplateSandbox:
+    """Test cases for the sandboxed template environments and their cached security verdicts."""
+
+    @pytest.mark.parametrize(
+        "template",
+        ["SELECT {{ name.__class__ }}", "SELECT {{ name['__class__'] }}", "SELECT {{ name._private }}"],
+    )
+    def test_unsafe_templates_fail_the_security_check(self, template):
+        with pytest.raises(ToolExecutionError, match="security check failed"):
+            JinjaTemplateService().analyze_template(template)
+        with pytest.raises(ToolExecutionError, match="security check failed"):
+            JinjaTemplateService().render_bound_sql(template, {"name": "x"})
+
+    def test_parameters_may_have_any_name(self):
+        template = "SELECT * FROM logs WHERE session_id = {{ session | sql_quote }} AND level = {{ config }}"
+        service = JinjaTemplateService()
+
+        assert service.analyze_template(template).variables == ["config", "session"]
+        assert service.process_sql_template(template, {"session": "abc", "config": 1}) == (
+            "SELECT * FROM logs WHERE session_id = 'abc' AND level = 1"
+        )
+
+    def test_only_allow_listed_filters_and_globals_exist(self):
+        service = JinjaTemplateService()
+
+        with pytest.raises(ToolExecutionError, match="No filter named 'attr'"):
+            service.analyze_template("SELECT {{ name | attr('upper') }}")
+        assert "lipsum" not in service.env.globals
+        assert service.process_sql_template("SELECT {{ names | join(',') | upper }}", {"names": ["a", "b"]}) == (
+            "SELECT A,B"
+        )
+
+    def test_sandbox_safe_builtin_filters_are_allowed(self):
+        service = JinjaTemplateService()
+        items = {"items": [{"a": 1, "b": "x"}, {"a": 2, "b": None}]}
+
+        mapped = service.process_sql_template("SELECT {{ items | map(attribute='a') | join(',') }}", items)
+        selected = service.process_sql_template(
+            "SELECT {{ items | selectattr('b') | map(attribute='a') | list }}", items
+        )
+
+        assert (mapped, selected) == ("SELECT 1,2", "SELECT [1]")
+        # Attributes read by filters are still checked by the sandbox
+        unsafe = service.process_sql_template("SELECT {{ ids | map(attribute='__class__') | list }}", {"ids": [1]})
+        assert "int" not in unsafe
+
+    def test_parameters_cannot_be_modified(self):
+        with pytest.raises(ToolExecutionError, match="unsafe"):
+            JinjaTemplateService().process_sql_template("{% set _ = ids.append(3) %}SELECT {{ ids }}", {"ids": [1]})
+
+    def test_template_is_compiled_and_checked_once(self):
+        template = "SELECT {{ n }} AS compiled_once"
+        JinjaTemplateService().process_sql_template(template, {"n": 1})
+        compiled = template_cache.get(("literal", template))
+
+        assert JinjaTemplateService().process_sql_template(template, {"n": 2}) == "SELECT 2 AS compiled_once"
+        assert template_cache.get(("literal", template)) is compiled
+        assert compiled[1] is None
+
+
+class TestToolServiceAnalysis:
+    """Test cases for storing the analysis on the tool record."""
+
+    @pytest.mark.asyncio
+    async def test_analysis_is_stored_on_create_and_update(self, db):
+        service = ToolService(db)
+        created = await service.create_tool(ToolCreate(name="orders", sql=TEMPLATE, datasource_id=1))
+
+        assert created.is_template
+        assert created.template_variables == ["ids", "region", "sort", "statuses"]
+        assert created.statement_kind == "read"
+
+        updated = await service.update_tool(created.id, ToolUpdate(sql="UPDATE orders SET seen = 1"))
+        tool = await ToolRepository(db).get_by_id(created.id)
+        assert (updated.is_template, updated.template_variables, updated.statement_kind) == (False, [], "write")
+        assert tool.template_placeholders == []
+
+    @pytest.mark.asyncio
+    async def test_invalid_templates_are_rejected_on_save(self, db):
+        service = ToolService(db)
+
+        with pytest.raises(ValueError, match="security check"):
+            await service.create_tool(ToolCreate(name="unsafe", sql="SELECT {{ name.__class__ }}", datasource_id=1))
+        with pytest.raises(ValueError, match="compilation error"):
+            await service.create_tool(ToolCreate(name="broken", sql="SELECT {% if x %}1", datasource_id=1))
+
+    @pytest.mark.asyncio
+    async def test_tools_saved_before_the_analysis_are_analyzed_when_read(self, db):
+        tool = await ToolRepository(db).create_tool(name="legacy", sql="SELECT {{ n }}", datasource_id=1)
+
+        assert tool.statement_kind is None
+        analysis = TemplateAnalysis.for_tool(tool)
+        assert (analysis.is_template, analysis.variables, analysis.read_only) == (True, ["n"], True)
@@ -0,0 +1,120 @@
+"""Tests for role/tag-based MCP tool access."""
+
+from types import SimpleNamespace
+
+import pytest
+from fastmcp.exceptions import ToolError
+
+from app.core.jwt_validator import jwt_validator
+from app.mcp.middleware import auth as auth_middleware
+from app.mcp.middleware import tools as tools_middleware
+from app.mcp.middleware.tools import ToolAccessMiddleware
+from app.services.tool_access import ToolAccessIndex, get_roles
+
+TOOL_TAGS = {"revenue": ["finance"], "signups": ["marketing"], "cleanup": ["admin"], "untagged": []}
+
+
+def _tools(*names):
+    return [SimpleNamespace(name=name) for name in names]
+
+
+@pytest.fixture
+def index():
+    index = ToolAccessIndex({"admin": ["*"], "analyst": ["finance", "marketing"], "marketer": ["marketing"]})
+    index.rebuild(TOOL_TAGS)
+    return index
+
+
+@pytest.fixture
+def caller(index, monkeypatch):
+    """Set the roles of the calling MCP client."""
+    monkeypatch.setattr(tools_middleware, "tool_access_index", index)
+
+    def set_roles(roles):
+        token = jwt_validator.create_token({"user_id": 1, "roles": roles})
+        monkeypatch.setattr(tools_middleware, "get_http_headers", lambda: {"authorization": f"Bearer {token}"})
+
+    return set_roles
+
+
+class TestToolAccessIndex:
+    """Test cases for the role to tool index."""
+
+    def test_roles_see_tools_with_allowed_tags(self, index):
+        assert index.allowed_tools(["marketer"]) == {"signups"}
+        assert index.allowed_tools(["marketer", "analyst"]) == {"revenue", "signups"}
+        assert index.allowed_tools(["admin"]) == set(TOOL_TAGS)
+        assert index.allowed_tools([]) == set()
+
+    def test_unindexed_tools_are_allowed(self, index):
+        assert index.is_allowed([], "ping")
+        assert not index.is_allowed([], "revenue")
+        assert [tool.name for tool in index.filter(["marketer"], _tools("ping", "revenue", "signups"))] == [
+            "ping",
+            "signups",
+        ]
+
+    def test_rebuild_applies_tag_changes(self, index):
+        assert index.allowed_tools(["marketer"]) == {"signups"}
+
+        index.rebuild({**TOOL_TAGS, "revenue": ["finance", "marketing"]})
+
+        assert index.allowed_tools(["marketer"]) == {"revenue", "signups"}
+
+    def test_no_policy_allows_everything(self):
+        index = ToolAccessIndex({})
+        index.rebuild(TOOL_TAGS)
+
+        assert index.is_allowed([], "cleanup")
+        assert len(index.filter([], _tools(*TOOL_TAGS))) == len(TOOL_TAGS)
+
+    def test_roles_claim(self):
+        assert get_roles({"roles": ["admin", "user"]}) == ["admin", "user"]
+        assert get_roles({"roles": "admin, user"}) == ["admin", "user"]
+        assert get_roles({}) == []
+
+
+class TestToolAccessMiddleware:
+    """Test cases for applying the index to MCP list and call requests."""
+
+    @pytest.mark.asyncio
+    async def test_list_tools_is_filtered(self, caller):
+        caller(["marketer"])
+
+        async def call_next(context):
+            return _tools("ping", *TOOL_TAGS)
+
+        tools = await ToolAccessMiddleware().on_list_tools(SimpleNamespace(), call_next)
+
+        assert [tool.name for tool in tools] == ["ping", "signups"]
+
+    @pytest.mark.asyncio
+    async def test_call_tool_is_enforced(self, caller):
+        caller(["marketer"])
+        middleware = ToolAccessMiddleware()
+
+        async def call_next(context):
+            return "result"
+
+        assert await middleware.on_call_tool(SimpleNamespace(message=SimpleNamespace(name="signups")), call_next)
+        with pytest.raises(ToolError, match="Access denied"):
+            await middleware.on_call_tool(SimpleNamespace(message=SimpleNamespace(name="cleanup")), call_next)
+
+
+class TestTokenClaims:
+    """Test cases for cached token claims."""
+
+    def test_claims_are_validated_once(self, monkeypatch):
+        calls = []
+        validate_token = jwt_validator.validate_token
+
+        def counting_validate(token):
+            calls.append(token)
+            return validate_token(token)
+
+        monkeypatch.setattr(jwt_validator, "validate_token", counting_validate)
+        header = "Bearer " + jwt_validator.create_token({"user_id": 7, "roles": ["admin"]})
+
+        assert auth_middleware.get_token_claims(header)["user_id"] == 7
+        assert auth_middleware.get_token_claims(header)["roles"] == ["admin"]
+        assert len(calls) == 1
@@ -0,0 +1,133 @@
+"""Tests for background tool jobs with spooled, paginated results."""
+
+import asyncio
+import os
+import sqlite3
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.exceptions import JobLimitError, JobNotFoundError, ToolNotFoundError
+from app.datasources import SQLiteConnection
+from app.models.database import Base, Datasource
+from app.models.schemas import PaginationRequest
+from app.repositories.tool_repository import ToolRepository
+from app.services.tool_jobs import ToolJobManager
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    data_path = tmp_path / "events.db"
+    data = sqlite3.connect(data_path)
+    data.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, kind TEXT)")
+    data.executemany("INSERT INTO events (kind) VALUES (?)", [(("view", "click")[i % 2],) for i in range(2500)])
+    data.commit()
+    data.close()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'meta.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(Datasource(name="events", database_type="sqlite", database=str(data_path)))
+        await session.commit()
+        repository = ToolRepository(session)
+        await repository.create_tool(name="all_events", sql="SELECT id, kind FROM events ORDER BY id", datasource_id=1)
+        await repository.create_tool(name="broken", sql="SELECT * FROM missing_table", datasource_id=1)
+
+    yield factory
+    await SQLiteConnection.release_all()
+    await engine.dispose()
+
+
+@pytest.fixture
+def manager(tmp_path, session_factory):
+    return ToolJobManager(
+        directory=str(tmp_path / "jobs"), max_workers=1, max_jobs_per_user=2, session_factory=session_factory
+    )
+
+
+async def _submit(manager, session_factory, tool_id=1, owner="alice"):
+    async with session_factory() as db:
+        return await manager.submit(db, tool_id, {}, owner)
+
+
+async def _finish(manager, job_id):
+    await asyncio.gather(manager._jobs[job_id].task, return_exceptions=True)
+    return manager._jobs[job_id]
+
+
+class TestToolJobs:
+    """Test cases for submitting, polling, paging and cancelling tool jobs."""
+
+    @pytest.mark.asyncio
+    async def test_job_result_is_read_page_by_page(self, manager, session_factory):
+        submitted = await _submit(manager, session_factory)
+        assert submitted.status == "queued"
+
+        await _finish(manager, submitted.job_id)
+        job = manager.get(submitted.job_id, "alice")
+        assert (job.status, job.row_count, job.columns) == ("succeeded", 2500, ["id", "kind"])
+        assert job.expires_at is not None
+
+        page = await manager.get_results(submitted.job_id, "alice", PaginationRequest(page=2, page_size=999))
+        assert [row["id"] for row in page.data] == list(range(1000, 1999))
+        assert page.data[0] == {"id": 1000, "kind": "click"}
+        assert (page.pagination.total_pages, page.pagination.has_next) == (3, True)
+
+        last = await manager.get_results(submitted.job_id, "alice", PaginationRequest(page=3, page_size=999))
+        assert len(last.data) == 2500 - 2 * 999
+
+    @pytest.mark.asyncio
+    async def test_failed_job_reports_the_error(self, manager, session_factory):
+        submitted = await _submit(manager, session_factory, tool_id=2)
+        await _finish(manager, submitted.job_id)
+
+        job = manager.get(submitted.job_id, "alice")
+        assert job.status == "failed"
+        assert "missing_table" in job.error
+
+    @pytest.mark.asyncio
+    async def test_unknown_tool_is_rejected_on_submit(self, manager, session_factory):
+        with pytest.raises(ToolNotFoundError):
+            await _submit(manager, session_factory, tool_id=99)
+
+    @pytest.mark.asyncio
+    async def test_active_jobs_are_capped_per_user(self, manager, session_factory):
+        first = await _submit(manager, session_factory)
+        await _submit(manager, session_factory)
+        with pytest.raises(JobLimitError):
+            await _submit(manager, session_factory)
+
+        # Other users have their own cap, and cannot see alice's jobs
+        await _submit(manager, session_factory, owner="bob")
+        with pytest.raises(JobNotFoundError):
+            manager.get(first.job_id, "bob")
+        assert len(manager.list_jobs("alice")) == 2
+
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_job_is_removed(self, manager, session_factory):
+        await _submit(manager, session_factory)
+        queued = await _submit(manager, session_factory)
+
+        cancelled = await manager.cancel(queued.job_id, "alice")
+
+        assert cancelled.status == "cancelled"
+        with pytest.raises(JobNotFoundError):
+            manager.get(queued.job_id, "alice")
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_finished_jobs_expire(self, manager, session_factory):
+        manager.ttl_seconds = 0
+        submitted = await _submit(manager, session_factory)
+        job = await _finish(manager, submitted.job_id)
+
+        assert manager.cleanup_expired() == 1
+        assert not os.path.exists(job.result.path)
+        with pytest.raises(JobNotFoundError):
+            manager.get(submitted.job_id, "alice")
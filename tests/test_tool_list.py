@@ -0,0 +1,131 @@
+"""Tests for filtered and paginated tool lists and the tool/tag links behind them."""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.responses import etag_matches
+from app.models.database import Base, Tag, Tool, ToolTag
+from app.models.schemas import PaginationRequest, TagUpdate, ToolListFilters
+from app.repositories.tool_repository import ToolRepository
+from app.services.tag_service import TagService
+from app.services.tool_service import ToolService
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'meta.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        repository = ToolRepository(session)
+        for name, datasource_id, tool_type, tags in [
+            ("daily_sales", 1, "query", ["sales", "daily"]),
+            ("sales_by_region", 1, "query", ["sales"]),
+            ("signups", 2, "query", ["sales_ops"]),
+            ("refresh_cache", 2, "http", []),
+        ]:
+            await repository.create_tool(
+                name=name, sql="SELECT 1", datasource_id=datasource_id, type=tool_type, tags=tags
+            )
+        yield session
+    await engine.dispose()
+
+
+def _names(tools):
+    return [tool.name for tool in tools]
+
+
+class TestToolList:
+    """Test cases for listing tools."""
+
+    @pytest.mark.asyncio
+    async def test_filters(self, db):
+        service = ToolService(db)
+
+        assert _names(await service.list_tools(ToolListFilters(tag="Sales"))) == ["daily_sales", "sales_by_region"]
+        assert _names(await service.list_tools(ToolListFilters(tag="sales_ops"))) == ["signups"]
+        assert _names(await service.list_tools(ToolListFilters(tag="sales%"))) == []
+        assert _names(await service.list_tools(ToolListFilters(datasource_id=2, type="HTTP"))) == ["refresh_cache"]
+        assert _names(await service.list_tools(ToolListFilters(search="S_B"))) == ["sales_by_region"]
+        assert _names(await service.list_tools(ToolListFilters(search="sale_"))) == []
+        assert _names(await service.list_tools(ToolListFilters(search="SALES"))) == ["daily_sales", "sales_by_region"]
+
+    @pytest.mark.asyncio
+    async def test_pagination(self, db):
+        result = await ToolService(db).list_tools_page(PaginationRequest(page=2, page_size=3))
+
+        assert _names(result.items) == ["refresh_cache"]
+        assert result.pagination.total_items == 4
+        assert result.pagination.total_pages == 2
+        assert result.pagination.has_prev and not result.pagination.has_next
+
+    @pytest.mark.asyncio
+    async def test_etag_changes_with_the_list(self, db):
+        service = ToolService(db)
+        etag = await service.get_list_etag()
+
+        assert await service.get_list_etag() == etag
+        assert await service.get_list_etag(ToolListFilters(tag="sales")) != etag
+        assert await service.get_list_etag(pagination=PaginationRequest(page=1)) != etag
+
+        await service.repository.update_tool(1, description="changed")
+        assert await service.get_list_etag() != etag
+
+        etag = await service.get_list_etag()
+        await service.repository.delete_tool(4)
+        assert await service.get_list_etag() != etag
+
+    @pytest.mark.parametrize(
+        "if_none_match, matches",
+        [
+            ('W/"abc"', True),
+            ('"abc"', True),
+            ('"xyz", W/"abc"', True),
+            ("*", True),
+            ('W/"ab"', False),
+            ('W/"abcd"', False),
+            ('"x,W/abc"', False),
+            ("", False),
+            (None, False),
+        ],
+    )
+    def test_if_none_match_compares_whole_entity_tags(self, if_none_match, matches):
+        assert etag_matches('W/"abc"', if_none_match) is matches
+
+
+class TestToolTags:
+    """Test cases for keeping tool/tag links and the tools' tags in sync."""
+
+    @pytest.mark.asyncio
+    async def test_tags_are_created_and_counted(self, db):
+        tags = {tag.name: tag.tool_count for tag in await TagService(db).list_tags()}
+
+        assert tags == {"sales": 2, "daily": 1, "sales_ops": 1}
+
+    @pytest.mark.asyncio
+    async def test_updating_tool_tags_relinks(self, db):
+        await ToolRepository(db).update_tool(2, tags=["daily"])
+
+        service = ToolService(db)
+        assert _names(await service.list_tools(ToolListFilters(tag="sales"))) == ["daily_sales"]
+        assert _names(await service.list_tools(ToolListFilters(tag="daily"))) == ["daily_sales", "sales_by_region"]
+
+    @pytest.mark.asyncio
+    async def test_renaming_and_deleting_tags_updates_tools(self, db):
+        service = TagService(db)
+        sales = (await db.execute(select(Tag).where(Tag.name == "sales"))).scalar_one()
+
+        renamed = await service.update_tag(sales.id, TagUpdate(name="revenue"))
+        assert renamed.tool_count == 2
+        tools = (await db.execute(select(Tool).order_by(Tool.id).execution_options(populate_existing=True))).scalars()
+        assert [sorted(tool.tags) for tool in tools][:2] == [["daily", "revenue"], ["revenue"]]
+
+        await service.delete_tag(sales.id)
+        tool = (
+            await db.execute(select(Tool).where(Tool.id == 1).execution_options(populate_existing=True))
+        ).scalar_one()
+        assert tool.tags == ["daily"]
+        assert (await db.execute(select(ToolTag).where(ToolTag.tag_id == sales.id))).first() is None